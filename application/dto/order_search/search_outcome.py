@@ -0,0 +1,72 @@
+from datetime import datetime
+from typing import Optional, List
+
+from src.core.models.base import BaseModelWithConfig
+
+
+class SearchContext(BaseModelWithConfig):
+    """
+    Поисковый запрос вместе с данными материала, пользователя, шаблона и
+    списком артикулов WB (nm_id), загруженными одним запросом.
+    """
+
+    id: int
+    material_id: int
+    search_type: str
+    filters: dict
+    created_at: datetime
+    check_attempts: int = 0
+
+    template_id: int
+    category_id: int
+    category_folder_name: Optional[str] = None
+
+    user_id: int
+    user_first_name: str
+    user_username: Optional[str] = None
+
+    nm_ids: List[int] = []
+
+
+class CandidateOrder(BaseModelWithConfig):
+    """Заказ WB, подходящий под условия поиска"""
+
+    search_id: int
+    id: str
+    nm_id: int
+    region_name: str
+    country_name: str
+    supplier_article: str
+    created_at: datetime
+    is_cancel: bool
+    warehouse_type: Optional[str] = None
+    material_id: Optional[int] = None
+    assembly_task_id: Optional[int] = None
+
+
+class CandidateScore(BaseModelWithConfig):
+    """Оценка заказа-кандидата при нескольких совпадениях"""
+
+    order_id: str
+    score: float
+    evidence: float = 0.0
+    """Оценка только по совпадению с указанным пользователем (время, регион)"""
+    time_delta: Optional[float] = None
+    """Отклонение времени заказа от указанного пользователем (сек)"""
+
+
+class SearchOutcome(BaseModelWithConfig):
+    """
+    Результат проверки одного поискового запроса.
+
+    status - новый статус поиска (None, если поиск остается в ожидании)
+    order - найденный заказ (единственный или выбранный по оценке)
+    candidates - все заказы, подошедшие под фильтры
+    scores - оценки кандидатов, если их было несколько
+    """
+
+    search: SearchContext
+    status: Optional[str] = None
+    order: Optional[CandidateOrder] = None
+    candidates: List[CandidateOrder] = []
+    scores: List[CandidateScore] = []
@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import List
+
+from src.core.models.base import BaseModelWithConfig
+
+
+class NewWbOrderDTO(BaseModelWithConfig):
+    id: str
+    nm_id: int
+    created_at: datetime
+
+
+class NewWbOrdersEvent(BaseModelWithConfig):
+    """
+    Событие о новых или измененных заказах WB,
+    публикуется после сохранения данных синхронизации.
+    """
+
+    orders: List[NewWbOrderDTO] = []
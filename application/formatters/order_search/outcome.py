@@ -0,0 +1,142 @@
+from src.application.dto.order_search.search_outcome import SearchOutcome
+from src.core.config.settings import settings
+from src.core.enums.order_search import OrderSearchStatus
+from src.notification_service.entities import NotificationMessage
+from src.notification_service.entities.notification_message import Button
+
+MANAGER_BUTTON = Button(text="Менеджер", url="https://t.me/giftoboom")
+
+FAILED_SEARCH_USER_TEXT = (
+    f"⌛️ <b>Поиск вашего заказа завершен неудачно</b>\n"
+    "Свяжитесь с менеджером в ближайшее время, мы примем ваш заказ вручную.\n"
+)
+
+
+def get_username_display(username: str | None) -> str:
+    """
+    Возвращает отформатированное имя пользователя для отображения в сообщении.
+    """
+    return f"@{username}" if username else "Отсутствует"
+
+
+def get_user_id_display(user_id: int) -> str:
+    """
+    Возвращает отформатированное ID пользователя для отображения в сообщении.
+    """
+    return f"<a href='tg://user?id={user_id}'>{user_id}</a>"
+
+
+def get_user_block(outcome: SearchOutcome) -> str:
+    search = outcome.search
+    return (
+        f"ID: {get_user_id_display(search.user_id)}\n"
+        f"Имя: {search.user_first_name}\n"
+        f"Username: {get_username_display(search.user_username)}\n\n"
+    )
+
+
+def build_outcome_messages(outcome: SearchOutcome) -> tuple[str, str]:
+    """
+    Формирует тексты уведомлений пользователю и администратору
+    по результату поиска.
+
+    :return: (текст пользователю, текст администратору)
+    """
+    search = outcome.search
+
+    if outcome.status == OrderSearchStatus.TIMEOUT:
+        admin_message = (
+            "🚫 Завершение по времени\n\n"
+            f"👤 Пользователь:\n"
+            f"{get_user_block(outcome)}"
+            f"Данные поиска:\n"
+            f"Тип поиска: {search.search_type}\n"
+            f"Фильтры: {search.filters}\n\n"
+            f"Идентификатор поиска: {search.id}\n\n"
+            f"Идентификатор материала: {search.material_id}"
+        )
+        return FAILED_SEARCH_USER_TEXT, admin_message
+
+    if outcome.status == OrderSearchStatus.FOUND_MULTIPLE:
+        order_ids = "\n".join(order.id for order in outcome.candidates)
+        admin_message = (
+            f"🚫 Было найдено {len(outcome.candidates)} заказов"
+            f"Заявка №{search.id}:\n\n"
+            f"<b>👤 Пользователь:</b>\n"
+            f"{get_user_block(outcome)}"
+            f"Заказы:\n {order_ids}"
+        )
+        return FAILED_SEARCH_USER_TEXT, admin_message
+
+    wb_order = outcome.order
+
+    if outcome.status == OrderSearchStatus.FOUND_BUT_LINKED:
+        admin_reason = "🚫 Заказ уже связан с другим материалом"
+        user_text = (
+            "ℹ️ <b>Ваш заказ уже был связан с другим</b>\n\n"
+            "Свяжитесь с менеджером в ближайшее время для уточнения деталей.\n\n"
+            f"Номер вашей заявки: #{search.id}"
+        )
+    elif outcome.status == OrderSearchStatus.FOUND_IN_OTHER_WAREHOUSE:
+        admin_reason = "🚫 Заказ не из нашего склада"
+        user_text = FAILED_SEARCH_USER_TEXT
+    elif outcome.status == OrderSearchStatus.CANCELED:
+        admin_reason = "🚫 Заказ был отменен"
+        user_text = (
+            f"⌛️ <b>Поиск вашего заказа завершен неудачно</b>\n"
+            "Свяжитесь с менеджером в ближайшее время для уточнения деталей.\n"
+        )
+    else:
+        admin_reason = "✅ Заказ был найден"
+        user_text = (
+            "✅ Ваш заказ был успешно найден и отправлен в производство, ожидайте отправку.\n"
+            f"Номер вашего заказа: #{wb_order.assembly_task_id}"
+        )
+
+    admin_message = (
+        f"{admin_reason}:\n\n"
+        f"<b>👤 Пользователь:</b>\n"
+        f"{get_user_block(outcome)}"
+        f"<b>📦 Детали заказа Wildberries:</b>\n"
+        f"WB ID: {wb_order.id}\n"
+        f"Сборочное задание: {wb_order.assembly_task_id}\n"
+        f"Регион: {wb_order.region_name}\n"
+        f"Артикул: {wb_order.supplier_article}\n"
+        f"Дата оформления: {wb_order.created_at.strftime('%d.%m.%Y %H:%M')}\n"
+        f"Идентификатор материала: {search.material_id}"
+    )
+
+    if len(outcome.scores) > 1:
+        best, runner_up = outcome.scores[0], outcome.scores[1]
+        admin_message += (
+            f"\n\nВыбран по оценке из {len(outcome.scores)} заказов: "
+            f"{best.evidence} (следующий {runner_up.order_id}: {runner_up.evidence})"
+        )
+
+    return user_text, admin_message
+
+
+def build_outcome_notifications(
+    outcome: SearchOutcome,
+) -> tuple[NotificationMessage, NotificationMessage]:
+    """
+    Формирует уведомления пользователю и администратору по результату поиска.
+
+    :return: (уведомление пользователю, уведомление администратору)
+    """
+    user_text, admin_message = build_outcome_messages(outcome)
+
+    user_notification = NotificationMessage(
+        chat_id=outcome.search.user_id,
+        type="text",
+        text=user_text,
+        buttons=[MANAGER_BUTTON],
+    )
+    admin_notification = NotificationMessage(
+        chat_id=settings.ADMIN_CHAT_ID,
+        message_thread_id=settings.WB_NOTIFICATION_THREAD,
+        type="text",
+        text=admin_message,
+    )
+
+    return user_notification, admin_notification
@@ -0,0 +1,816 @@
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Optional, Sequence
+
+from sqlalchemy import (
+    select,
+    update,
+    or_,
+    and_,
+    func,
+    values,
+    column,
+    Integer,
+    BigInteger,
+    String,
+    DateTime,
+    JSON,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.application.dto.order_search.search_outcome import (
+    SearchContext,
+    CandidateOrder,
+    SearchOutcome,
+)
+from src.application.dto.wb_order.new_orders_event import NewWbOrderDTO
+from src.application.formatters.order_search.outcome import (
+    build_outcome_notifications,
+)
+from src.application.order_search.scoring import (
+    score_candidates,
+    pick_best_candidate,
+)
+from src.core.config.settings import settings
+from src.core.enums.order_search import OrderSearchStatus
+from src.core.utils.time import now_utc
+from src.database.models import (
+    OrderSearchORM,
+    WbOrderORM,
+    MaterialORM,
+    WbAssemblyTaskORM,
+    UserORM,
+    CategoryORM,
+    TemplateORM,
+    WbArticleORM,
+)
+from src.database.repositories import RegionRepository, NotificationOutboxRepository
+from src.domain.wb_orders.normalizers import resolve_region_code
+
+log = logging.getLogger(__name__)
+
+SEARCH_TTL = timedelta(hours=4)
+"""Максимальное время поиска заказа"""
+
+ORDER_TIME_WINDOW = timedelta(seconds=60)
+"""Допустимое отклонение времени заказа от указанного пользователем"""
+
+SEARCH_LEASE_TTL = timedelta(minutes=5)
+"""Время аренды поиска воркером"""
+
+
+def parse_datetime_with_offset(datetime_str: str) -> datetime:
+    return datetime.strptime(datetime_str, "%Y-%m-%d %H:%M:%S") + timedelta(hours=3)
+
+
+def get_recheck_delay(check_attempts: int) -> timedelta:
+    """
+    Возвращает задержку до следующей проверки поиска по номеру попытки.
+    """
+    intervals = settings.ORDER_SEARCH_RECHECK_INTERVALS
+    return timedelta(seconds=intervals[min(check_attempts, len(intervals) - 1)])
+
+
+async def claim_pending_searches(
+    session: AsyncSession,
+    worker_id: str,
+    limit: int = 100,
+    after_id: int = 0,
+    nm_ids: Optional[Sequence[int]] = None,
+    due_only: bool = True,
+    search_ids: Optional[Sequence[int]] = None,
+) -> list[int]:
+    """
+    Захватывает (арендует) страницу активных поисков для текущего воркера.
+
+    Строки блокируются через FOR UPDATE SKIP LOCKED, поэтому несколько
+    воркеров получают непересекающиеся страницы. Аренда истекает через
+    SEARCH_LEASE_TTL, после чего поиск снова доступен (например, если воркер упал).
+
+    Пагинация по ключу: захватываются поиски с id > after_id.
+    nm_ids - захватить только поиски, шаблон которых содержит один из артикулов
+    due_only - захватить только поиски, время проверки которых наступило
+    search_ids - захватить только указанные поиски
+    """
+    now = now_utc()
+
+    candidates = (
+        select(OrderSearchORM.id)
+        .where(
+            OrderSearchORM.status == OrderSearchStatus.PENDING,
+            OrderSearchORM.id > after_id,
+            or_(
+                OrderSearchORM.lease_expires_at.is_(None),
+                OrderSearchORM.lease_expires_at < now,
+            ),
+        )
+        .order_by(OrderSearchORM.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+
+    if due_only:
+        candidates = candidates.where(OrderSearchORM.next_check_at <= now)
+
+    if search_ids is not None:
+        candidates = candidates.where(OrderSearchORM.id.in_(search_ids))
+
+    if nm_ids is not None:
+        candidates = candidates.where(
+            OrderSearchORM.material_id.in_(
+                select(MaterialORM.id).where(
+                    MaterialORM.template_id.in_(
+                        select(WbArticleORM.template_id).where(
+                            WbArticleORM.wb_article.in_(nm_ids)
+                        )
+                    )
+                )
+            )
+        )
+
+    result = await session.execute(
+        update(OrderSearchORM)
+        .where(OrderSearchORM.id.in_(candidates.scalar_subquery()))
+        .values(lease_expires_at=now + SEARCH_LEASE_TTL, leased_by=worker_id)
+        .returning(OrderSearchORM.id)
+        .execution_options(synchronize_session=False)
+    )
+    search_ids = sorted(result.scalars().all())
+    await session.commit()
+
+    return search_ids
+
+
+async def release_searches(
+    session: AsyncSession,
+    worker_id: str,
+    search_ids: Sequence[int],
+) -> None:
+    """
+    Снимает аренду с поисков, захваченных текущим воркером.
+    """
+    if not search_ids:
+        return
+
+    await session.execute(
+        update(OrderSearchORM)
+        .where(
+            OrderSearchORM.id.in_(search_ids),
+            OrderSearchORM.leased_by == worker_id,
+        )
+        .values(lease_expires_at=None, leased_by=None)
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+
+
+async def enqueue_outcome_notifications(
+    session: AsyncSession, outcomes: Sequence[SearchOutcome]
+) -> None:
+    """
+    Добавляет уведомления по завершенным поискам в очередь отправки
+    в текущей транзакции. Уведомления администратору можно объединять.
+    """
+    user_notifications, admin_notifications = [], []
+    for outcome in outcomes:
+        if outcome.status:
+            user_notification, admin_notification = build_outcome_notifications(
+                outcome
+            )
+            user_notifications.append(user_notification)
+            admin_notifications.append(admin_notification)
+
+    outbox = NotificationOutboxRepository(session)
+    await outbox.add_notifications(user_notifications)
+    await outbox.add_notifications(admin_notifications, coalesce=True)
+
+
+async def expire_timed_out_searches(
+    session: AsyncSession, notify: bool = True
+) -> list[SearchOutcome]:
+    """
+    Переводит все активные поиски старше SEARCH_TTL в статус TIMEOUT
+    одним запросом UPDATE ... RETURNING, без поиска заказов.
+
+    Поиски, которые сейчас проверяются другим воркером, пропускаются.
+    notify - поставить уведомления в очередь отправки в той же транзакции
+    """
+    now = now_utc()
+
+    expired_ids = (
+        select(OrderSearchORM.id)
+        .where(
+            OrderSearchORM.status == OrderSearchStatus.PENDING,
+            OrderSearchORM.created_at < now - SEARCH_TTL,
+            or_(
+                OrderSearchORM.lease_expires_at.is_(None),
+                OrderSearchORM.lease_expires_at < now,
+            ),
+        )
+        .with_for_update(skip_locked=True)
+    )
+
+    expired = (
+        update(OrderSearchORM)
+        .where(OrderSearchORM.id.in_(expired_ids.scalar_subquery()))
+        .values(
+            status=OrderSearchStatus.TIMEOUT,
+            last_checked_at=now,
+            lease_expires_at=None,
+            leased_by=None,
+        )
+        .returning(
+            OrderSearchORM.id,
+            OrderSearchORM.material_id,
+            OrderSearchORM.search_type,
+            OrderSearchORM.filters,
+            OrderSearchORM.created_at,
+            OrderSearchORM.check_attempts,
+        )
+        .cte("expired")
+    )
+
+    query = (
+        select(
+            expired.c.id,
+            expired.c.material_id,
+            expired.c.search_type,
+            expired.c.filters,
+            expired.c.created_at,
+            expired.c.check_attempts,
+            MaterialORM.template_id,
+            TemplateORM.category_id,
+            UserORM.id.label("user_id"),
+            UserORM.first_name.label("user_first_name"),
+            UserORM.username.label("user_username"),
+        )
+        .join(MaterialORM, MaterialORM.id == expired.c.material_id)
+        .join(UserORM, UserORM.id == MaterialORM.user_id)
+        .join(TemplateORM, TemplateORM.id == MaterialORM.template_id)
+        .order_by(expired.c.id)
+    )
+
+    result = await session.execute(query)
+    outcomes = [
+        SearchOutcome(
+            search=SearchContext.model_validate(row._asdict()),
+            status=OrderSearchStatus.TIMEOUT,
+        )
+        for row in result.all()
+    ]
+
+    if notify:
+        await enqueue_outcome_notifications(session, outcomes)
+
+    await session.commit()
+
+    return outcomes
+
+
+async def load_searches(
+    session: AsyncSession,
+    search_ids: Sequence[int],
+) -> list[SearchContext]:
+    """
+    Загружает активные поиски вместе с материалом, пользователем,
+    шаблоном, категорией и списком nm_id одним запросом.
+    """
+    if not search_ids:
+        return []
+
+    # Артикул может быть добавлен в шаблон дважды (нет уникального индекса):
+    # без DISTINCT один заказ попадет в кандидаты поиска несколько раз
+    template_nm_ids = func.array_agg(WbArticleORM.wb_article.distinct()).filter(
+        WbArticleORM.wb_article.is_not(None)
+    )
+
+    query = (
+        select(
+            OrderSearchORM.id,
+            OrderSearchORM.material_id,
+            OrderSearchORM.search_type,
+            OrderSearchORM.filters,
+            OrderSearchORM.created_at,
+            OrderSearchORM.check_attempts,
+            MaterialORM.template_id,
+            TemplateORM.category_id,
+            CategoryORM.folder_name.label("category_folder_name"),
+            UserORM.id.label("user_id"),
+            UserORM.first_name.label("user_first_name"),
+            UserORM.username.label("user_username"),
+            template_nm_ids.label("nm_ids"),
+        )
+        .join(MaterialORM, MaterialORM.id == OrderSearchORM.material_id)
+        .join(UserORM, UserORM.id == MaterialORM.user_id)
+        .join(TemplateORM, TemplateORM.id == MaterialORM.template_id)
+        .join(CategoryORM, CategoryORM.id == TemplateORM.category_id)
+        .outerjoin(WbArticleORM, WbArticleORM.template_id == TemplateORM.id)
+        .where(
+            OrderSearchORM.id.in_(search_ids),
+            OrderSearchORM.status == OrderSearchStatus.PENDING,
+        )
+        .group_by(
+            OrderSearchORM.id,
+            MaterialORM.template_id,
+            TemplateORM.category_id,
+            CategoryORM.folder_name,
+            UserORM.id,
+        )
+        .order_by(OrderSearchORM.id)
+    )
+
+    result = await session.execute(query)
+
+    return [
+        SearchContext.model_validate({**row._asdict(), "nm_ids": row.nm_ids or []})
+        for row in result.all()
+    ]
+
+
+def _build_search_params(
+    search: SearchContext, region_aliases: dict[str, str]
+) -> list[dict]:
+    """
+    Строит строки таблицы параметров поиска: по одной на каждый nm_id шаблона.
+    """
+    filters = search.filters
+    params = {
+        "search_id": search.id,
+        "search_type": search.search_type,
+        "date_from": None,
+        "date_to": None,
+        "country": None,
+        "region_code": None,
+        "receipt_number": None,
+    }
+
+    if search.search_type == "RECEIPT_NUMBER":
+        params["receipt_number"] = filters["receipt_number"]
+    else:
+        date_obj = parse_datetime_with_offset(filters["order_datetime"])
+        params["date_from"] = date_obj - ORDER_TIME_WINDOW
+        params["date_to"] = date_obj + ORDER_TIME_WINDOW
+
+        if search.search_type == "COUNTRY":
+            params["country"] = filters["country"]
+        elif search.search_type == "REGION":
+            params["region_code"] = resolve_region_code(
+                filters["recipient_region"], region_aliases
+            )
+        else:
+            raise ValueError(f"Unknown search type: {search.search_type}")
+
+    return [{**params, "nm_id": nm_id} for nm_id in dict.fromkeys(search.nm_ids)]
+
+
+async def find_candidate_orders(
+    session: AsyncSession,
+    searches: Sequence[SearchContext],
+) -> dict[int, list[CandidateOrder]]:
+    """
+    Находит заказы-кандидаты сразу для всей страницы поисков одним запросом.
+
+    Параметры поисков передаются как VALUES и соединяются с wb_orders
+    по nm_id, временному окну и коду региона/стране (или номеру чека)
+    с использованием индексов (nm_id, created_at), region_code и lower(country_name).
+    """
+    region_aliases = await RegionRepository(session).get_alias_map()
+
+    rows = []
+    for search in searches:
+        try:
+            rows.extend(_build_search_params(search, region_aliases))
+        except (ValueError, KeyError) as e:
+            log.error(
+                "Ошибка в параметрах поиска %s: %s", search.id, e, exc_info=True
+            )
+
+    candidates: dict[int, list[CandidateOrder]] = defaultdict(list)
+
+    if not rows:
+        return candidates
+
+    search_params = values(
+        column("search_id", Integer),
+        column("nm_id", BigInteger),
+        column("search_type", String),
+        column("date_from", DateTime),
+        column("date_to", DateTime),
+        column("country", String),
+        column("region_code", String),
+        column("receipt_number", String),
+        name="search_params",
+    ).data(
+        [
+            (
+                row["search_id"],
+                row["nm_id"],
+                row["search_type"],
+                row["date_from"],
+                row["date_to"],
+                row["country"],
+                row["region_code"],
+                row["receipt_number"],
+            )
+            for row in rows
+        ]
+    )
+    p = search_params.c
+
+    time_filter = and_(
+        WbOrderORM.is_cancel == False,
+        WbOrderORM.created_at.between(p.date_from, p.date_to),
+    )
+
+    match_filter = or_(
+        and_(
+            p.search_type == "RECEIPT_NUMBER",
+            WbOrderORM.id == p.receipt_number,
+        ),
+        and_(
+            p.search_type == "COUNTRY",
+            time_filter,
+            func.lower(WbOrderORM.country_name) == func.lower(p.country),
+        ),
+        and_(
+            p.search_type == "REGION",
+            time_filter,
+            WbOrderORM.region_code == p.region_code,
+        ),
+    )
+
+    query = (
+        select(
+            p.search_id,
+            WbOrderORM.id,
+            WbOrderORM.nm_id,
+            WbOrderORM.region_name,
+            WbOrderORM.country_name,
+            WbOrderORM.supplier_article,
+            WbOrderORM.created_at,
+            WbOrderORM.is_cancel,
+            WbOrderORM.warehouse_type,
+            WbOrderORM.material_id,
+            WbAssemblyTaskORM.id.label("assembly_task_id"),
+        )
+        .select_from(search_params)
+        .join(WbOrderORM, and_(WbOrderORM.nm_id == p.nm_id, match_filter))
+        .outerjoin(WbAssemblyTaskORM, WbAssemblyTaskORM.wb_order_id == WbOrderORM.id)
+        .order_by(p.search_id, WbOrderORM.created_at)
+    )
+
+    result = await session.execute(query)
+
+    for row in result.all():
+        candidates[row.search_id].append(CandidateOrder.model_validate(row._asdict()))
+
+    return candidates
+
+
+def search_overlaps_orders(
+    search: SearchContext, orders: Sequence[NewWbOrderDTO]
+) -> bool:
+    """
+    Проверяет, может ли хотя бы один из новых заказов подойти под поиск
+    (по nm_id и временному окну или по номеру чека).
+    """
+    try:
+        if search.search_type == "RECEIPT_NUMBER":
+            receipt_number = search.filters["receipt_number"]
+            return any(order.id == receipt_number for order in orders)
+
+        date_obj = parse_datetime_with_offset(search.filters["order_datetime"])
+    except (ValueError, KeyError):
+        return False
+
+    nm_ids = set(search.nm_ids)
+    return any(
+        order.nm_id in nm_ids
+        and abs(order.created_at.replace(tzinfo=None) - date_obj) <= ORDER_TIME_WINDOW
+        for order in orders
+    )
+
+
+def _get_target_time(search: SearchContext) -> Optional[datetime]:
+    """Время заказа, указанное пользователем (для поиска по чеку - None)"""
+    if search.search_type == "RECEIPT_NUMBER":
+        return None
+    try:
+        return parse_datetime_with_offset(search.filters["order_datetime"])
+    except (ValueError, KeyError):
+        return None
+
+
+def resolve_outcomes(
+    searches: Sequence[SearchContext],
+    candidates: dict[int, list[CandidateOrder]],
+) -> list[SearchOutcome]:
+    """
+    Определяет новый статус каждого поиска по найденным кандидатам.
+
+    При нескольких кандидатах выбирается лучший, если его отрыв от следующего
+    по доказательствам (время, регион) не меньше ORDER_SEARCH_SCORE_MIN_MARGIN,
+    иначе FOUND_MULTIPLE.
+
+    Один заказ не может быть привязан к двум поискам из одной страницы:
+    повторное совпадение получает статус FOUND_BUT_LINKED.
+    """
+    outcomes = []
+    linked_order_ids = set()
+
+    scores = score_candidates(
+        searches,
+        candidates,
+        target_times={s.id: _get_target_time(s) for s in searches},
+        time_window=ORDER_TIME_WINDOW,
+    )
+
+    for search in searches:
+        orders = candidates.get(search.id, [])
+        outcome = SearchOutcome(
+            search=search, candidates=orders, scores=scores.get(search.id, [])
+        )
+        outcomes.append(outcome)
+
+        if not orders:
+            continue
+
+        if len(orders) > 1:
+            best_order_id = pick_best_candidate(
+                outcome.scores, settings.ORDER_SEARCH_SCORE_MIN_MARGIN
+            )
+
+            if not best_order_id:
+                outcome.status = OrderSearchStatus.FOUND_MULTIPLE
+                continue
+
+            order = next(o for o in orders if o.id == best_order_id)
+        else:
+            order = orders[0]
+
+        if not order.assembly_task_id:
+            continue
+
+        outcome.order = order
+
+        if order.material_id or order.id in linked_order_ids:
+            outcome.status = OrderSearchStatus.FOUND_BUT_LINKED
+        elif order.warehouse_type == "Склад WB":
+            outcome.status = OrderSearchStatus.FOUND_IN_OTHER_WAREHOUSE
+        elif order.is_cancel:
+            outcome.status = OrderSearchStatus.CANCELED
+        else:
+            outcome.status = OrderSearchStatus.FOUND
+            linked_order_ids.add(order.id)
+
+    return outcomes
+
+
+async def apply_outcomes(
+    session: AsyncSession,
+    worker_id: str,
+    outcomes: Sequence[SearchOutcome],
+    notify: bool = True,
+) -> list[SearchOutcome]:
+    """
+    Сохраняет результаты проверки страницы поисков в одной транзакции
+    и снимает с них аренду.
+
+    Результаты поисков, аренда которых уже перешла к другому воркеру,
+    отбрасываются. Для поисков, оставшихся в ожидании, планируется
+    следующая проверка. Возвращает сохраненные результаты.
+
+    notify - поставить уведомления по завершенным поискам в очередь отправки
+    """
+    if not outcomes:
+        return []
+
+    now = now_utc()
+
+    result = await session.execute(
+        update(OrderSearchORM)
+        .where(
+            OrderSearchORM.id.in_([o.search.id for o in outcomes]),
+            OrderSearchORM.leased_by == worker_id,
+        )
+        .values(
+            last_checked_at=now,
+            check_attempts=OrderSearchORM.check_attempts + 1,
+            lease_expires_at=None,
+            leased_by=None,
+        )
+        .returning(OrderSearchORM.id)
+        .execution_options(synchronize_session=False)
+    )
+    owned_ids = set(result.scalars().all())
+    outcomes = [o for o in outcomes if o.search.id in owned_ids]
+
+    links = [o for o in outcomes if o.status == OrderSearchStatus.FOUND]
+
+    if links:
+        link_values = values(
+            column("order_id", String),
+            column("material_id", Integer),
+            name="links",
+        ).data([(o.order.id, o.search.material_id) for o in links])
+
+        result = await session.execute(
+            update(WbOrderORM)
+            .where(
+                WbOrderORM.id == link_values.c.order_id,
+                WbOrderORM.material_id.is_(None),
+            )
+            .values(material_id=link_values.c.material_id)
+            .returning(WbOrderORM.id)
+            .execution_options(synchronize_session=False)
+        )
+        linked_ids = set(result.scalars().all())
+
+        # Заказ успели связать с другим материалом
+        for outcome in links:
+            if outcome.order.id not in linked_ids:
+                outcome.status = OrderSearchStatus.FOUND_BUT_LINKED
+
+    rows = []
+    for outcome in outcomes:
+        search = outcome.search
+        next_check_at = None
+        if not outcome.status:
+            next_check_at = min(
+                now + get_recheck_delay(search.check_attempts),
+                search.created_at + SEARCH_TTL,
+            )
+
+        rows.append(
+            (
+                search.id,
+                outcome.status,
+                next_check_at,
+                # Оценки кандидатов сохраняются для аудита выбора
+                [s.model_dump() for s in outcome.scores] if outcome.scores else None,
+            )
+        )
+
+    if rows:
+        result_values = values(
+            column("search_id", Integer),
+            column("status", String),
+            column("next_check_at", DateTime),
+            column("match_scores", JSON(none_as_null=True)),
+            name="results",
+        ).data(rows)
+        r = result_values.c
+
+        # NULL в строке результата - значение поиска не меняется
+        await session.execute(
+            update(OrderSearchORM)
+            .where(OrderSearchORM.id == r.search_id)
+            .values(
+                status=func.coalesce(r.status, OrderSearchORM.status),
+                next_check_at=func.coalesce(
+                    r.next_check_at, OrderSearchORM.next_check_at
+                ),
+                match_scores=func.coalesce(
+                    r.match_scores, OrderSearchORM.match_scores
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    if notify:
+        await enqueue_outcome_notifications(session, outcomes)
+
+    await session.commit()
+
+    return outcomes
+
+
+async def match_searches(
+    session: AsyncSession,
+    worker_id: str,
+    searches: Sequence[SearchContext],
+    notify: bool = True,
+) -> list[SearchOutcome]:
+    """
+    Сопоставляет поиски с заказами и сохраняет результаты.
+    """
+    candidates = await find_candidate_orders(session, searches)
+    outcomes = resolve_outcomes(searches, candidates)
+
+    return await apply_outcomes(session, worker_id, outcomes, notify=notify)
+
+
+async def match_claimed_searches(
+    session: AsyncSession,
+    worker_id: str,
+    search_ids: Sequence[int],
+    orders: Optional[Sequence[NewWbOrderDTO]] = None,
+    notify: bool = True,
+) -> list[SearchOutcome]:
+    """
+    Проверяет захваченные поиски. При ошибке аренда снимается,
+    чтобы поиски сразу стали доступны другим воркерам.
+
+    orders - проверять только поиски, под которые могут подойти эти заказы
+    notify - поставить уведомления по завершенным поискам в очередь отправки
+    """
+    try:
+        searches = await load_searches(session, search_ids)
+
+        if orders is not None:
+            searches = [s for s in searches if search_overlaps_orders(s, orders)]
+
+        outcomes = await match_searches(session, worker_id, searches, notify=notify)
+    except Exception:
+        await session.rollback()
+        await release_searches(session, worker_id, search_ids)
+        raise
+
+    await release_searches(session, worker_id, search_ids)
+
+    return outcomes
+
+
+async def match_pending_searches(
+    session: AsyncSession,
+    worker_id: str,
+    limit: int = 100,
+    after_id: int = 0,
+    due_only: bool = True,
+) -> Optional[tuple[list[SearchOutcome], int]]:
+    """
+    Захватывает и проверяет одну страницу активных поисков,
+    время проверки которых наступило (due_only=False - всех активных поисков).
+
+    Возвращает результаты по каждому поиску страницы и id последнего
+    захваченного поиска или None, если свободных активных поисков больше нет.
+    """
+    search_ids = await claim_pending_searches(
+        session, worker_id, limit=limit, after_id=after_id, due_only=due_only
+    )
+
+    if not search_ids:
+        return None
+
+    outcomes = await match_claimed_searches(session, worker_id, search_ids)
+
+    return outcomes, search_ids[-1]
+
+
+async def match_searches_for_new_orders(
+    session: AsyncSession,
+    worker_id: str,
+    orders: Sequence[NewWbOrderDTO],
+    limit: int = 100,
+) -> list[SearchOutcome]:
+    """
+    Проверяет только те активные поиски, под которые могут подойти новые заказы.
+    """
+    nm_ids = list({order.nm_id for order in orders})
+    outcomes = []
+    after_id = 0
+
+    while True:
+        search_ids = await claim_pending_searches(
+            session,
+            worker_id,
+            limit=limit,
+            after_id=after_id,
+            nm_ids=nm_ids,
+            due_only=False,
+        )
+
+        if not search_ids:
+            return outcomes
+
+        after_id = search_ids[-1]
+        outcomes.extend(
+            await match_claimed_searches(session, worker_id, search_ids, orders)
+        )
+
+
+async def match_search_now(
+    session: AsyncSession,
+    worker_id: str,
+    search_id: int,
+) -> Optional[SearchOutcome]:
+    """
+    Синхронно проверяет один поиск (например, сразу после его создания).
+    Уведомления о результате отправляет вызывающий код.
+
+    Возвращает результат проверки или None, если поиск сейчас
+    проверяется другим воркером.
+    """
+    search_ids = await claim_pending_searches(
+        session, worker_id, due_only=False, search_ids=[search_id]
+    )
+
+    if not search_ids:
+        return None
+
+    outcomes = await match_claimed_searches(
+        session, worker_id, search_ids, notify=False
+    )
+
+    return outcomes[0] if outcomes else None
@@ -0,0 +1,126 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Optional, Sequence
+
+import numpy as np
+
+from src.application.dto.order_search.search_outcome import (
+    CandidateOrder,
+    CandidateScore,
+    SearchContext,
+)
+from src.domain.wb_orders.normalizers import normalize_region
+
+# Веса признаков-доказательств (насколько заказ совпадает с указанным
+# пользователем): близость по времени, точность совпадения региона/страны
+EVIDENCE_WEIGHTS = np.array([0.5, 0.15])
+
+# Веса признаков-предпочтений: наш склад, заказ не связан с материалом,
+# есть сборочное задание. Влияют только на порядок кандидатов с равными
+# доказательствами, но не на автоматический выбор
+PREFERENCE_WEIGHTS = np.array([0.1, 0.1, 0.05])
+
+
+def _region_match_strength(search: SearchContext, order: CandidateOrder) -> float:
+    """
+    1.0 - название региона/страны совпадает с указанным пользователем,
+    0.5 - совпадение только по синониму (коду региона)
+    """
+    filters = search.filters
+
+    if search.search_type == "REGION":
+        expected = normalize_region(filters.get("recipient_region") or "")
+        return 1.0 if normalize_region(order.region_name) == expected else 0.5
+
+    if search.search_type == "COUNTRY":
+        expected = filters.get("country") or ""
+        return 1.0 if order.country_name.lower() == expected.lower() else 0.5
+
+    return 1.0
+
+
+def score_candidates(
+    searches: Sequence[SearchContext],
+    candidates: dict[int, list[CandidateOrder]],
+    target_times: dict[int, Optional[datetime]],
+    time_window: timedelta,
+) -> dict[int, list[CandidateScore]]:
+    """
+    Оценивает всех кандидатов страницы поисков одним векторным проходом.
+
+    target_times - время заказа, указанное пользователем, по id поиска
+
+    Возвращает оценки по id поиска, отсортированные по убыванию доказательств,
+    при равенстве - по общей оценке.
+    Оцениваются только поиски с несколькими кандидатами.
+    """
+    rows = [
+        (search, order)
+        for search in searches
+        if len(candidates.get(search.id, [])) > 1
+        for order in candidates[search.id]
+    ]
+
+    if not rows:
+        return {}
+
+    window = time_window.total_seconds()
+
+    time_delta = np.array(
+        [
+            (
+                abs((order.created_at - target_times[search.id]).total_seconds())
+                if target_times.get(search.id)
+                else 0.0
+            )
+            for search, order in rows
+        ]
+    )
+    region_strength = np.array([_region_match_strength(s, o) for s, o in rows])
+    own_warehouse = np.array([o.warehouse_type != "Склад WB" for _, o in rows])
+    not_linked = np.array([o.material_id is None for _, o in rows])
+    has_assembly_task = np.array([o.assembly_task_id is not None for _, o in rows])
+
+    evidence = np.column_stack(
+        [
+            np.clip(1.0 - time_delta / window, 0.0, 1.0),
+            region_strength,
+        ]
+    ).astype(float) @ EVIDENCE_WEIGHTS
+    preference = np.column_stack(
+        [own_warehouse, not_linked, has_assembly_task]
+    ).astype(float) @ PREFERENCE_WEIGHTS
+
+    result: dict[int, list[CandidateScore]] = defaultdict(list)
+    for (search, order), order_evidence, order_preference, delta in zip(
+        rows, evidence, preference, time_delta
+    ):
+        result[search.id].append(
+            CandidateScore(
+                order_id=order.id,
+                score=round(float(order_evidence + order_preference), 4),
+                evidence=round(float(order_evidence), 4),
+                time_delta=float(delta) if target_times.get(search.id) else None,
+            )
+        )
+
+    for search_scores in result.values():
+        search_scores.sort(key=lambda s: (s.evidence, s.score), reverse=True)
+
+    return result
+
+
+def pick_best_candidate(
+    scores: Sequence[CandidateScore], min_margin: float
+) -> Optional[str]:
+    """
+    Возвращает id лучшего заказа, если его отрыв от второго по доказательствам
+    (без предпочтений) не меньше min_margin, иначе None.
+    """
+    if len(scores) < 2:
+        return scores[0].order_id if scores else None
+
+    if scores[0].evidence - scores[1].evidence >= min_margin:
+        return scores[0].order_id
+
+    return None
@@ -0,0 +1,52 @@
+import logging
+import os
+import socket
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.application.dto.order_search.search_outcome import SearchOutcome
+from src.application.order_search.matcher import match_search_now
+from src.core.enums.order_search import OrderSearchStatus
+from src.infrastructure.rabbitmq.producer import send_to_queue
+
+log = logging.getLogger(__name__)
+
+
+class InstantMatchOrderSearchUseCase:
+    """
+    Пытается сразу сопоставить только что созданный поиск с заказом.
+    Если заказ не найден, поиск остается в ожидании и будет проверен воркером.
+    """
+
+    worker_id = f"bot:{socket.gethostname()}:{os.getpid()}"
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def execute(self, order_search_id: int) -> Optional[SearchOutcome]:
+        try:
+            outcome = await match_search_now(
+                self.session, worker_id=self.worker_id, search_id=order_search_id
+            )
+        except Exception as e:
+            log.error(
+                "Ошибка при мгновенной проверке поиска %s: %s",
+                order_search_id,
+                e,
+                exc_info=True,
+            )
+            return None
+
+        if not outcome or not outcome.status:
+            return None
+
+        if outcome.status == OrderSearchStatus.FOUND:
+            await send_to_queue(
+                queue_name="processing_supply",
+                data={
+                    "assembly_task_id": outcome.order.assembly_task_id,
+                },
+            )
+
+        return outcome
@@ -2,7 +2,9 @@ from src.application.exceptions.supply_excptions import (
     SupplyNotFoundError,
     SupplyAlreadyClosedError,
 )
+from src.core.config.settings import settings
 from src.database.repositories import SupplyRepository
+from src.infrastructure.rabbitmq.producer import send_to_queue
 
 
 class CloseSupplyUseCase:
@@ -16,5 +18,15 @@ class CloseSupplyUseCase:
         if supply.is_inactive():
             raise SupplyAlreadyClosedError()
         supply.close()
-        await self.repo.update(supply)
+        if not await self.repo.close(supply.id):
+            raise SupplyAlreadyClosedError()
+
+        # Стикеры закрытой поставки печатаются одним листом
+        # (workers/supply_worker/sticker_sheet.py). Сообщение отправляется
+        # после фиксации: воркер должен увидеть поставку закрытой
+        if settings.WB_STICKER_SHEETS:
+            await send_to_queue(
+                queue_name="supply_sticker_sheet",
+                data={"supply_id": supply.id},
+            )
         return supply
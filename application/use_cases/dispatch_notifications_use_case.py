@@ -0,0 +1,203 @@
+import asyncio
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from aiogram.exceptions import (
+    TelegramRetryAfter,
+    TelegramForbiddenError,
+    TelegramBadRequest,
+)
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.core.utils.time import now_utc
+from src.database.models import NotificationOutboxORM
+from src.database.repositories import NotificationOutboxRepository
+from src.notification_service.entities import NotificationMessage
+from src.notification_service.services.rate_limiter import TelegramRateLimiter
+from src.notification_service.services.telegram_notifier import TelegramNotifier
+
+log = logging.getLogger(__name__)
+
+NOTIFICATION_LEASE = timedelta(minutes=2)
+"""Время, на которое захваченные уведомления скрываются от других воркеров"""
+
+MAX_ATTEMPTS = 5
+"""Попыток отправки до перевода уведомления в FAILED"""
+
+MAX_MESSAGE_LENGTH = 4096
+COALESCE_SEPARATOR = "\n\n➖➖➖\n\n"
+
+
+@dataclass
+class OutgoingMessage:
+    """Сообщение к отправке: одно уведомление или несколько объединенных"""
+
+    notification: NotificationMessage
+    ids: list[int]
+    attempts: int
+
+
+@dataclass
+class DispatchResult:
+    sent_ids: list[int] = field(default_factory=list)
+    # {error: ids}
+    failed: dict[str, list[int]] = field(default_factory=lambda: defaultdict(list))
+    # [(задержка, error, ids)]
+    retries: list[tuple[float, str, list[int]]] = field(default_factory=list)
+
+
+def coalesce_notifications(
+    notifications: list[NotificationOutboxORM],
+) -> list[OutgoingMessage]:
+    """
+    Объединяет подряд идущие текстовые уведомления без кнопок в один чат
+    (и тему) в сообщения длиной до MAX_MESSAGE_LENGTH.
+    """
+    messages: list[OutgoingMessage] = []
+
+    for row in notifications:
+        notification = NotificationMessage.model_validate(row.payload)
+        last = messages[-1] if messages else None
+
+        can_merge = (
+            row.coalesce
+            and notification.type == "text"
+            and not notification.buttons
+            and last is not None
+            and last.notification.type == "text"
+            and not last.notification.buttons
+            and last.notification.chat_id == notification.chat_id
+            and last.notification.message_thread_id == notification.message_thread_id
+            and len(last.notification.text or "")
+            + len(COALESCE_SEPARATOR)
+            + len(notification.text or "")
+            <= MAX_MESSAGE_LENGTH
+        )
+
+        if can_merge:
+            last.notification.text += COALESCE_SEPARATOR + (notification.text or "")
+            last.ids.append(row.id)
+            last.attempts = max(last.attempts, row.attempts)
+        else:
+            messages.append(
+                OutgoingMessage(
+                    notification=notification,
+                    ids=[row.id],
+                    attempts=row.attempts,
+                )
+            )
+
+    return messages
+
+
+def get_retry_delay(attempts: int) -> float:
+    return min(5 * 2**attempts, 600)
+
+
+class DispatchNotificationsUseCase:
+    """
+    Отправляет уведомления из notification_outbox.
+
+    Сообщения в один чат отправляются последовательно, в разные чаты -
+    параллельно (не более concurrency чатов), с соблюдением лимитов Telegram.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        notifier: TelegramNotifier,
+        rate_limiter: TelegramRateLimiter,
+        concurrency: int = 20,
+    ):
+        self.session_factory = session_factory
+        self.notifier = notifier
+        self.rate_limiter = rate_limiter
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    async def execute(self, limit: int = 100) -> int:
+        """
+        Отправляет одну пачку уведомлений.
+
+        :return: количество захваченных уведомлений
+        """
+        async with self.session_factory() as session:
+            notifications = await NotificationOutboxRepository(session).claim_pending(
+                limit=limit, lease=NOTIFICATION_LEASE
+            )
+
+        if not notifications:
+            return 0
+
+        by_chat: dict[int, list[NotificationOutboxORM]] = defaultdict(list)
+        for row in notifications:
+            by_chat[row.chat_id].append(row)
+
+        result = DispatchResult()
+        await asyncio.gather(
+            *(
+                self._send_chat(chat_id, coalesce_notifications(rows), result)
+                for chat_id, rows in by_chat.items()
+            )
+        )
+
+        await self._save_result(result)
+
+        log.info(
+            "Уведомлений отправлено: %s, отложено: %s, с ошибкой: %s",
+            len(result.sent_ids),
+            sum(len(ids) for _, _, ids in result.retries),
+            sum(len(ids) for ids in result.failed.values()),
+        )
+
+        return len(notifications)
+
+    async def _send_chat(
+        self, chat_id: int, messages: list[OutgoingMessage], result: DispatchResult
+    ):
+        async with self.semaphore:
+            for i, message in enumerate(messages):
+                await self.rate_limiter.acquire(chat_id)
+
+                try:
+                    sent = await self.notifier.send(
+                        message.notification, raise_errors=True
+                    )
+                except TelegramRetryAfter as e:
+                    # Остальные сообщения в чат откладываются вместе с текущим,
+                    # чтобы сохранить порядок
+                    self.rate_limiter.pause(chat_id, e.retry_after)
+                    for rest in messages[i:]:
+                        result.retries.append((e.retry_after, str(e), rest.ids))
+                    return
+                except (TelegramForbiddenError, TelegramBadRequest) as e:
+                    result.failed[str(e)].extend(message.ids)
+                    continue
+                except Exception as e:
+                    if message.attempts >= MAX_ATTEMPTS:
+                        result.failed[str(e)].extend(message.ids)
+                    else:
+                        result.retries.append(
+                            (get_retry_delay(message.attempts), str(e), message.ids)
+                        )
+                    continue
+
+                if sent:
+                    result.sent_ids.extend(message.ids)
+                else:
+                    result.failed["Неверный тип уведомления"].extend(message.ids)
+
+    async def _save_result(self, result: DispatchResult):
+        now = now_utc()
+
+        async with self.session_factory() as session:
+            outbox = NotificationOutboxRepository(session)
+
+            await outbox.mark_sent(result.sent_ids)
+
+            for error, ids in result.failed.items():
+                await outbox.mark_failed(ids, error)
+
+            for delay, error, ids in result.retries:
+                await outbox.reschedule(ids, now + timedelta(seconds=delay), error)
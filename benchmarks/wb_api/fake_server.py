@@ -0,0 +1,354 @@
+"""
+Локальный сервер, заменяющий WB API в бенчмарках и нагрузочных тестах
+синхронизации (workers/wb_data) и поставок (workers/supply_worker).
+
+Реализует используемые методы:
+    GET   /api/v1/supplier/orders                         отчет о заказах (dateFrom, flag)
+    GET   /api/v3/orders/new                              новые сборочные задания
+    POST  /api/v3/orders/status                           статусы сборочных заданий
+    POST  /api/v3/supplies                                создание поставки
+    PATCH /api/v3/supplies/{supply}/orders/{order}        добавление задания в поставку
+    POST  /api/v3/orders/stickers                         стикеры сборочных заданий
+
+Данные генерируются детерминированно (--seed) в заданном объеме или берутся
+из фикстур, записанных recorder.py (--fixtures). Задержка ответа
+и доля ответов 429/5xx настраиваются.
+
+Служебные методы:
+    GET  /__stats   количество запросов по методам и кодам ответа
+    POST /__reset   сброс статистики
+
+Пример:
+    python -m src.benchmarks.wb_api.fake_server --orders 200000 --latency-ms 150 --error-429 0.02
+
+Воркеры направляются на сервер переменными окружения:
+    WB_STATISTICS_API_URL=http://localhost:8081
+    WB_MARKETPLACE_API_URL=http://localhost:8081
+"""
+
+import argparse
+import asyncio
+import bisect
+import gzip
+import itertools
+import json
+import logging
+import os
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+
+from aiohttp import web
+
+from src.infrastructure.wb_service.gateway import ORDERS_REPORT_LIMIT
+
+log = logging.getLogger(__name__)
+
+REGIONS = [
+    "Московская область",
+    "Ленинградская область",
+    "Краснодарский край",
+    "Свердловская область",
+    "Республика Татарстан",
+    "Новосибирская область",
+]
+COUNTRIES = ["Россия", "Казахстан", "Беларусь"]
+
+# PNG 1x1 вместо изображения стикера
+STICKER_PNG = (
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+
+ASSEMBLY_TASK_ID_OFFSET = 1_000_000_000
+
+FIXTURE_ENDPOINTS = (
+    "orders_report",
+    "new_assembly_tasks",
+    "assembly_task_statuses",
+    "stickers",
+)
+
+
+def format_date(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def load_fixture(directory: str, endpoint: str):
+    """Тело ответа из фикстуры recorder.py или None"""
+    path = os.path.join(directory, f"{endpoint}.json.gz")
+    if not os.path.exists(path):
+        return None
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        fixture = json.load(f)
+
+    if not 200 <= fixture["status"] < 300:
+        log.warning("Фикстура %s записана с ошибкой %s", endpoint, fixture["status"])
+        return None
+
+    return fixture["body"]
+
+
+class FakeWbData:
+    """
+    Заказы, сборочные задания и статусы, которые отдает сервер.
+
+    Заказы отсортированы по lastChangeDate, поэтому выборка отчета
+    с dateFrom - бинарный поиск.
+    """
+
+    def __init__(self, args):
+        self.rnd = random.Random(args.seed)
+        self.cancel_rate = args.cancel_rate
+        self.changes_per_request = args.changes_per_request
+
+        fixtures = {
+            endpoint: load_fixture(args.fixtures, endpoint) if args.fixtures else None
+            for endpoint in FIXTURE_ENDPOINTS
+        }
+
+        self.orders = fixtures["orders_report"] or self.generate_orders(args)
+        self.orders.sort(key=lambda order: order["lastChangeDate"])
+        self.change_dates = [order["lastChangeDate"] for order in self.orders]
+
+        new_tasks = fixtures["new_assembly_tasks"]
+        self.new_tasks = (
+            new_tasks["orders"] if new_tasks else self.generate_new_tasks(args)
+        )
+
+        statuses = fixtures["assembly_task_statuses"]
+        self.statuses = {
+            status["id"]: status for status in (statuses or {}).get("orders", [])
+        }
+
+        stickers = fixtures["stickers"]
+        self.sticker_file = (
+            stickers["stickers"][0]["file"]
+            if stickers and stickers.get("stickers")
+            else STICKER_PNG
+        )
+
+        self.supply_ids = itertools.count(1)
+
+    def generate_orders(self, args) -> list[dict]:
+        now = datetime.now()
+        orders = []
+
+        for i in range(args.orders):
+            created_at = now - timedelta(
+                seconds=self.rnd.randint(0, args.days * 24 * 3600)
+            )
+            is_cancel = self.rnd.random() < self.cancel_rate
+            orders.append(
+                {
+                    "srid": f"fake.{args.seed}.{i:09d}",
+                    "date": format_date(created_at),
+                    "lastChangeDate": format_date(
+                        min(
+                            created_at
+                            + timedelta(minutes=self.rnd.randint(0, 120)),
+                            now,
+                        )
+                    ),
+                    "countryName": self.rnd.choice(COUNTRIES),
+                    "regionName": self.rnd.choice(REGIONS),
+                    "supplierArticle": f"ART-{self.rnd.randint(1, args.nm_ids)}",
+                    "nmId": 100_000 + self.rnd.randint(1, args.nm_ids),
+                    "isCancel": is_cancel,
+                    "cancelDate": (
+                        format_date(created_at + timedelta(hours=1))
+                        if is_cancel
+                        else "0001-01-01T00:00:00"
+                    ),
+                    "warehouseName": "Склад продавца",
+                    "warehouseType": "Склад продавца",
+                }
+            )
+
+        return orders
+
+    def generate_new_tasks(self, args) -> list[dict]:
+        if not args.new_tasks:
+            return []
+
+        # Новые задания - по последним заказам
+        latest = sorted(self.orders, key=lambda order: order["date"])
+        return [
+            {
+                "id": ASSEMBLY_TASK_ID_OFFSET + i,
+                "rid": order["srid"],
+                "createdAt": order["date"],
+            }
+            for i, order in enumerate(latest[-args.new_tasks :])
+        ]
+
+    def apply_changes(self):
+        """
+        Изменяет случайные заказы (отмена), чтобы инкрементальная
+        синхронизация получала обновления.
+        """
+        if not self.changes_per_request or not self.orders:
+            return
+
+        now = format_date(datetime.now())
+        for _ in range(self.changes_per_request):
+            order = self.orders.pop(self.rnd.randrange(len(self.orders)))
+            self.change_dates.remove(order["lastChangeDate"])
+
+            order["isCancel"] = True
+            order["cancelDate"] = now
+            order["lastChangeDate"] = now
+
+            self.orders.append(order)
+            self.change_dates.append(now)
+
+    def orders_report(self, date_from: str, flag: int) -> list[dict]:
+        self.apply_changes()
+        date_from = format_date(datetime.fromisoformat(date_from))
+
+        if flag == 1:
+            day = date_from[:10]
+            return [order for order in self.orders if order["date"][:10] == day][
+                :ORDERS_REPORT_LIMIT
+            ]
+
+        start = bisect.bisect_left(self.change_dates, date_from)
+        return self.orders[start : start + ORDERS_REPORT_LIMIT]
+
+    def status(self, task_id: int) -> dict:
+        if task_id in self.statuses:
+            return self.statuses[task_id]
+
+        # Детерминированно по id: одно и то же задание всегда в одном статусе
+        cancelled = random.Random(task_id).random() < self.cancel_rate
+        return {
+            "id": task_id,
+            "supplierStatus": "cancel" if cancelled else "confirm",
+            "wbStatus": "canceled" if cancelled else "waiting",
+        }
+
+
+def create_app(args) -> web.Application:
+    data = FakeWbData(args)
+    stats = Counter()
+
+    @web.middleware
+    async def simulate(request: web.Request, handler):
+        if request.path.startswith("/__"):
+            return await handler(request)
+
+        resource = request.match_info.route.resource
+        endpoint = resource.canonical if resource else request.path
+
+        latency = args.latency_ms + random.uniform(-args.jitter_ms, args.jitter_ms)
+        if latency > 0:
+            await asyncio.sleep(latency / 1000)
+
+        if random.random() < args.error_429:
+            response = web.json_response(
+                {"title": "too many requests"},
+                status=429,
+                headers={"X-Ratelimit-Retry": str(args.retry_after)},
+            )
+        elif random.random() < args.error_5xx:
+            response = web.json_response({"title": "internal error"}, status=503)
+        else:
+            response = await handler(request)
+
+        stats[f"{request.method} {endpoint} {response.status}"] += 1
+        return response
+
+    async def orders_report(request: web.Request):
+        orders = data.orders_report(
+            request.query["dateFrom"], int(request.query.get("flag", 0))
+        )
+        return web.json_response(orders)
+
+    async def new_assembly_tasks(request: web.Request):
+        return web.json_response({"orders": data.new_tasks})
+
+    async def assembly_task_statuses(request: web.Request):
+        ids = (await request.json())["orders"]
+        return web.json_response({"orders": [data.status(task_id) for task_id in ids]})
+
+    async def create_supply(request: web.Request):
+        return web.json_response({"id": f"WB-GI-{next(data.supply_ids)}"}, status=201)
+
+    async def add_to_supply(request: web.Request):
+        return web.Response(status=204)
+
+    async def stickers(request: web.Request):
+        ids = (await request.json())["orders"]
+        return web.json_response(
+            {
+                "stickers": [
+                    {
+                        "orderId": task_id,
+                        "partA": str(task_id)[:-4],
+                        "partB": str(task_id)[-4:],
+                        "barcode": f"*{task_id}",
+                        "file": data.sticker_file,
+                    }
+                    for task_id in ids
+                ]
+            }
+        )
+
+    async def get_stats(request: web.Request):
+        return web.json_response(dict(stats))
+
+    async def reset_stats(request: web.Request):
+        stats.clear()
+        return web.json_response({})
+
+    app = web.Application(middlewares=[simulate], client_max_size=16 * 1024**2)
+    app.add_routes(
+        [
+            web.get("/api/v1/supplier/orders", orders_report),
+            web.get("/api/v3/orders/new", new_assembly_tasks),
+            web.post("/api/v3/orders/status", assembly_task_statuses),
+            web.post("/api/v3/supplies", create_supply),
+            web.patch("/api/v3/supplies/{supply_id}/orders/{order_id}", add_to_supply),
+            web.post("/api/v3/orders/stickers", stickers),
+            web.get("/__stats", get_stats),
+            web.post("/__reset", reset_stats),
+        ]
+    )
+
+    log.info(
+        "Fake WB API: заказов %s, новых заданий %s",
+        len(data.orders),
+        len(data.new_tasks),
+    )
+    return app
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Локальный сервер WB API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=30, help="глубина заказов (дней)")
+    parser.add_argument("--nm-ids", type=int, default=500)
+    parser.add_argument("--new-tasks", type=int, default=1_000)
+    parser.add_argument("--cancel-rate", type=float, default=0.05)
+    parser.add_argument(
+        "--changes-per-request",
+        type=int,
+        default=0,
+        help="заказов, изменяемых перед каждым запросом отчета",
+    )
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-429", type=float, default=0, help="доля ответов 429")
+    parser.add_argument("--error-5xx", type=float, default=0, help="доля ответов 503")
+    parser.add_argument("--retry-after", type=float, default=1)
+    parser.add_argument("--fixtures", help="каталог фикстур recorder.py")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args()
+    web.run_app(create_app(args), host=args.host, port=args.port)
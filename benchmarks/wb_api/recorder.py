@@ -0,0 +1,143 @@
+"""
+Запись ответов WB API в фикстуры для локального сервера (fake_server.py).
+
+Выполняет только читающие запросы: отчет о заказах, новые сборочные задания,
+их статусы и стикеры. Ответы сохраняются как есть в <каталог>/<метод>.json.gz:
+    {"endpoint", "recorded_at", "request": {...}, "status", "elapsed", "body"}
+
+Пример:
+    WB_TOKEN=... python -m src.benchmarks.wb_api.recorder --output fixtures/wb --days 3
+
+Фикстуры содержат данные кабинета, не добавляйте их в репозиторий.
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+
+import httpx
+
+log = logging.getLogger(__name__)
+
+STATISTICS_API_URL = "https://statistics-api.wildberries.ru"
+MARKETPLACE_API_URL = "https://marketplace-api.wildberries.ru"
+
+STATUS_BATCH_SIZE = 1000
+
+
+async def record(
+    client: httpx.AsyncClient, output: str, endpoint: str, method: str, url: str, **kwargs
+):
+    """
+    Выполняет запрос и сохраняет ответ в фикстуру.
+
+    :return: тело ответа (JSON) или None при ошибке
+    """
+    started = time.perf_counter()
+    response = await client.request(method, url, **kwargs)
+    elapsed = time.perf_counter() - started
+
+    try:
+        body = response.json()
+    except ValueError:
+        body = response.text
+
+    fixture = {
+        "endpoint": endpoint,
+        "recorded_at": datetime.now().isoformat(),
+        "request": {
+            "method": method,
+            "url": url,
+            "params": kwargs.get("params"),
+            "json": kwargs.get("json"),
+        },
+        "status": response.status_code,
+        "elapsed": round(elapsed, 3),
+        "body": body,
+    }
+
+    path = os.path.join(output, f"{endpoint}.json.gz")
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(fixture, f, ensure_ascii=False)
+
+    log.info(
+        "%s: %s за %.2f сек -> %s (%s байт)",
+        endpoint,
+        response.status_code,
+        elapsed,
+        path,
+        os.path.getsize(path),
+    )
+
+    return body if response.is_success else None
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Запись ответов WB API в фикстуры")
+    parser.add_argument("--output", required=True, help="каталог фикстур")
+    parser.add_argument("--token", default=os.environ.get("WB_TOKEN"))
+    parser.add_argument("--days", type=int, default=3, help="глубина отчета о заказах")
+    parser.add_argument(
+        "--stickers", type=int, default=10, help="заданий для запроса стикеров"
+    )
+    args = parser.parse_args()
+
+    if not args.token:
+        parser.error("нужен --token или переменная окружения WB_TOKEN")
+
+    os.makedirs(args.output, exist_ok=True)
+    date_from = (datetime.now() - timedelta(days=args.days)).date().isoformat()
+
+    async with httpx.AsyncClient(
+        headers={"Authorization": args.token}, timeout=httpx.Timeout(120, connect=10)
+    ) as client:
+        await record(
+            client,
+            args.output,
+            "orders_report",
+            "GET",
+            f"{STATISTICS_API_URL}/api/v1/supplier/orders",
+            params={"dateFrom": date_from, "flag": 0},
+        )
+
+        new_tasks = await record(
+            client,
+            args.output,
+            "new_assembly_tasks",
+            "GET",
+            f"{MARKETPLACE_API_URL}/api/v3/orders/new",
+        )
+        task_ids = [task["id"] for task in (new_tasks or {}).get("orders", [])]
+
+        if not task_ids:
+            log.warning("Нет новых сборочных заданий: статусы и стикеры не записаны")
+            return
+
+        await record(
+            client,
+            args.output,
+            "assembly_task_statuses",
+            "POST",
+            f"{MARKETPLACE_API_URL}/api/v3/orders/status",
+            json={"orders": task_ids[:STATUS_BATCH_SIZE]},
+        )
+
+        await record(
+            client,
+            args.output,
+            "stickers",
+            "POST",
+            f"{MARKETPLACE_API_URL}/api/v3/orders/stickers",
+            params={"type": "png", "width": 58, "height": 40},
+            json={"orders": task_ids[: args.stickers]},
+        )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
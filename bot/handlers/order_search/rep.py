@@ -11,6 +11,7 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from src.bot.keyboards.callbacks.payment import PaymentCallback, PaymentAction
 from src.bot.keyboards.user import generate_payment_status_keyboard
 from src.bot.states.order_search import OrderSearchState
+from src.bot.utils.order_search import try_instant_match
 from src.bot.utils.scheduler_service import SchedulerService
 from src.database.models import OrderSearchORM
 from src.database.uow import UnitOfWork
@@ -230,6 +231,18 @@ async def handle_receipt_number_input(
 
     # clear_receipt_reminders(scheduler, message.from_user.id)
 
+    # Поиск по чеку - поиск по ключу, пробуем найти заказ сразу
+    is_matched = await try_instant_match(
+        bot=message.bot,
+        uow=uow,
+        chat_id=message.chat.id,
+        order_search_id=order_search.id,
+    )
+
+    if is_matched:
+        await processing_msg.delete()
+        return
+
     await processing_msg.edit_text(
         text=(f"Чек <code>{receipt_number}</code> принят в обработку, ожидайте...")
     )
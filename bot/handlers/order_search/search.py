@@ -25,6 +25,7 @@ from src.bot.keyboards.user import (
     get_city_select_kb,
 )
 from src.bot.states.order_search import OrderSearchState
+from src.bot.utils.order_search import try_instant_match
 from src.database.models import OrderSearchORM, CityORM
 from src.database.uow import UnitOfWork
 from src.infrastructure.ocr.tesseract import process_image_with_configs
@@ -181,6 +182,17 @@ async def process_country_selection(
 
     order_search = await uow.order_search.create_order_search(order_search)
 
+    is_matched = await try_instant_match(
+        bot=bot,
+        uow=uow,
+        chat_id=call.from_user.id,
+        order_search_id=order_search.id,
+    )
+
+    if is_matched:
+        await call.message.delete()
+        return
+
     await call.message.edit_text(
         text=(
             f"✅ Ваш заказ принят в обработку!\n"
@@ -296,6 +308,16 @@ async def finalize_order(
         inline_message_id=call.inline_message_id, reply_markup=None
     )
 
+    is_matched = await try_instant_match(
+        bot=bot,
+        uow=uow,
+        chat_id=call.from_user.id,
+        order_search_id=order_search.id,
+    )
+
+    if is_matched:
+        return
+
     await call.bot.send_message(
         chat_id=call.from_user.id,
         text=(
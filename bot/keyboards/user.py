@@ -152,3 +152,10 @@ def get_support_button_keyboard() -> InlineKeyboardMarkup:
     keyboard.button(text="Техподдержка", url="https://t.me/prizma_trek")
     keyboard.adjust(1)
     return keyboard.as_markup()
+
+
+def get_manager_button_keyboard() -> InlineKeyboardMarkup:
+    keyboard = InlineKeyboardBuilder()
+    keyboard.button(text="Менеджер", url="https://t.me/giftoboom")
+    keyboard.adjust(1)
+    return keyboard.as_markup()
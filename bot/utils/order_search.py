@@ -0,0 +1,60 @@
+import logging
+
+from aiogram import Bot
+
+from src.application.formatters.order_search.outcome import build_outcome_messages
+from src.application.order_search.use_cases.instant_match import (
+    InstantMatchOrderSearchUseCase,
+)
+from src.bot.keyboards.user import get_manager_button_keyboard
+from src.core.config.settings import settings
+from src.database.uow import UnitOfWork
+
+log = logging.getLogger(__name__)
+
+
+async def try_instant_match(
+    bot: Bot, uow: UnitOfWork, chat_id: int, order_search_id: int
+) -> bool:
+    """
+    Пытается сразу найти заказ для нового поиска и уведомляет пользователя
+    и администратора о результате.
+
+    :return: True, если поиск завершен; False, если он передан воркеру
+    """
+    outcome = await InstantMatchOrderSearchUseCase(uow.session).execute(
+        order_search_id
+    )
+
+    if not outcome:
+        return False
+
+    user_text, admin_message = build_outcome_messages(outcome)
+
+    # Поиск уже завершен и сохранен: ошибка отправки (например, пользователь
+    # заблокировал бота) не должна прерывать обработчик
+    try:
+        await bot.send_message(
+            chat_id=chat_id,
+            text=user_text,
+            reply_markup=get_manager_button_keyboard(),
+        )
+    except Exception as e:
+        log.error(
+            "Ошибка при отправке результата поиска %s пользователю %s: %s",
+            order_search_id,
+            chat_id,
+            e,
+            exc_info=True,
+        )
+
+    try:
+        await bot.send_message(
+            chat_id=settings.ADMIN_CHAT_ID,
+            message_thread_id=settings.WB_NOTIFICATION_THREAD,
+            text=admin_message,
+        )
+    except Exception as e:
+        log.error("Ошибка при отправке сообщения администратору: %s", e, exc_info=True)
+
+    return True
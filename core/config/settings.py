@@ -30,6 +30,30 @@ class Settings(BaseSettings):
 
     WB_TOKEN: str
 
+    # Адреса WB API (переопределяются для локального сервера бенчмарков,
+    # см. benchmarks/wb_api/fake_server.py)
+    WB_STATISTICS_API_URL: str = "https://statistics-api.wildberries.ru"
+    WB_MARKETPLACE_API_URL: str = "https://marketplace-api.wildberries.ru"
+
+    # Каталог кэша стикеров сборочных заданий
+    WB_STICKER_CACHE_DIR: str = "cache/wb_stickers"
+    # Стикеры поставки загружаются одним PDF-листом, когда поставка заполнена
+    # или закрыта менеджером (workers/supply_worker/sticker_sheet.py),
+    # вместо sticker.png в папке задания. Включать только вместе с воркером
+    # листов: python -m src.workers.supply_worker.sticker_sheet
+    WB_STICKER_SHEETS: bool = False
+
+    # Интервалы повторной проверки поиска заказа (сек) по номеру попытки,
+    # последний интервал повторяется до истечения времени поиска
+    ORDER_SEARCH_RECHECK_INTERVALS: list[int] = [30, 60, 120, 300, 600, 900, 1800]
+    # Минимальный отрыв лучшего заказа от следующего по доказательствам
+    # (время, регион) для автоматического выбора при нескольких совпадениях
+    ORDER_SEARCH_SCORE_MIN_MARGIN: float = 0.2
+
+    # Загружать данные синхронизации WB через COPY во временную таблицу
+    # (False - многострочными INSERT ... ON CONFLICT пачками по 1000)
+    WB_SYNC_BULK_COPY: bool = True
+
     ADMIN_ID: int
 
     API_ID: int
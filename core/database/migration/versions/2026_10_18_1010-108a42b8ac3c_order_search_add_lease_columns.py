@@ -0,0 +1,32 @@
+"""order_search add lease columns
+
+Revision ID: 108a42b8ac3c
+Revises: d67b6c3c30b7
+Create Date: 2026-10-18 10:10:42.118305
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "108a42b8ac3c"
+down_revision: Union[str, Sequence[str], None] = "d67b6c3c30b7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("order_search", sa.Column("leased_by", sa.String(), nullable=True))
+    op.add_column(
+        "order_search", sa.Column("lease_expires_at", sa.DateTime(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("order_search", "lease_expires_at")
+    op.drop_column("order_search", "leased_by")
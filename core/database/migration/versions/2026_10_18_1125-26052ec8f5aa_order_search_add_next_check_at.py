@@ -0,0 +1,55 @@
+"""order_search add next_check_at
+
+Revision ID: 26052ec8f5aa
+Revises: 108a42b8ac3c
+Create Date: 2026-10-18 11:25:07.631240
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "26052ec8f5aa"
+down_revision: Union[str, Sequence[str], None] = "108a42b8ac3c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "order_search",
+        sa.Column(
+            "next_check_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "order_search",
+        sa.Column(
+            "check_attempts", sa.Integer(), server_default="0", nullable=False
+        ),
+    )
+    op.create_index(
+        "ix_order_search_pending_next_check_at",
+        "order_search",
+        ["status", "next_check_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_order_search_pending_next_check_at",
+        table_name="order_search",
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+    op.drop_column("order_search", "check_attempts")
+    op.drop_column("order_search", "next_check_at")
@@ -0,0 +1,121 @@
+"""add regions and wb_orders region_code
+
+Revision ID: 8b41c3290471
+Revises: 26052ec8f5aa
+Create Date: 2026-10-18 12:40:19.504127
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8b41c3290471"
+down_revision: Union[str, Sequence[str], None] = "26052ec8f5aa"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def normalize_sql(expr: str) -> str:
+    """SQL-аналог domain/wb_orders/normalizers.normalize_region"""
+    return (
+        "btrim(regexp_replace(replace(replace(lower({expr}), 'ё', 'е'), "
+        "'республика', ''), '\\s+', ' ', 'g'))"
+    ).format(expr=expr)
+
+
+# Города, которые WB указывает вместо региона
+CITY_ALIASES = {
+    "москва": ("московская область", "Московская область"),
+    "санкт-петербург": ("ленинградская область", "Ленинградская область"),
+    "севастополь": ("крым", "Республика Крым"),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "regions",
+        sa.Column("code", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("code"),
+    )
+    op.create_table(
+        "region_aliases",
+        sa.Column("alias", sa.String(), nullable=False),
+        sa.Column("region_code", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["region_code"], ["regions.code"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("alias"),
+    )
+
+    # Регионы из справочника городов
+    op.execute(
+        f"""
+        INSERT INTO regions (code, name)
+        SELECT DISTINCT ON ({normalize_sql("region")}) {normalize_sql("region")}, region
+        FROM city
+        WHERE region IS NOT NULL AND {normalize_sql("region")} <> ''
+        ON CONFLICT DO NOTHING
+        """
+    )
+    op.execute(
+        "INSERT INTO region_aliases (alias, region_code) "
+        "SELECT code, code FROM regions ON CONFLICT DO NOTHING"
+    )
+
+    for alias, (code, name) in CITY_ALIASES.items():
+        op.execute(
+            sa.text(
+                "INSERT INTO regions (code, name) VALUES (:code, :name) "
+                "ON CONFLICT DO NOTHING"
+            ).bindparams(code=code, name=name)
+        )
+        op.execute(
+            sa.text(
+                "INSERT INTO region_aliases (alias, region_code) "
+                "VALUES (:alias, :code) "
+                "ON CONFLICT (alias) DO UPDATE SET region_code = excluded.region_code"
+            ).bindparams(alias=alias, code=code)
+        )
+
+    op.add_column("wb_orders", sa.Column("region_code", sa.String(), nullable=True))
+    op.execute(
+        f"""
+        UPDATE wb_orders
+        SET region_code = COALESCE(
+            (SELECT a.region_code FROM region_aliases a
+             WHERE a.alias = {normalize_sql("wb_orders.region_name")}),
+            {normalize_sql("wb_orders.region_name")}
+        )
+        """
+    )
+
+    op.create_index(
+        "ix_wb_orders_region_code", "wb_orders", ["region_code"], unique=False
+    )
+    op.create_index(
+        "ix_wb_orders_nm_id_created_at",
+        "wb_orders",
+        ["nm_id", "created_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_wb_orders_country_name_lower",
+        "wb_orders",
+        [sa.text("lower(country_name)")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_wb_orders_country_name_lower", table_name="wb_orders")
+    op.drop_index("ix_wb_orders_nm_id_created_at", table_name="wb_orders")
+    op.drop_index("ix_wb_orders_region_code", table_name="wb_orders")
+    op.drop_column("wb_orders", "region_code")
+    op.drop_table("region_aliases")
+    op.drop_table("regions")
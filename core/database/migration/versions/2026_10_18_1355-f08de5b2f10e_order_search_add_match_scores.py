@@ -0,0 +1,28 @@
+"""order_search add match_scores
+
+Revision ID: f08de5b2f10e
+Revises: 8b41c3290471
+Create Date: 2026-10-18 13:55:31.902216
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f08de5b2f10e"
+down_revision: Union[str, Sequence[str], None] = "8b41c3290471"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("order_search", sa.Column("match_scores", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("order_search", "match_scores")
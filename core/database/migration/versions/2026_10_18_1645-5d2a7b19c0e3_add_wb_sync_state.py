@@ -0,0 +1,37 @@
+"""add wb_sync_state
+
+Revision ID: 5d2a7b19c0e3
+Revises: 3c9e1f7a2b64
+Create Date: 2026-10-18 16:45:31.902217
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5d2a7b19c0e3"
+down_revision: Union[str, Sequence[str], None] = "3c9e1f7a2b64"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "wb_sync_state",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("cursor", sa.DateTime(), nullable=True),
+        sa.Column("last_full_sync_at", sa.DateTime(), nullable=True),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("wb_sync_state")
@@ -0,0 +1,48 @@
+"""wb_assembly_task add statuses
+
+Revision ID: 7e4b2d91a8f6
+Revises: 5d2a7b19c0e3
+Create Date: 2026-10-18 18:00:54.120473
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7e4b2d91a8f6"
+down_revision: Union[str, Sequence[str], None] = "5d2a7b19c0e3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "wb_assembly_task", sa.Column("supplier_status", sa.String(), nullable=True)
+    )
+    op.add_column("wb_assembly_task", sa.Column("wb_status", sa.String(), nullable=True))
+    op.add_column(
+        "wb_assembly_task",
+        sa.Column("status_changed_at", sa.DateTime(), nullable=True),
+    )
+    op.add_column(
+        "wb_assembly_task",
+        sa.Column("status_checked_at", sa.DateTime(), nullable=True),
+    )
+
+    # ALTER TYPE ... ADD VALUE нельзя выполнять в одной транзакции с его использованием
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE videostatus ADD VALUE IF NOT EXISTS 'cancelled'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Значение 'cancelled' в videostatus остается: Postgres не удаляет значения enum
+    op.execute("UPDATE video_tasks SET status = 'error' WHERE status = 'cancelled'")
+    op.drop_column("wb_assembly_task", "status_checked_at")
+    op.drop_column("wb_assembly_task", "status_changed_at")
+    op.drop_column("wb_assembly_task", "wb_status")
+    op.drop_column("wb_assembly_task", "supplier_status")
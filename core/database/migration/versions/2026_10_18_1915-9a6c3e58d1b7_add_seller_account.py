@@ -0,0 +1,82 @@
+"""add seller_account
+
+Revision ID: 9a6c3e58d1b7
+Revises: 7e4b2d91a8f6
+Create Date: 2026-10-18 19:15:12.540981
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9a6c3e58d1b7"
+down_revision: Union[str, Sequence[str], None] = "7e4b2d91a8f6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACCOUNT_TABLES = ("wb_orders", "wb_assembly_task", "supplies")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "seller_account",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("wb_token", sa.String(), nullable=True),
+        sa.Column(
+            "is_active", sa.Boolean(), server_default=sa.text("true"), nullable=False
+        ),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    # Существующий кабинет: токен берется из settings.WB_TOKEN
+    op.execute("INSERT INTO seller_account (id, name) VALUES (1, 'Основной кабинет')")
+    op.execute(
+        "SELECT setval(pg_get_serial_sequence('seller_account', 'id'), "
+        "(SELECT max(id) FROM seller_account))"
+    )
+
+    for table in ACCOUNT_TABLES:
+        op.add_column(table, sa.Column("account_id", sa.Integer(), nullable=True))
+        op.execute(f"UPDATE {table} SET account_id = 1")
+        op.create_foreign_key(
+            f"{table}_account_id_fkey", table, "seller_account", ["account_id"], ["id"]
+        )
+        op.create_index(f"ix_{table}_account_id", table, ["account_id"], unique=False)
+
+    op.execute("UPDATE wb_sync_state SET name = 'orders:1' WHERE name = 'orders'")
+    op.execute(
+        "UPDATE wb_sync_state SET name = 'orders_backfill:1:' || substr(name, 17) "
+        "WHERE name ~ '^orders_backfill:[0-9]{4}-'"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        "DELETE FROM wb_sync_state "
+        "WHERE name LIKE 'orders:%' AND name <> 'orders:1' "
+        "OR name LIKE 'orders_backfill:%' AND name NOT LIKE 'orders_backfill:1:%'"
+    )
+    op.execute("UPDATE wb_sync_state SET name = 'orders' WHERE name = 'orders:1'")
+    op.execute(
+        "UPDATE wb_sync_state SET name = 'orders_backfill:' || substr(name, 19) "
+        "WHERE name LIKE 'orders_backfill:1:%'"
+    )
+
+    for table in reversed(ACCOUNT_TABLES):
+        op.drop_index(f"ix_{table}_account_id", table_name=table)
+        op.drop_constraint(f"{table}_account_id_fkey", table, type_="foreignkey")
+        op.drop_column(table, "account_id")
+
+    op.drop_table("seller_account")
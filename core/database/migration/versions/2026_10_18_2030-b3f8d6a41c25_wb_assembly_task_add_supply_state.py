@@ -0,0 +1,34 @@
+"""wb_assembly_task add supply_state
+
+Revision ID: b3f8d6a41c25
+Revises: 9a6c3e58d1b7
+Create Date: 2026-10-18 20:30:41.275310
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b3f8d6a41c25"
+down_revision: Union[str, Sequence[str], None] = "9a6c3e58d1b7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "wb_assembly_task", sa.Column("supply_state", sa.String(), nullable=True)
+    )
+    # Задания, уже добавленные в поставку, обработаны полностью
+    op.execute(
+        "UPDATE wb_assembly_task SET supply_state = 'DONE' WHERE supply_id IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("wb_assembly_task", "supply_state")
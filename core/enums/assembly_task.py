@@ -0,0 +1,44 @@
+class AssemblyTaskStatus:
+    """
+    Статусы сборочных заданий WB (supplierStatus / wbStatus),
+    см. infrastructure/wb_service/models.WildberriesAssemblyOrderStatus
+    """
+
+    SUPPLIER_CANCEL = "cancel"
+    """Отменено продавцом"""
+
+    CANCELLED_WB_STATUSES = (
+        "canceled",
+        "canceled_by_client",
+        "declined_by_client",
+        "defect",
+    )
+    """Статусы WB отмененного задания"""
+
+    FINAL_WB_STATUSES = CANCELLED_WB_STATUSES + ("sold",)
+    """Статусы WB, после которых задание больше не меняется"""
+
+    KNOWN_SUPPLIER_STATUSES = ("new", "confirm", "complete", SUPPLIER_CANCEL)
+    """Статусы продавца из документации WB API"""
+
+    KNOWN_WB_STATUSES = FINAL_WB_STATUSES + (
+        "waiting",
+        "sorted",
+        "ready_for_pickup",
+        "postponed_delivery",
+    )
+    """Статусы WB из документации WB API (остальные сохраняются как есть)"""
+
+    @classmethod
+    def is_cancelled(cls, supplier_status: str | None, wb_status: str | None) -> bool:
+        return (
+            supplier_status == cls.SUPPLIER_CANCEL
+            or wb_status in cls.CANCELLED_WB_STATUSES
+        )
+
+    @classmethod
+    def is_known(cls, supplier_status: str | None, wb_status: str | None) -> bool:
+        return (
+            supplier_status in cls.KNOWN_SUPPLIER_STATUSES
+            and wb_status in cls.KNOWN_WB_STATUSES
+        )
@@ -0,0 +1,7 @@
+class NotificationStatus:
+    PENDING = "PENDING"
+    """Уведомление ожидает отправки"""
+    SENT = "SENT"
+    """Уведомление отправлено"""
+    FAILED = "FAILED"
+    """Уведомление не удалось отправить"""
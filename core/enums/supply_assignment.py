@@ -0,0 +1,15 @@
+class SupplyAssignmentState:
+    """
+    Этап добавления сборочного задания в поставку (wb_assembly_task.supply_state).
+
+    Место в поставке занимается в БД короткой транзакцией, внешние действия
+    (WB, Яндекс Диск, очереди) выполняются после нее. По этапу повторная
+    обработка задания продолжается с места сбоя.
+    """
+
+    RESERVED = "RESERVED"
+    """Место в поставке занято в БД, задание еще не добавлено в поставку WB"""
+    ADDED = "ADDED"
+    """Задание добавлено в поставку WB, стикер и макет еще не обработаны"""
+    DONE = "DONE"
+    """Обработка задания завершена"""
@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from jinja2 import Template
+
+
+async def render_template(text, **context):
+    """
+    Отрисовывает путь из шаблона настроек категории (output_path).
+    Кроме переданного контекста доступны текущие дата и время.
+    """
+    template = Template(text)
+
+    now = datetime.now()
+    context.update(
+        {
+            "year": now.year,
+            "month": f"{now.month:02}",
+            "day": f"{now.day:02}",
+            "hour": f"{now.hour:02}",
+            "minute": f"{now.minute:02}",
+            "second": f"{now.second:02}",
+        }
+    )
+
+    return template.render(**context)
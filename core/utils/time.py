@@ -1,4 +1,7 @@
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
+
+MOSCOW_TZ = timezone(timedelta(hours=3))
+"""Часовой пояс дат WB (отчеты, сутки заказов)"""
 
 
 def now_utc() -> datetime:
@@ -6,3 +9,17 @@ def now_utc() -> datetime:
     Возвращает текущее время в UTC+0 без tzinfo.
     """
     return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def now_moscow() -> datetime:
+    """
+    Возвращает текущее московское время без tzinfo (как даты в API WB).
+    """
+    return datetime.now(MOSCOW_TZ).replace(tzinfo=None)
+
+
+def today_moscow() -> date:
+    """
+    Возвращает текущую дату по московскому времени.
+    """
+    return datetime.now(MOSCOW_TZ).date()
@@ -4,7 +4,10 @@ from .category_supply_counter import CategorySupplyCounterORM
 from .city import CityORM
 from .country import CountryORM
 from .material import MaterialORM
+from .notification_outbox import NotificationOutboxORM
 from .order_search import OrderSearchORM
+from .region import RegionORM, RegionAliasORM
+from .seller_account import SellerAccountORM
 from .supply import SupplyORM
 from .template import TemplateORM
 from .user import UserORM
@@ -12,3 +15,4 @@ from .video_tasks import VideoTaskORM
 from .wb_article import WbArticleORM
 from .wb_assembly_task import WbAssemblyTaskORM
 from .wb_order import WbOrderORM
+from .wb_sync_state import WbSyncStateORM
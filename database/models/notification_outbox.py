@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, BigInteger, Index, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.database.base import Base
+from src.core.database.mixins import IDMixin, TimestampMixin
+from src.core.enums.notification import NotificationStatus
+
+
+class NotificationOutboxORM(IDMixin, TimestampMixin, Base):
+    """
+    Исходящие уведомления Telegram.
+
+    Записываются в той же транзакции, что и изменения, о которых уведомляют,
+    и отправляются отдельным воркером (см. workers/notification_dispatcher).
+    """
+
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        Index(
+            "ix_notification_outbox_pending_available_at",
+            "available_at",
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+    )
+
+    chat_id: Mapped[int] = mapped_column(BigInteger)
+    # NotificationMessage
+    payload: Mapped[dict] = mapped_column(JSON)
+    # Текстовые уведомления в один чат можно объединять в одно сообщение
+    coalesce: Mapped[bool] = mapped_column(server_default="false", default=False)
+
+    status: Mapped[str] = mapped_column(default=NotificationStatus.PENDING)
+    attempts: Mapped[int] = mapped_column(server_default="0", default=0)
+    # Не отправлять раньше (retry_after Telegram, аренда воркером)
+    available_at: Mapped[datetime] = mapped_column(server_default=func.now())
+    sent_at: Mapped[datetime] = mapped_column(nullable=True)
+    error: Mapped[str] = mapped_column(nullable=True)
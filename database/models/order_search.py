@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, JSON, func
+from sqlalchemy import ForeignKey, JSON, func, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.core.database.base import Base
@@ -14,6 +14,14 @@ if TYPE_CHECKING:
 
 class OrderSearchORM(IDMixin, TimestampMixin, Base):
     __tablename__ = "order_search"
+    __table_args__ = (
+        Index(
+            "ix_order_search_pending_next_check_at",
+            "status",
+            "next_check_at",
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
 
@@ -29,3 +37,11 @@ class OrderSearchORM(IDMixin, TimestampMixin, Base):
         server_default=func.now(),
         server_onupdate=func.now(),
     )
+    next_check_at: Mapped[datetime] = mapped_column(server_default=func.now())
+    check_attempts: Mapped[int] = mapped_column(server_default="0", default=0)
+    # Оценки заказов-кандидатов при нескольких совпадениях
+    match_scores: Mapped[list] = mapped_column(JSON, nullable=True)
+
+    # Аренда поиска воркером (см. workers/order_search)
+    leased_by: Mapped[str] = mapped_column(nullable=True)
+    lease_expires_at: Mapped[datetime] = mapped_column(nullable=True)
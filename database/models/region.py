@@ -0,0 +1,40 @@
+from typing import List
+
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from src.core.database.base import Base
+
+
+class RegionORM(Base):
+    """
+    Справочник регионов.
+
+    code - канонический код региона (нормализованное название,
+    см. domain/wb_orders/normalizers.normalize_region)
+    """
+
+    __tablename__ = "regions"
+
+    code: Mapped[str] = mapped_column(primary_key=True)
+    name: Mapped[str]
+
+    aliases: Mapped[List["RegionAliasORM"]] = relationship(
+        back_populates="region",
+    )
+
+
+class RegionAliasORM(Base):
+    """
+    Синоним региона: нормализованное название, под которым регион
+    встречается в заказах WB или в справочнике городов
+    """
+
+    __tablename__ = "region_aliases"
+
+    alias: Mapped[str] = mapped_column(primary_key=True)
+    region_code: Mapped[str] = mapped_column(
+        ForeignKey("regions.code", ondelete="CASCADE")
+    )
+
+    region: Mapped["RegionORM"] = relationship(back_populates="aliases")
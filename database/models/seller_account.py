@@ -0,0 +1,20 @@
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.database.base import Base
+from src.core.database.mixins import IDMixin, TimestampMixin
+
+
+class SellerAccountORM(IDMixin, TimestampMixin, Base):
+    """
+    Кабинет продавца WB.
+
+    Синхронизация и поставки выполняются отдельно для каждого активного
+    кабинета, со своим токеном и своими лимитами WB API.
+    wb_token - токен API кабинета (если не задан - settings.WB_TOKEN)
+    """
+
+    __tablename__ = "seller_account"
+
+    name: Mapped[str]
+    wb_token: Mapped[str] = mapped_column(nullable=True)
+    is_active: Mapped[bool] = mapped_column(server_default="true", default=True)
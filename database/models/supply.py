@@ -1,5 +1,6 @@
 from typing import TYPE_CHECKING, List
 
+from sqlalchemy import ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.core.database.base import Base
@@ -17,6 +18,10 @@ class SupplyORM(TimestampMixin, Base):
     name: Mapped[str]
     order_count: Mapped[int] = mapped_column(default=0)
     status: Mapped[str] = mapped_column(default="active", nullable=True)
+    # Кабинет продавца (seller_account)
+    account_id: Mapped[int] = mapped_column(
+        ForeignKey("seller_account.id"), nullable=True, index=True
+    )
 
     assembly_tasks: Mapped[List["WbAssemblyTaskORM"]] = relationship(
         back_populates="supply",
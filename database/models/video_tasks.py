@@ -12,6 +12,7 @@ class VideoStatus(str, enum.Enum):
     processing = "processing"
     done = "done"
     error = "error"
+    cancelled = "cancelled"
 
 
 class VideoTaskORM(IDMixin, TimestampMixin, Base):
@@ -18,6 +18,10 @@ class WbAssemblyTaskORM(Base):
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
     wb_order_id: Mapped[str] = mapped_column(ForeignKey("wb_orders.id"))
     created_at: Mapped[datetime]
+    # Кабинет продавца (seller_account)
+    account_id: Mapped[int] = mapped_column(
+        ForeignKey("seller_account.id"), nullable=True, index=True
+    )
 
     wb_order: Mapped["WbOrderORM"] = relationship(back_populates="assembly_task")
 
@@ -33,3 +37,11 @@ class WbAssemblyTaskORM(Base):
     )
 
     added_to_supply_at: Mapped[datetime] = mapped_column(nullable=True)
+    # Этап добавления в поставку (см. core/enums/supply_assignment.SupplyAssignmentState)
+    supply_state: Mapped[str] = mapped_column(nullable=True)
+
+    # Статусы задания в WB (см. core/enums/assembly_task.AssemblyTaskStatus)
+    supplier_status: Mapped[str] = mapped_column(nullable=True)
+    wb_status: Mapped[str] = mapped_column(nullable=True)
+    status_changed_at: Mapped[datetime] = mapped_column(nullable=True)
+    status_checked_at: Mapped[datetime] = mapped_column(nullable=True)
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import BigInteger, ForeignKey
+from sqlalchemy import BigInteger, ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.core.database.base import Base
@@ -17,9 +17,14 @@ class WbOrderORM(TimestampMixin, Base):
     """
 
     __tablename__ = "wb_orders"
+    __table_args__ = (
+        Index("ix_wb_orders_nm_id_created_at", "nm_id", "created_at"),
+        Index("ix_wb_orders_country_name_lower", text("lower(country_name)")),
+    )
 
     id: Mapped[str] = mapped_column(primary_key=True)
     region_name: Mapped[str]
+    region_code: Mapped[str] = mapped_column(nullable=True, index=True)
     supplier_article: Mapped[str]
     country_name: Mapped[str]
     nm_id: Mapped[int] = mapped_column(BigInteger)
@@ -27,6 +32,10 @@ class WbOrderORM(TimestampMixin, Base):
     warehouse_name: Mapped[str] = mapped_column(nullable=True)
     warehouse_type: Mapped[str] = mapped_column(nullable=True)
     cancel_date: Mapped[datetime] = mapped_column(nullable=True)
+    # Кабинет продавца (seller_account)
+    account_id: Mapped[int] = mapped_column(
+        ForeignKey("seller_account.id"), nullable=True, index=True
+    )
     material_id: Mapped[int] = mapped_column(
         ForeignKey(
             "materials.id",
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from sqlalchemy import func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.database.base import Base
+
+
+class WbSyncStateORM(Base):
+    """
+    Состояние инкрементальной синхронизации данных WB.
+
+    name - название синхронизируемого источника (например, "orders")
+    cursor - наибольший lastChangeDate полученных записей (время МСК, как в API WB)
+    last_full_sync_at - время последней полной сверки (UTC)
+    """
+
+    __tablename__ = "wb_sync_state"
+
+    name: Mapped[str] = mapped_column(primary_key=True)
+    cursor: Mapped[datetime] = mapped_column(nullable=True)
+    last_full_sync_at: Mapped[datetime] = mapped_column(nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
@@ -4,9 +4,13 @@ from .category_settings_repo import CategorySettingsRepository
 from .city import CityRepository
 from .country_repo import CountryRepository
 from .material_repo import MaterialRepository
+from .notification_outbox import NotificationOutboxRepository
 from .order_search_repo import OrderSearchRepository
+from .region import RegionRepository
+from .seller_account import SellerAccountRepository
 from .supply import SupplyRepository
 from .template_repo import TemplateRepository
 from .user import UserRepository
 from .wb_assembly_task import WbAssemblyTaskRepository
 from .wb_order import WbOrderRepository
+from .wb_sync_state import WbSyncStateRepository
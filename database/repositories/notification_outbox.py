@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+from typing import Sequence
+
+from sqlalchemy import insert, select, update
+
+from src.core.enums.notification import NotificationStatus
+from src.core.utils.time import now_utc
+from src.database.models import NotificationOutboxORM
+from src.database.repositories import BaseRepository
+from src.notification_service.entities import NotificationMessage
+
+
+class NotificationOutboxRepository(BaseRepository):
+    async def add_notifications(
+        self,
+        notifications: Sequence[NotificationMessage],
+        coalesce: bool = False,
+    ) -> None:
+        """
+        Добавляет уведомления в очередь отправки без фиксации транзакции:
+        они будут отправлены, только если транзакция вызывающего кода завершится
+        """
+        if not notifications:
+            return
+
+        await self.session.execute(
+            insert(NotificationOutboxORM),
+            [
+                {
+                    "chat_id": notification.chat_id,
+                    "payload": notification.model_dump(mode="json"),
+                    "coalesce": coalesce,
+                }
+                for notification in notifications
+            ],
+        )
+
+    async def claim_pending(
+        self, limit: int, lease: timedelta
+    ) -> list[NotificationOutboxORM]:
+        """
+        Захватывает уведомления, готовые к отправке, в порядке добавления.
+
+        Захваченные уведомления откладываются на время lease, поэтому другие
+        воркеры их не получат, а при падении воркера они будут отправлены повторно.
+        """
+        now = now_utc()
+
+        claimable_ids = (
+            select(NotificationOutboxORM.id)
+            .where(
+                NotificationOutboxORM.status == NotificationStatus.PENDING,
+                NotificationOutboxORM.available_at <= now,
+            )
+            .order_by(NotificationOutboxORM.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+
+        result = await self.session.execute(
+            update(NotificationOutboxORM)
+            .where(NotificationOutboxORM.id.in_(claimable_ids.scalar_subquery()))
+            .values(
+                available_at=now + lease,
+                attempts=NotificationOutboxORM.attempts + 1,
+            )
+            .returning(NotificationOutboxORM)
+            .execution_options(synchronize_session=False)
+        )
+        notifications = sorted(result.scalars().all(), key=lambda n: n.id)
+        await self.session.commit()
+
+        return notifications
+
+    async def mark_sent(self, ids: Sequence[int]) -> None:
+        if not ids:
+            return
+
+        await self.session.execute(
+            update(NotificationOutboxORM)
+            .where(NotificationOutboxORM.id.in_(ids))
+            .values(status=NotificationStatus.SENT, sent_at=now_utc(), error=None)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+
+    async def reschedule(
+        self, ids: Sequence[int], available_at: datetime, error: str
+    ) -> None:
+        """
+        Откладывает повторную отправку уведомлений до available_at
+        """
+        if not ids:
+            return
+
+        await self.session.execute(
+            update(NotificationOutboxORM)
+            .where(NotificationOutboxORM.id.in_(ids))
+            .values(available_at=available_at, error=error)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+
+    async def mark_failed(self, ids: Sequence[int], error: str) -> None:
+        if not ids:
+            return
+
+        await self.session.execute(
+            update(NotificationOutboxORM)
+            .where(NotificationOutboxORM.id.in_(ids))
+            .values(status=NotificationStatus.FAILED, error=error)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
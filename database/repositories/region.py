@@ -0,0 +1,16 @@
+from sqlalchemy import select
+
+from src.database.models import RegionAliasORM
+from src.database.repositories import BaseRepository
+
+
+class RegionRepository(BaseRepository):
+    async def get_alias_map(self) -> dict[str, str]:
+        """
+        Получает словарь {синоним региона: код региона}
+        """
+
+        result = await self.session.execute(
+            select(RegionAliasORM.alias, RegionAliasORM.region_code)
+        )
+        return {alias: region_code for alias, region_code in result.all()}
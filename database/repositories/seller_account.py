@@ -0,0 +1,17 @@
+from typing import List
+
+from sqlalchemy import select
+
+from src.database.models import SellerAccountORM
+from src.database.repositories import BaseRepository
+
+
+class SellerAccountRepository(BaseRepository):
+    async def get_active(self) -> List[SellerAccountORM]:
+        """Получает активные кабинеты продавца"""
+        result = await self.session.scalars(
+            select(SellerAccountORM)
+            .where(SellerAccountORM.is_active.is_(True))
+            .order_by(SellerAccountORM.id)
+        )
+        return list(result.all())
@@ -1,6 +1,6 @@
 from typing import Optional, List
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 
 from src.application.exceptions.supply_excptions import SupplyNotFoundError
 from src.database.models import SupplyORM
@@ -37,3 +37,23 @@ class SupplyRepository(BaseRepository):
         supply_orm.category_name = supply.category_name
         supply_orm.status = supply.status
         supply_orm.order_count = supply.order_count
+
+    async def close(self, supply_id: str) -> bool:
+        """
+        Закрывает активную поставку и фиксирует транзакцию.
+        Меняется только статус: счетчик заданий одновременно
+        увеличивает воркер поставок.
+
+        :return: False, если поставка уже закрыта
+        """
+        result = await self.session.execute(
+            update(SupplyORM)
+            .where(SupplyORM.id == supply_id, SupplyORM.status == "active")
+            .values(status="inactive")
+            .returning(SupplyORM.id)
+            .execution_options(synchronize_session=False)
+        )
+        closed = result.scalar_one_or_none() is not None
+        await self.session.commit()
+
+        return closed
@@ -0,0 +1,43 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from src.database.models import WbSyncStateORM
+from src.database.repositories import BaseRepository
+
+
+class WbSyncStateRepository(BaseRepository):
+    async def get(self, name: str) -> Optional[WbSyncStateORM]:
+        return await self.session.get(WbSyncStateORM, name)
+
+    async def get_by_prefix(self, prefix: str) -> list[WbSyncStateORM]:
+        result = await self.session.execute(
+            select(WbSyncStateORM).where(WbSyncStateORM.name.startswith(prefix))
+        )
+        return list(result.scalars().all())
+
+    async def save_cursor(
+        self,
+        name: str,
+        cursor: datetime,
+        last_full_sync_at: Optional[datetime] = None,
+    ) -> None:
+        """
+        Сохраняет курсор синхронизации (и время полной сверки, если передано)
+        """
+        values = {"name": name, "cursor": cursor}
+        if last_full_sync_at is not None:
+            values["last_full_sync_at"] = last_full_sync_at
+
+        stmt = pg_insert(WbSyncStateORM).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[WbSyncStateORM.name],
+            set_={
+                **{key: stmt.excluded[key] for key in values if key != "name"},
+                "updated_at": func.now(),
+            },
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
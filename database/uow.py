@@ -12,6 +12,7 @@ from src.database.repositories import (
     UserRepository,
     WbAssemblyTaskRepository,
     SupplyRepository,
+    RegionRepository,
 )
 from src.database.repositories.wb_article import WbArticleRepository
 from src.database.repositories.wb_order import WbOrderRepository
@@ -32,6 +33,7 @@ class UnitOfWork:
         self.wb_assembly_task: WbAssemblyTaskRepository | None = None
         self.supply: SupplyRepository | None = None
         self.wb_article: WbArticleRepository | None = None
+        self.region: RegionRepository | None = None
 
     async def __aenter__(self):
         self.session = AsyncSessionLocal()
@@ -47,6 +49,7 @@ class UnitOfWork:
         self.wb_assembly_task = WbAssemblyTaskRepository(self.session)
         self.supply = SupplyRepository(self.session)
         self.wb_article = WbArticleRepository(self.session)
+        self.region = RegionRepository(self.session)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -19,6 +19,7 @@ class Supply(BaseModelWithConfig):
     created_at: datetime
     order_count: int
     status: Optional[SupplyStatus] = None
+    account_id: Optional[int] = None
 
     def is_active(self) -> bool:
         """Проверяет, активна ли поставка."""
@@ -1,12 +1,22 @@
 from datetime import datetime
 from typing import Optional
 
+from src.core.enums.assembly_task import AssemblyTaskStatus
 from src.core.models.base import BaseModelWithConfig
 
 
 class WbAssemblyTask(BaseModelWithConfig):
     id: int
     wb_order_id: str
+    account_id: Optional[int] = None
     supply_id: Optional[str] = None
     added_to_supply_at: Optional[datetime] = None
+    supply_state: Optional[str] = None
     created_at: datetime
+    supplier_status: Optional[str] = None
+    wb_status: Optional[str] = None
+    status_changed_at: Optional[datetime] = None
+
+    @property
+    def is_cancelled(self) -> bool:
+        return AssemblyTaskStatus.is_cancelled(self.supplier_status, self.wb_status)
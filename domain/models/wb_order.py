@@ -10,3 +10,4 @@ class WbOrder(BaseModelWithConfig):
     is_cancel: bool
     material_id: Optional[int] = None
     nm_id: int
+    account_id: Optional[int] = None
@@ -1,3 +1,31 @@
+import re
+from typing import Mapping
+
+CITY_TO_REGION = {
+    "Москва": "Московская область",
+    "Санкт-Петербург": "Ленинградская область",
+    "Севастополь": "Республика Крым",
+}
+"""Города федерального значения, которые WB указывает вместо региона"""
+
+
 def normalize_region(region: str) -> str:
     """Приводит название региона к стандартному виду."""
-    return region.lower().replace("республика", "").strip()
+    region = region.lower().replace("ё", "е").replace("республика", "")
+    return re.sub(r"\s+", " ", region).strip()
+
+
+def city_to_region(region_name: str) -> str:
+    """Заменяет название города на регион (WB отдает город вместо региона)."""
+    return CITY_TO_REGION.get(region_name, region_name)
+
+
+def resolve_region_code(region: str, aliases: Mapping[str, str]) -> str:
+    """
+    Возвращает канонический код региона по названию.
+
+    aliases - словарь {нормализованный синоним: код региона};
+    если синонима нет, кодом считается нормализованное название.
+    """
+    normalized = normalize_region(region)
+    return aliases.get(normalized, normalized)
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import logging
+import zlib
+from typing import Awaitable, Callable, Optional
+
+from aio_pika import connect_robust, IncomingMessage
+
+from src.core.config.settings import settings
+
+log = logging.getLogger(__name__)
+
+
+class PartitionedQueueConsumer:
+    """
+    Обработчик очереди с несколькими параллельными полосами (lanes).
+
+    Сообщение направляется в полосу по ключу партиции (crc32(key) % lanes):
+    сообщения с одним ключом обрабатываются последовательно в порядке
+    поступления, с разными ключами - параллельно. Ключ вычисляется
+    partition_key_func(data) последовательно для всех сообщений, поэтому
+    порядок внутри ключа сохраняется.
+    """
+
+    def __init__(
+        self,
+        queue_name: str,
+        handler_func: Callable[[dict], Awaitable],
+        partition_key_func: Callable[[dict], Awaitable[Optional[str]]],
+        lanes: int = 8,
+        lane_prefetch: int = 4,
+    ):
+        """
+        :param lanes: Количество полос (одновременно обрабатываемых ключей)
+        :param lane_prefetch: Неподтвержденных сообщений на полосу
+        """
+        self.queue_name = queue_name
+        self.handler_func = handler_func
+        self.partition_key_func = partition_key_func
+        self.lanes = lanes
+        self.lane_prefetch = lane_prefetch
+        self.rabbitmq_url = settings.rabbitmq_url
+
+        self._incoming: asyncio.Queue = asyncio.Queue()
+        self._lane_queues = [asyncio.Queue() for _ in range(lanes)]
+
+    async def start(self):
+        connection = await connect_robust(self.rabbitmq_url)
+        channel = await connection.channel()
+        await channel.set_qos(prefetch_count=self.lanes * self.lane_prefetch)
+
+        queue = await channel.declare_queue(
+            self.queue_name,
+            durable=True,
+        )
+
+        tasks = [asyncio.create_task(self._dispatch())] + [
+            asyncio.create_task(self._run_lane(lane)) for lane in range(self.lanes)
+        ]
+
+        log.info(
+            f"👂 Ожидание сообщений в очереди '{self.queue_name}' ({self.lanes} полос)..."
+        )
+        await queue.consume(self._on_message)
+
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _on_message(self, message: IncomingMessage):
+        # Без await: сообщения попадают в очередь в порядке доставки
+        self._incoming.put_nowait(message)
+
+    def lane_for(self, key: Optional[str]) -> int:
+        return zlib.crc32(str(key).encode()) % self.lanes
+
+    async def _dispatch(self):
+        while True:
+            message = await self._incoming.get()
+
+            try:
+                data = json.loads(message.body.decode())
+                key = await self.partition_key_func(data)
+            except Exception as e:
+                log.error(
+                    f"[ERROR] Не удалось определить партицию сообщения "
+                    f"{message.body.decode()} из '{self.queue_name}': {e}",
+                    exc_info=True,
+                )
+                data, key = None, None
+
+            self._lane_queues[self.lane_for(key)].put_nowait((message, data))
+
+    async def _run_lane(self, lane: int):
+        queue = self._lane_queues[lane]
+
+        while True:
+            message, data = await queue.get()
+
+            async with message.process():
+                try:
+                    if data is None:
+                        data = json.loads(message.body.decode())
+
+                    log.info(f"Получено сообщение (полоса {lane}): {data}")
+
+                    await self.handler_func(data)
+                    log.info("Сообщение обработано успешно.")
+                except Exception as e:
+                    log.error(
+                        f"[ERROR] Ошибка обработки сообщения {message.body.decode()} из '{self.queue_name}': {e}",
+                        exc_info=True,
+                    )
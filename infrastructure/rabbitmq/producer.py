@@ -1,6 +1,8 @@
 import asyncio
 import json
 import logging
+import math
+from typing import Optional
 
 from aio_pika import connect_robust, Message, DeliveryMode
 from aiormq import AMQPConnectionError
@@ -11,7 +13,11 @@ log = logging.getLogger(__name__)
 
 
 async def send_to_queue(
-    queue_name: str, data: dict, retry: int = 3, delay: float = 2.0
+    queue_name: str,
+    data: dict,
+    retry: int = 3,
+    delay: float = 2.0,
+    arguments: Optional[dict] = None,
 ):
     """
     Отправляет данные в очередь RabbitMQ с retry и reconnect.
@@ -20,6 +26,7 @@ async def send_to_queue(
     :param data: dict с данными
     :param retry: количество попыток переподключения
     :param delay: задержка между попытками (сек)
+    :param arguments: аргументы объявления очереди (x-message-ttl, ...)
     """
     attempt = 0
     while attempt < retry:
@@ -27,15 +34,20 @@ async def send_to_queue(
             connection = await connect_robust(settings.rabbitmq_url)
             channel = await connection.channel()
 
-            await channel.declare_queue(queue_name, durable=True)
-
-            message = Message(
-                body=json.dumps(data).encode(), delivery_mode=DeliveryMode.PERSISTENT
+            await channel.declare_queue(
+                queue_name, durable=True, arguments=arguments
             )
 
+            body = json.dumps(data).encode()
+            message = Message(body=body, delivery_mode=DeliveryMode.PERSISTENT)
+
             await channel.default_exchange.publish(message, routing_key=queue_name)
 
-            log.info(f"✅ Сообщение отправлено в очередь '{queue_name}': {data}")
+            # Сообщение может содержать тысячи заказов: содержимое только в DEBUG
+            log.info(
+                f"✅ Сообщение отправлено в очередь '{queue_name}' ({len(body)} байт)"
+            )
+            log.debug(f"Сообщение в очереди '{queue_name}': {data}")
             await connection.close()
             return True
 
@@ -54,3 +66,27 @@ async def send_to_queue(
         f"❌ Не удалось отправить сообщение в очередь '{queue_name}' после {retry} попыток"
     )
     return False
+
+
+async def send_to_queue_delayed(queue_name: str, data: dict, seconds: float):
+    """
+    Отправляет данные в очередь через seconds секунд, не занимая обработчик.
+
+    Сообщение ждет в очереди <queue_name>.delay.<seconds> с x-message-ttl,
+    по истечении которого RabbitMQ перекладывает его (dead letter) в queue_name.
+    У каждой задержки своя очередь: сообщения с разным TTL в одной очереди
+    истекали бы только по очереди. Неиспользуемая очередь задержки удаляется
+    (x-expires).
+    """
+    seconds = max(1, math.ceil(seconds))
+
+    return await send_to_queue(
+        queue_name=f"{queue_name}.delay.{seconds}",
+        data=data,
+        arguments={
+            "x-message-ttl": seconds * 1000,
+            "x-dead-letter-exchange": "",
+            "x-dead-letter-routing-key": queue_name,
+            "x-expires": seconds * 1000 + 60_000,
+        },
+    )
@@ -0,0 +1,61 @@
+from typing import Optional
+
+
+class WbApiError(Exception):
+    """Базовое исключение WB API"""
+
+    def __init__(
+        self,
+        message: str,
+        endpoint: Optional[str] = None,
+        status_code: Optional[int] = None,
+    ):
+        super().__init__(message)
+        self.endpoint = endpoint
+        self.status_code = status_code
+
+
+class WbTransientError(WbApiError):
+    """Временная ошибка (сеть, 5xx, 429): запрос можно повторить позже"""
+
+    pass
+
+
+class WbRateLimitError(WbTransientError):
+    """WB ограничил частоту запросов (429)"""
+
+    def __init__(self, message: str, retry_after: float, **kwargs):
+        super().__init__(message, **kwargs)
+        self.retry_after = retry_after
+
+
+class WbCircuitOpenError(WbTransientError):
+    """Запрос не отправлен: метод WB недоступен (открыт circuit breaker)"""
+
+    def __init__(self, message: str, retry_after: float, **kwargs):
+        super().__init__(message, **kwargs)
+        self.retry_after = retry_after
+
+
+class WbClientError(WbApiError):
+    """Постоянная ошибка (4xx): повтор запроса не поможет"""
+
+    pass
+
+
+class WbAuthError(WbClientError):
+    """Неверный или просроченный токен (401/403)"""
+
+    pass
+
+
+class WbNotFoundError(WbClientError):
+    """Объект не найден (404)"""
+
+    pass
+
+
+class WbInvalidResponseError(WbApiError):
+    """Ответ WB не соответствует ожидаемому формату"""
+
+    pass
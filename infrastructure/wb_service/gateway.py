@@ -0,0 +1,523 @@
+"""
+Единый клиент WB API (статистика и маркетплейс).
+
+Все запросы к WB проходят через WbGateway: общий пул соединений,
+общий лимитер запросов (см. rate_limiter), повтор идемпотентных запросов
+с экспоненциальной задержкой и случайным разбросом, circuit breaker на каждый
+метод и типизированные ошибки (см. exceptions).
+"""
+
+import asyncio
+import importlib.util
+import json
+import logging
+import random
+import re
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, List, Type, TypeVar
+
+import httpx
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from src.core.config.settings import settings
+from src.infrastructure.wb_service.circuit_breaker import CircuitBreaker
+from src.infrastructure.wb_service.exceptions import (
+    WbTransientError,
+    WbRateLimitError,
+    WbCircuitOpenError,
+    WbClientError,
+    WbAuthError,
+    WbNotFoundError,
+    WbInvalidResponseError,
+)
+from src.infrastructure.wb_service.models import (
+    CreateSupplyResponse,
+    AssemblyTaskStickersResponse,
+    WildberriesOrders,
+    WildberriesOrder,
+    WildberriesNewAssemblyTasks,
+    WildberriesAssemblyOrdersStatusResponse,
+)
+from src.infrastructure.wb_service.rate_limiter import (
+    WbRateLimiter,
+    resolve_bucket,
+    parse_retry_after,
+)
+
+log = logging.getLogger(__name__)
+
+ORDERS_REPORT_LIMIT = 80_000
+"""Максимальное количество строк в одном ответе отчета о заказах"""
+
+ORDERS_CHUNK_SIZE = 1000
+"""Размер пачки заказов при потоковом разборе отчета"""
+
+WILDBERRIES_ORDERS_ADAPTER = TypeAdapter(list[WildberriesOrder])
+
+# Ошибки, при которых запрос гарантированно не был отправлен
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+_JSON_DECODER = json.JSONDecoder()
+_JSON_ARRAY_SEPARATORS = re.compile(r"[\s,]*")
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+async def iter_json_array(chunks: AsyncIterator[str], batch_size: int) -> AsyncIterator[list]:
+    """
+    Разбирает JSON-массив объектов по мере поступления текста
+    и возвращает элементы пачками по batch_size.
+
+    В памяти хранится только неразобранный остаток текста и текущая пачка.
+    """
+    buffer = ""
+    started = finished = False
+    batch = []
+
+    async for text in chunks:
+        if finished:
+            break
+
+        buffer += text
+        pos = 0
+
+        while True:
+            pos = _JSON_ARRAY_SEPARATORS.match(buffer, pos).end()
+            if pos >= len(buffer):
+                break
+
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError(f"Ожидался JSON-массив: {buffer[:100]}")
+                started = True
+                pos += 1
+                continue
+
+            if buffer[pos] == "]":
+                finished = True
+                break
+
+            try:
+                item, pos = _JSON_DECODER.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Элемент загружен не полностью
+                break
+
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+        buffer = buffer[pos:]
+
+    if not finished:
+        raise ValueError("JSON-массив не завершен")
+
+    if batch:
+        yield batch
+
+
+class WbGateway:
+    def __init__(
+        self,
+        token: str,
+        rate_limiter: Optional[WbRateLimiter] = None,
+        timeout: float = 30,
+        max_retries: int = 3,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        statistics_url: Optional[str] = None,
+        marketplace_url: Optional[str] = None,
+    ):
+        """
+        Один экземпляр использует общий пул соединений (keep-alive, HTTP/2 при
+        установленном пакете h2), поэтому его следует создавать один раз на
+        процесс и закрывать через close().
+
+        :param token: Токен для авторизации в API
+        :param rate_limiter: Общий лимитер запросов к WB API
+        :param timeout: Таймаут запроса (сек)
+        :param max_retries: Количество повторов временных ошибок
+        :param backoff_base: Начальная задержка повтора (сек)
+        :param backoff_max: Максимальная задержка повтора (сек)
+        :param failure_threshold: Ошибок подряд до отключения метода
+        :param recovery_timeout: На сколько секунд отключается метод
+        :param statistics_url: Адрес API статистики (по умолчанию из настроек)
+        :param marketplace_url: Адрес API маркетплейса (по умолчанию из настроек)
+        """
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.statistics_url = statistics_url or settings.WB_STATISTICS_API_URL
+        self.marketplace_url = marketplace_url or settings.WB_MARKETPLACE_API_URL
+
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._active_requests = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._client = httpx.AsyncClient(
+            headers={"Authorization": token},
+            timeout=httpx.Timeout(timeout, connect=10),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            http2=importlib.util.find_spec("h2") is not None,
+        )
+
+    @classmethod
+    def for_account(
+        cls,
+        account_id: int,
+        wb_token: Optional[str],
+        rate_limiter: Optional[WbRateLimiter] = None,
+        **kwargs,
+    ) -> "WbGateway":
+        """
+        Клиент кабинета продавца: токен кабинета (или settings.WB_TOKEN,
+        если не задан) и отдельные лимиты запросов.
+        """
+        return cls(
+            token=wb_token or settings.WB_TOKEN,
+            rate_limiter=rate_limiter.scoped(str(account_id)) if rate_limiter else None,
+            **kwargs,
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        await self._client.aclose()
+
+    async def close_when_idle(self, delay: float = 0):
+        """
+        Закрывает клиент, который больше не выдается (например, после смены
+        токена), когда завершатся выполняемые им запросы.
+
+        :param delay: Сколько секунд ждать перед закрытием: обработчики,
+            получившие клиент ранее, могут выполнить следующие запросы
+        """
+        await asyncio.sleep(delay)
+        await self._idle.wait()
+        await self.close()
+
+    @asynccontextmanager
+    async def _track_request(self):
+        self._active_requests += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self._active_requests -= 1
+            if not self._active_requests:
+                self._idle.set()
+
+    def _breaker(self, endpoint: str) -> CircuitBreaker:
+        if endpoint not in self._breakers:
+            self._breakers[endpoint] = CircuitBreaker(
+                failure_threshold=self.failure_threshold,
+                recovery_timeout=self.recovery_timeout,
+            )
+        return self._breakers[endpoint]
+
+    def _bucket(self, url: str) -> str:
+        # Группа лимита по адресу API, а не по хосту: адрес может быть
+        # переопределен (локальный сервер бенчмарков)
+        if url.startswith(self.statistics_url):
+            return "statistics"
+        if url.startswith(self.marketplace_url):
+            return "marketplace"
+        return resolve_bucket(url)
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: повторы разных воркеров не совпадают по времени
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    @staticmethod
+    def _client_error(endpoint: str, response: httpx.Response) -> WbClientError:
+        message = f"WB API {endpoint}: {response.status_code}, {response.text}"
+        kwargs = {"endpoint": endpoint, "status_code": response.status_code}
+
+        if response.status_code in (401, 403):
+            return WbAuthError(message, **kwargs)
+        if response.status_code == 404:
+            return WbNotFoundError(message, **kwargs)
+        return WbClientError(message, **kwargs)
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        endpoint: str,
+        idempotent: bool = True,
+        stream: bool = False,
+        **kwargs,
+    ) -> httpx.Response:
+        """
+        Выполняет запрос к WB API.
+
+        Временные ошибки повторяются до max_retries раз: для идемпотентных
+        запросов - любые, для остальных - только если запрос не дошел до WB
+        (ошибка соединения, 429). Ошибки 4xx не повторяются.
+
+        :param endpoint: Название метода (ключ circuit breaker)
+        :param stream: Не читать тело ответа (его нужно закрыть через aclose())
+        :raises WbApiError: ошибка запроса (см. exceptions)
+        """
+        async with self._track_request():
+            return await self._send_with_retries(
+                method, url, endpoint, idempotent, stream, **kwargs
+            )
+
+    async def _send_with_retries(
+        self,
+        method: str,
+        url: str,
+        endpoint: str,
+        idempotent: bool,
+        stream: bool,
+        **kwargs,
+    ) -> httpx.Response:
+        breaker = self._breaker(endpoint)
+        bucket = self._bucket(url)
+
+        for attempt in range(self.max_retries + 1):
+            trial = breaker.state == breaker.HALF_OPEN
+
+            if not breaker.allow_request():
+                raise WbCircuitOpenError(
+                    f"WB API {endpoint} временно отключен после ошибок",
+                    retry_after=breaker.retry_after,
+                    endpoint=endpoint,
+                )
+
+            delay = None
+
+            try:
+                if self.rate_limiter:
+                    await self.rate_limiter.acquire(bucket)
+
+                response = await self._client.send(
+                    self._client.build_request(method, url, **kwargs), stream=stream
+                )
+
+                if stream and not response.is_success:
+                    try:
+                        await response.aread()
+                    finally:
+                        await response.aclose()
+            except httpx.TransportError as e:
+                breaker.record_failure()
+                error = WbTransientError(
+                    f"WB API {endpoint}: {e!r}", endpoint=endpoint
+                )
+                retryable = idempotent or isinstance(e, NOT_SENT_ERRORS)
+            except BaseException:
+                # Запрос прерван не из-за WB (лимитер, отмена, ошибка httpx):
+                # пробный запрос не должен оставлять метод закрытым навсегда
+                if trial:
+                    breaker.release_trial()
+                raise
+            else:
+                if response.is_success:
+                    breaker.record_success()
+                    return response
+
+                if response.status_code == 429:
+                    # WB отвечает, метод доступен: breaker не открывается
+                    breaker.record_success()
+                    retry_after = parse_retry_after(
+                        response.headers, default=self._backoff(attempt)
+                    )
+                    error = WbRateLimitError(
+                        f"WB API {endpoint}: 429, {response.text}",
+                        retry_after=retry_after,
+                        endpoint=endpoint,
+                        status_code=429,
+                    )
+                    retryable = True
+
+                    if self.rate_limiter:
+                        # Ожидание разделяют все запросы группы
+                        await self.rate_limiter.penalize(bucket, retry_after)
+                        delay = 0
+                    else:
+                        delay = retry_after
+
+                elif response.status_code >= 500:
+                    breaker.record_failure()
+                    error = WbTransientError(
+                        f"WB API {endpoint}: {response.status_code}, {response.text}",
+                        endpoint=endpoint,
+                        status_code=response.status_code,
+                    )
+                    retryable = idempotent
+
+                else:
+                    breaker.record_success()
+                    raise self._client_error(endpoint, response)
+
+            if not retryable or attempt == self.max_retries:
+                raise error
+
+            if delay is None:
+                delay = self._backoff(attempt)
+
+            log.warning(
+                "%s. Повтор %s/%s через %.1f сек",
+                error,
+                attempt + 1,
+                self.max_retries,
+                delay,
+            )
+            await asyncio.sleep(delay)
+
+    async def _request_model(
+        self, model: Type[ModelT], method: str, url: str, endpoint: str, **kwargs
+    ) -> ModelT:
+        response = await self._request(method, url, endpoint, **kwargs)
+
+        try:
+            return model.model_validate_json(response.content)
+        except ValidationError as e:
+            raise WbInvalidResponseError(
+                f"WB API {endpoint}: неожиданный ответ: {e}", endpoint=endpoint
+            ) from e
+
+    async def fetch_orders_report(self, date_from: str, flag: int = 0) -> WildberriesOrders:
+        """
+        Получение отчета о заказах за указанный период.
+
+        При flag=0 возвращаются заказы, измененные начиная с date_from
+        (по lastChangeDate), не более ORDERS_REPORT_LIMIT строк за запрос.
+        Для больших отчетов используйте iter_orders_report.
+
+        :param date_from: Дата начала для выборки заказов (например, "2019-06-20" или "2019-06-20T23:59:59")
+        :param flag: Параметр фильтрации (0 или 1) для выбора типа данных
+        """
+        response = await self._request(
+            "GET",
+            f"{self.statistics_url}/api/v1/supplier/orders",
+            endpoint="orders_report",
+            params={"dateFrom": date_from, "flag": flag},
+        )
+
+        try:
+            orders = WILDBERRIES_ORDERS_ADAPTER.validate_json(response.content)
+        except ValidationError as e:
+            raise WbInvalidResponseError(
+                f"WB API orders_report: неожиданный ответ: {e}",
+                endpoint="orders_report",
+            ) from e
+
+        return WildberriesOrders(orders=orders)
+
+    async def iter_orders_report(
+        self, date_from: str, flag: int = 0, chunk_size: int = ORDERS_CHUNK_SIZE
+    ) -> AsyncIterator[list[WildberriesOrder]]:
+        """
+        Потоковое получение отчета о заказах (параметры как у fetch_orders_report).
+
+        Тело ответа разбирается по мере загрузки и возвращается пачками
+        по chunk_size заказов, поэтому расход памяти не зависит от размера отчета.
+        """
+        response = await self._request(
+            "GET",
+            f"{self.statistics_url}/api/v1/supplier/orders",
+            endpoint="orders_report",
+            stream=True,
+            params={"dateFrom": date_from, "flag": flag},
+        )
+
+        # Соединение занято, пока читается тело ответа
+        async with self._track_request():
+            try:
+                async for chunk in iter_json_array(response.aiter_text(), chunk_size):
+                    yield WILDBERRIES_ORDERS_ADAPTER.validate_python(chunk)
+            except (ValueError, ValidationError) as e:
+                raise WbInvalidResponseError(
+                    f"WB API orders_report: неожиданный ответ: {e}",
+                    endpoint="orders_report",
+                ) from e
+            except httpx.TransportError as e:
+                raise WbTransientError(
+                    f"WB API orders_report: {e!r}", endpoint="orders_report"
+                ) from e
+            finally:
+                await response.aclose()
+
+    async def fetch_new_assembly_tasks(self) -> WildberriesNewAssemblyTasks:
+        """
+        Список всех новых сборочных заданий продавца на момент запроса.
+        """
+        return await self._request_model(
+            WildberriesNewAssemblyTasks,
+            "GET",
+            f"{self.marketplace_url}/api/v3/orders/new",
+            endpoint="new_assembly_tasks",
+        )
+
+    async def fetch_assembly_task_statuses(
+        self, ids: list[int]
+    ) -> WildberriesAssemblyOrdersStatusResponse:
+        """
+        Статусы сборочных заданий по их идентификаторам (не более 1000).
+        """
+        return await self._request_model(
+            WildberriesAssemblyOrdersStatusResponse,
+            "POST",
+            f"{self.marketplace_url}/api/v3/orders/status",
+            endpoint="assembly_task_statuses",
+            json={"orders": ids},
+        )
+
+    async def create_supply(self, name: str) -> CreateSupplyResponse:
+        # Не идемпотентен: повтор после отправки может создать вторую поставку
+        supply = await self._request_model(
+            CreateSupplyResponse,
+            "POST",
+            f"{self.marketplace_url}/api/v3/supplies",
+            endpoint="create_supply",
+            idempotent=False,
+            json={"name": name},
+        )
+        log.info("Создана поставка: %s", supply.id)
+        return supply
+
+    async def add_assembly_task_to_supply(self, supply_id: str, assembly_task_id: int):
+        await self._request(
+            "PATCH",
+            f"{self.marketplace_url}/api/v3/supplies/{supply_id}/orders/{assembly_task_id}",
+            endpoint="add_to_supply",
+        )
+        log.info(
+            "Добавлено сборочное задание %s в поставку %s", assembly_task_id, supply_id
+        )
+        return True
+
+    async def get_assembly_task_stickers(
+        self,
+        assembly_task_ids: List[int],
+        sticker_type: str = "png",
+        width: int = 58,
+        height: int = 40,
+    ) -> AssemblyTaskStickersResponse:
+        stickers = await self._request_model(
+            AssemblyTaskStickersResponse,
+            "POST",
+            f"{self.marketplace_url}/api/v3/orders/stickers",
+            endpoint="stickers",
+            params={"type": sticker_type, "width": width, "height": height},
+            json={"orders": assembly_task_ids},
+        )
+
+        if not stickers.stickers:
+            log.warning("Нет стикеров для assembly_task_ids=%s", assembly_task_ids)
+
+        log.info("Получены стикеры для assembly_task_ids=%s", assembly_task_ids)
+        return stickers
@@ -1,6 +1,9 @@
+from datetime import datetime, timezone
 from typing import List
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+from src.core.utils.time import now_utc
 
 
 class CreateSupplyResponse(BaseModel):
@@ -17,3 +20,72 @@ class AssemblyTaskSticker(BaseModel):
 
 class AssemblyTaskStickersResponse(BaseModel):
     stickers: List[AssemblyTaskSticker] = []
+
+
+class WildberriesOrders(BaseModel):
+    orders: list["WildberriesOrder"] = []
+
+
+class WildberriesOrder(BaseModel):
+    id: str = Field(alias="srid")
+    created_at: datetime = Field(alias="date")
+    country_name: str = Field(alias="countryName")
+    region_name: str = Field(alias="regionName")
+    supplier_article: str = Field(alias="supplierArticle")
+    nm_id: int = Field(alias="nmId")
+    is_cancel: bool = Field(alias="isCancel")
+    cancel_date: datetime = Field(alias="cancelDate")
+    warehouse_name: str = Field(alias="warehouseName")
+    warehouse_type: str = Field(alias="warehouseType")
+    last_change_date: datetime = Field(alias="lastChangeDate")
+
+
+class WildberriesNewAssemblyTasks(BaseModel):
+    orders: list["WildberriesAssemblyTask"] = []
+
+
+class WildberriesAssemblyTask(BaseModel):
+    id: int = Field(alias="id")
+    wb_order_id: str = Field(alias="rid")
+    created_at: datetime = Field(alias="createdAt", default_factory=now_utc)
+
+    @field_validator("created_at")
+    @classmethod
+    def to_naive_utc(cls, value: datetime) -> datetime:
+        # WB отдает createdAt в UTC ("2022-05-04T07:56:29Z"), в БД - UTC без tzinfo
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+
+class WildberriesAssemblyOrderStatus(BaseModel):
+    """
+    https://dev.wildberries.ru/openapi/orders-fbs#tag/Sborochnye-zadaniya/paths/~1api~1v3~1orders/get
+
+    Возможные значения supplierStatus:
+        new — новое сборочное задание
+        confirm — на сборке для доставки силами Wildberries fbs
+        complete — в доставке для доставки силами Wildberries fbs и курьером WB wbgo
+        cancel — отменено продавцом
+
+    Возможные значения wbStatus:
+        waiting — сборочное задание в работе
+        sorted — сборочное задание отсортировано
+        sold — сборочное задание получено покупателем
+        canceled — отмена сборочного задания
+        canceled_by_client — покупатель отменил заказ при получении
+        declined_by_client — покупатель отменил заказ. Отмена доступна покупателю в первый час с момента заказа, если заказ не переведён на сборку
+        defect — отмена сборочного задания по причине брака
+        ready_for_pickup — сборочное задание прибыло на пункт выдачи заказов (ПВЗ)
+        postponed_delivery — курьерская доставка отложена
+
+    WB добавляет новые статусы без предупреждения, поэтому значения
+    не ограничиваются списком (см. core/enums/assembly_task.AssemblyTaskStatus).
+    """
+    id: int
+    supplier_status: str = Field(alias="supplierStatus")
+    wb_status: str = Field(alias="wbStatus")
+
+
+class WildberriesAssemblyOrdersStatusResponse(BaseModel):
+    orders: List[WildberriesAssemblyOrderStatus]
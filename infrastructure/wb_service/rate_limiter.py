@@ -0,0 +1,204 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urlparse
+
+from redis.asyncio import Redis
+
+from src.core.config.settings import settings
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    requests: int
+    """Запросов за период"""
+    period: float
+    """Период (сек)"""
+    burst: int = 1
+    """Запросов, которые можно выполнить подряд без ожидания"""
+
+    @property
+    def interval_ms(self) -> int:
+        return int(self.period / self.requests * 1000)
+
+
+WB_RATE_LIMITS: dict[str, RateLimit] = {
+    # Отчеты статистики: 1 запрос в минуту
+    "statistics": RateLimit(requests=1, period=60),
+    # Сборочные задания, поставки, стикеры: 300 запросов в минуту
+    "marketplace": RateLimit(requests=300, period=60, burst=20),
+}
+"""Лимиты WB API по группам методов"""
+
+DEFAULT_RATE_LIMIT = RateLimit(requests=60, period=60, burst=5)
+
+WB_HOST_BUCKETS = {
+    "statistics-api.wildberries.ru": "statistics",
+    "marketplace-api.wildberries.ru": "marketplace",
+}
+
+
+def resolve_bucket(url: str) -> str:
+    """
+    Определяет группу лимита запроса по хосту WB API.
+    """
+    host = urlparse(url).hostname or ""
+    return WB_HOST_BUCKETS.get(host, host)
+
+
+# GCRA: в ключе хранится теоретическое время прихода следующего запроса (TAT).
+# Скрипт резервирует слот и возвращает, сколько миллисекунд ждать до него,
+# поэтому запросы встают в очередь, а не получают отказ.
+# ARGV: интервал (мс), допуск пачки (мс), штраф (мс, retry_after).
+# Штраф сдвигает TAT с учетом допуска пачки: иначе первый запрос после
+# штрафа ждал бы на допуск меньше retry_after.
+_ACQUIRE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local penalty = tonumber(ARGV[3])
+
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+
+if penalty > 0 then
+    if tat < now + penalty + tolerance then
+        tat = now + penalty + tolerance
+    end
+    redis.call('SET', KEYS[1], tat, 'PX', tat - now + interval)
+    return 0
+end
+
+local wait = tat - tolerance - now
+if wait < 0 then
+    wait = 0
+end
+
+local new_tat = tat + interval
+redis.call('SET', KEYS[1], new_tat, 'PX', new_tat - now + interval)
+return wait
+"""
+
+
+class WbRateLimiter:
+    """
+    Распределенный лимитер запросов к WB API (GCRA / token bucket в Redis).
+
+    Общий для всех процессов, обращающихся к WB с одним токеном: синхронизации
+    данных, воркера поставок и бота. Время ожидания по каждой группе
+    накапливается в Redis (wb_rate_limit:metrics:<группа>).
+
+    Лимиты WB действуют на каждый кабинет продавца отдельно: для кабинета
+    используется лимитер с собственным namespace (см. scoped).
+    """
+
+    KEY_PREFIX = "wb_rate_limit"
+
+    def __init__(
+        self,
+        redis: Redis,
+        limits: Optional[dict[str, RateLimit]] = None,
+        namespace: Optional[str] = None,
+    ):
+        self.redis = redis
+        self.limits = limits or WB_RATE_LIMITS
+        self.namespace = namespace
+        self._prefix = (
+            f"{self.KEY_PREFIX}:{namespace}" if namespace else self.KEY_PREFIX
+        )
+        self._script = redis.register_script(_ACQUIRE_SCRIPT)
+
+    @classmethod
+    def from_settings(cls) -> "WbRateLimiter":
+        return cls(
+            Redis.from_url(f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/0")
+        )
+
+    def scoped(self, namespace: str) -> "WbRateLimiter":
+        """
+        Лимитер с отдельными ключами (например, для кабинета продавца)
+        на том же соединении Redis.
+        """
+        return WbRateLimiter(self.redis, self.limits, namespace=namespace)
+
+    def _limit(self, bucket: str) -> RateLimit:
+        return self.limits.get(bucket, DEFAULT_RATE_LIMIT)
+
+    async def acquire(self, bucket: str) -> float:
+        """
+        Ожидает свой слот в группе bucket.
+
+        :return: время ожидания (сек)
+        """
+        limit = self._limit(bucket)
+        wait_ms = await self._script(
+            keys=[f"{self._prefix}:{bucket}"],
+            args=[limit.interval_ms, limit.interval_ms * (limit.burst - 1), 0],
+        )
+        wait = int(wait_ms) / 1000
+
+        await self._record_wait(bucket, wait)
+
+        if wait > 0:
+            if wait >= 1:
+                log.info("Ожидание лимита WB API (%s): %.1f сек", bucket, wait)
+            await asyncio.sleep(wait)
+
+        return wait
+
+    async def penalize(self, bucket: str, retry_after: float) -> None:
+        """
+        Откладывает все запросы группы на retry_after секунд
+        (ответ 429 с заголовком Retry-After / X-Ratelimit-Retry).
+        """
+        limit = self._limit(bucket)
+        await self._script(
+            keys=[f"{self._prefix}:{bucket}"],
+            args=[
+                limit.interval_ms,
+                limit.interval_ms * (limit.burst - 1),
+                max(1, int(retry_after * 1000)),
+            ],
+        )
+        await self.redis.hincrby(f"{self._prefix}:metrics:{bucket}", "throttled", 1)
+        log.warning("WB API ограничил запросы (%s) на %s сек", bucket, retry_after)
+
+    async def _record_wait(self, bucket: str, wait: float) -> None:
+        key = f"{self._prefix}:metrics:{bucket}"
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hincrby(key, "requests", 1)
+            pipe.hincrbyfloat(key, "wait_seconds", wait)
+            if wait > 0:
+                pipe.hincrby(key, "waited", 1)
+            await pipe.execute()
+
+    async def get_metrics(self) -> dict[str, dict[str, float]]:
+        """
+        Метрики по группам: requests - запросов, waited - из них ожидали слот,
+        wait_seconds - суммарное ожидание, throttled - получено ответов 429.
+        """
+        metrics = {}
+        for bucket in self.limits:
+            data = await self.redis.hgetall(f"{self._prefix}:metrics:{bucket}")
+            metrics[bucket] = {k.decode(): float(v) for k, v in data.items()}
+        return metrics
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+def parse_retry_after(headers, default: float) -> float:
+    """
+    Задержка из заголовков ответа WB (X-Ratelimit-Retry, Retry-After).
+    """
+    retry_after = headers.get("X-Ratelimit-Retry") or headers.get("Retry-After")
+    try:
+        return float(retry_after) if retry_after else default
+    except ValueError:
+        return default
@@ -0,0 +1,240 @@
+"""
+Получение стикеров сборочных заданий пачками.
+
+Запросы стикеров, пришедшие в течение короткого окна, объединяются в один
+запрос к WB (не более STICKERS_BATCH_LIMIT заданий), и каждый стикер
+возвращается ожидающему его вызову. Полученные стикеры сохраняются в локальный
+кэш по содержимому, поэтому повторная обработка задания не запрашивает WB.
+"""
+
+import asyncio
+import hashlib
+import itertools
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+from src.infrastructure.wb_service.exceptions import WbNotFoundError
+from src.infrastructure.wb_service.gateway import WbGateway
+from src.infrastructure.wb_service.models import AssemblyTaskSticker
+
+log = logging.getLogger(__name__)
+
+STICKERS_BATCH_LIMIT = 100
+"""Максимум заданий в одном запросе стикеров WB"""
+
+STICKER_CACHE_TTL = 7 * 24 * 3600
+"""Срок хранения стикера в кэше (сек)"""
+
+STICKER_CACHE_CLEANUP_INTERVAL = 3600
+"""Как часто удалять устаревшие стикеры (сек)"""
+
+
+class StickerCache:
+    """
+    Кэш стикеров на диске, адресуемый по содержимому:
+        objects/<sha256[:2]>/<sha256>.json - стикер
+        tasks/<id задания>                 - sha256 стикера задания
+
+    Записи старше ttl удаляются (не чаще раза в cleanup_interval при записи):
+    стикер нужен, пока задание обрабатывается и печатается лист поставки.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        ttl: float = STICKER_CACHE_TTL,
+        cleanup_interval: float = STICKER_CACHE_CLEANUP_INTERVAL,
+    ):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.cleanup_interval = cleanup_interval
+        self._cleaned_at = 0.0
+
+        (self.directory / "objects").mkdir(parents=True, exist_ok=True)
+        (self.directory / "tasks").mkdir(parents=True, exist_ok=True)
+
+    def _object_path(self, digest: str) -> Path:
+        return self.directory / "objects" / digest[:2] / f"{digest}.json"
+
+    @staticmethod
+    def _write(path: Path, data: str):
+        # Запись через временный файл: читатель не увидит файл частично
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(data, encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def get(self, assembly_task_id: int) -> Optional[AssemblyTaskSticker]:
+        try:
+            digest = (self.directory / "tasks" / str(assembly_task_id)).read_text()
+            data = self._object_path(digest).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+        return AssemblyTaskSticker.model_validate_json(data)
+
+    def put(self, sticker: AssemblyTaskSticker):
+        data = sticker.model_dump_json(by_alias=True)
+        digest = hashlib.sha256(data.encode()).hexdigest()
+
+        path = self._object_path(digest)
+        if path.exists():
+            # Срок хранения отсчитывается от последней записи
+            path.touch()
+        else:
+            self._write(path, data)
+
+        self._write(self.directory / "tasks" / str(sticker.order_id), digest)
+
+        if time.monotonic() - self._cleaned_at >= self.cleanup_interval:
+            self.cleanup()
+
+    def cleanup(self) -> int:
+        """
+        Удаляет записи старше ttl. Задание, стикер которого удален,
+        получит стикер из WB заново.
+
+        :return: количество удаленных файлов
+        """
+        self._cleaned_at = time.monotonic()
+        expire_before = time.time() - self.ttl
+        removed = 0
+
+        for path in itertools.chain(
+            (self.directory / "tasks").iterdir(),
+            (self.directory / "objects").glob("*/*"),
+        ):
+            try:
+                if path.stat().st_mtime < expire_before:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                # Удален другим процессом
+                continue
+
+        if removed:
+            log.info("Кэш стикеров: удалено устаревших файлов %s", removed)
+
+        return removed
+
+
+class StickerBatcher:
+    def __init__(
+        self,
+        wb_client: WbGateway,
+        cache: Optional[StickerCache] = None,
+        window: float = 0.2,
+        max_batch: int = STICKERS_BATCH_LIMIT,
+    ):
+        """
+        :param wb_client: Клиент WB API кабинета
+        :param cache: Кэш стикеров
+        :param window: Сколько секунд собирать запросы в пачку
+        :param max_batch: Размер пачки, при котором запрос выполняется сразу
+        """
+        self.wb_client = wb_client
+        self.cache = cache
+        self.window = window
+        self.max_batch = min(max_batch, STICKERS_BATCH_LIMIT)
+
+        self._pending: dict[int, asyncio.Future] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        # Ссылки на запросы пачек: задачу без ссылки может удалить сборщик мусора
+        self._fetch_tasks: set[asyncio.Task] = set()
+
+        self.requests = 0
+        """Выполнено запросов к WB"""
+        self.cache_hits = 0
+
+    async def get(self, assembly_task_id: int) -> AssemblyTaskSticker:
+        """
+        Стикер сборочного задания.
+
+        :raises WbNotFoundError: WB не вернул стикер задания
+        :raises WbApiError: ошибка запроса пачки
+        """
+        if self.cache:
+            sticker = self.cache.get(assembly_task_id)
+            if sticker:
+                self.cache_hits += 1
+                return sticker
+
+        # Одновременные запросы одного задания ждут один результат
+        future = self._pending.get(assembly_task_id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[assembly_task_id] = future
+
+            if len(self._pending) >= self.max_batch:
+                self._flush_now()
+            elif self._flush_task is None:
+                self._flush_task = asyncio.create_task(self._flush_later())
+
+        return await asyncio.shield(future)
+
+    def _take_batch(self) -> dict[int, asyncio.Future]:
+        batch, self._pending = self._pending, {}
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        return batch
+
+    def _flush_now(self):
+        task = asyncio.create_task(self._fetch(self._take_batch()))
+        self._fetch_tasks.add(task)
+        task.add_done_callback(self._fetch_done)
+
+    def _fetch_done(self, task: asyncio.Task):
+        self._fetch_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            log.error("Ошибка запроса пачки стикеров", exc_info=task.exception())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.window)
+        self._flush_task = None
+        self._flush_now()
+
+    async def _fetch(self, batch: dict[int, asyncio.Future]):
+        if not batch:
+            return
+
+        ids = list(batch)
+        self.requests += 1
+
+        try:
+            response = await self.wb_client.get_assembly_task_stickers(
+                assembly_task_ids=ids
+            )
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        stickers = {sticker.order_id: sticker for sticker in response.stickers}
+        log.info(
+            "Стикеры WB: запрошено %s, получено %s", len(ids), len(stickers)
+        )
+
+        for assembly_task_id, future in batch.items():
+            sticker = stickers.get(assembly_task_id)
+
+            if sticker is None:
+                future.set_exception(
+                    WbNotFoundError(
+                        f"WB API stickers: нет стикера для задания {assembly_task_id}",
+                        endpoint="stickers",
+                    )
+                )
+                continue
+
+            if self.cache:
+                try:
+                    self.cache.put(sticker)
+                except OSError as e:
+                    log.warning("Не удалось сохранить стикер в кэш: %s", e)
+
+            future.set_result(sticker)
@@ -0,0 +1,57 @@
+import asyncio
+from collections import defaultdict
+
+
+class TelegramRateLimiter:
+    """
+    Ограничивает частоту отправки сообщений ботом в пределах одного процесса:
+    не более global_rate сообщений в секунду всего и не чаще одного сообщения
+    в private_interval / group_interval секунд в один чат.
+
+    Лимиты Telegram: ~30 сообщений в секунду, 1 сообщение в секунду в личный
+    чат и 20 сообщений в минуту в группу.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = 30,
+        private_interval: float = 1.0,
+        group_interval: float = 3.0,
+    ):
+        self.global_interval = 1 / global_rate
+        self.private_interval = private_interval
+        self.group_interval = group_interval
+
+        self._global_next = 0.0
+        self._chat_next: dict[int, float] = defaultdict(float)
+
+    def _chat_interval(self, chat_id: int) -> float:
+        # У групп и каналов отрицательные идентификаторы
+        return self.group_interval if chat_id < 0 else self.private_interval
+
+    async def acquire(self, chat_id: int) -> None:
+        """
+        Ожидает, пока можно будет отправить сообщение в чат.
+        """
+        loop = asyncio.get_running_loop()
+
+        # Слоты резервируются до ожидания, поэтому одновременные вызовы
+        # распределяются по времени, а не просыпаются вместе
+        now = loop.time()
+        chat_at = max(now, self._chat_next[chat_id])
+        self._chat_next[chat_id] = chat_at + self._chat_interval(chat_id)
+        if chat_at > now:
+            await asyncio.sleep(chat_at - now)
+
+        now = loop.time()
+        global_at = max(now, self._global_next)
+        self._global_next = global_at + self.global_interval
+        if global_at > now:
+            await asyncio.sleep(global_at - now)
+
+    def pause(self, chat_id: int, seconds: float) -> None:
+        """
+        Запрещает отправку в чат на seconds секунд (retry_after от Telegram).
+        """
+        until = asyncio.get_running_loop().time() + seconds
+        self._chat_next[chat_id] = max(self._chat_next[chat_id], until)
@@ -16,7 +16,13 @@ class TelegramNotifier:
     def __init__(self, bot: Bot):
         self.bot = bot
 
-    async def send(self, notification: NotificationMessage) -> bool:
+    async def send(
+        self, notification: NotificationMessage, raise_errors: bool = False
+    ) -> bool:
+        """
+        raise_errors - пробрасывать ошибки Telegram (например, TelegramRetryAfter),
+        чтобы вызывающий код мог повторить отправку
+        """
         try:
             keyboard = self._create_keyboard(
                 notification.buttons, row_width=notification.buttons_row_width
@@ -66,6 +72,8 @@ class TelegramNotifier:
 
         except Exception as e:
             log.error(f"❌ Ошибка отправки уведомления: {e}")
+            if raise_errors:
+                raise
             return False
 
     def _resolve_content(self, content: str):
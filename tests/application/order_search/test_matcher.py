@@ -0,0 +1,331 @@
+import asyncio
+from datetime import timedelta
+
+from sqlalchemy import select
+
+from src.application.order_search.matcher import (
+    SEARCH_TTL,
+    apply_outcomes,
+    claim_pending_searches,
+    expire_timed_out_searches,
+    find_candidate_orders,
+    load_searches,
+    match_pending_searches,
+    resolve_outcomes,
+)
+from src.core.enums.order_search import OrderSearchStatus
+from src.core.utils.time import now_utc
+from src.database.models import (
+    CategoryORM,
+    MaterialORM,
+    NotificationOutboxORM,
+    OrderSearchORM,
+    RegionAliasORM,
+    RegionORM,
+    TemplateORM,
+    UserORM,
+    WbArticleORM,
+    WbAssemblyTaskORM,
+    WbOrderORM,
+)
+from src.domain.wb_orders.normalizers import normalize_region
+from src.tests.database import clean_database, insert_rows
+
+WORKER_ID = "test"
+REGION = "Московская область"
+
+
+def order_row(order_id: str, nm_id: int, created_at, **kwargs) -> dict:
+    row = {
+        "id": order_id,
+        "created_at": created_at,
+        "region_name": REGION,
+        "region_code": normalize_region(REGION),
+        "country_name": "Россия",
+        "supplier_article": "ART-1",
+        "nm_id": nm_id,
+        "is_cancel": False,
+        "warehouse_type": "Склад продавца",
+    }
+    row.update(kwargs)
+    return row
+
+
+def search_row(search_id: int, order_created_at, **kwargs) -> dict:
+    # Пользователь вводит время заказа в UTC (см. parse_datetime_with_offset)
+    claimed = order_created_at - timedelta(hours=3)
+    row = {
+        "id": search_id,
+        "material_id": search_id,
+        "search_type": "REGION",
+        "filters": {
+            "order_datetime": claimed.strftime("%Y-%m-%d %H:%M:%S"),
+            "recipient_region": REGION,
+        },
+        "status": OrderSearchStatus.PENDING,
+        "created_at": now_utc(),
+    }
+    row.update(kwargs)
+    return row
+
+
+async def seed(session, searches: list[dict], orders: list[dict]):
+    code = normalize_region(REGION)
+    await insert_rows(session, RegionORM, [{"code": code, "name": REGION}])
+    await insert_rows(session, RegionAliasORM, [{"alias": code, "region_code": code}])
+    await insert_rows(session, UserORM, [{"id": 1, "first_name": "test"}])
+    await insert_rows(session, CategoryORM, [{"id": 1, "name": "Кружки"}])
+    await insert_rows(
+        session,
+        TemplateORM,
+        [
+            {
+                "id": 1,
+                "category_id": 1,
+                "name": "Кружка",
+                "template_json": {},
+                "form_steps": {},
+            }
+        ],
+    )
+    # Артикул 100 добавлен в шаблон дважды
+    await insert_rows(
+        session,
+        WbArticleORM,
+        [
+            {"wb_article": 100, "template_id": 1},
+            {"wb_article": 100, "template_id": 1},
+            {"wb_article": 101, "template_id": 1},
+        ],
+    )
+    await insert_rows(
+        session,
+        MaterialORM,
+        [
+            {"id": search["material_id"], "user_id": 1, "template_id": 1, "data": {}}
+            for search in searches
+        ],
+    )
+    await insert_rows(session, WbOrderORM, orders)
+    await insert_rows(
+        session,
+        WbAssemblyTaskORM,
+        [
+            {"id": 1000 + i, "wb_order_id": order["id"], "created_at": order["created_at"]}
+            for i, order in enumerate(orders)
+        ],
+    )
+    await insert_rows(session, OrderSearchORM, searches)
+
+
+def run(database_url: str, scenario):
+    async def main():
+        async with clean_database(database_url) as session_factory:
+            return await scenario(session_factory)
+
+    return asyncio.run(main())
+
+
+def test_duplicated_article_gives_one_candidate(database_url):
+    created_at = now_utc().replace(microsecond=0) - timedelta(hours=1)
+
+    async def scenario(session_factory):
+        async with session_factory() as session:
+            await seed(
+                session,
+                [search_row(1, created_at)],
+                [order_row("order.1", 100, created_at)],
+            )
+
+        async with session_factory() as session:
+            searches = await load_searches(session, [1])
+            assert searches[0].nm_ids == [100, 101]
+
+            candidates = await find_candidate_orders(session, searches)
+            assert [o.id for o in candidates[1]] == ["order.1"]
+
+            outcomes = resolve_outcomes(searches, candidates)
+            assert outcomes[0].status == OrderSearchStatus.FOUND
+
+    run(database_url, scenario)
+
+
+def test_match_pending_searches_saves_results(database_url):
+    created_at = now_utc().replace(microsecond=0) - timedelta(hours=1)
+    tied_at = created_at - timedelta(minutes=30)
+
+    async def scenario(session_factory):
+        async with session_factory() as session:
+            await seed(
+                session,
+                [
+                    search_row(1, created_at),
+                    search_row(2, tied_at),
+                    search_row(3, created_at - timedelta(minutes=10)),
+                ],
+                [
+                    order_row("order.1", 100, created_at),
+                    order_row("order.2", 100, tied_at),
+                    order_row("order.3", 101, tied_at),
+                ],
+            )
+
+        async with session_factory() as session:
+            outcomes, last_id = await match_pending_searches(session, WORKER_ID)
+
+        assert last_id == 3
+        assert [o.status for o in outcomes] == [
+            OrderSearchStatus.FOUND,
+            OrderSearchStatus.FOUND_MULTIPLE,
+            None,
+        ]
+
+        async with session_factory() as session:
+            searches = {
+                s.id: s for s in (await session.scalars(select(OrderSearchORM))).all()
+            }
+            order = await session.get(WbOrderORM, "order.1")
+            outbox = (await session.scalars(select(NotificationOutboxORM))).all()
+
+        assert order.material_id == 1
+
+        assert searches[1].status == OrderSearchStatus.FOUND
+        assert searches[2].status == OrderSearchStatus.FOUND_MULTIPLE
+        assert sorted(s["order_id"] for s in searches[2].match_scores) == [
+            "order.2",
+            "order.3",
+        ]
+        assert searches[1].match_scores is None
+
+        # Поиск без кандидатов ждет следующей проверки
+        pending = searches[3]
+        assert pending.status == OrderSearchStatus.PENDING
+        assert pending.next_check_at > now_utc()
+        assert pending.match_scores is None
+
+        for search in searches.values():
+            assert search.check_attempts == 1
+            assert search.leased_by is None
+
+        # Пользователю и администратору по каждому завершенному поиску
+        assert len(outbox) == 4
+        assert sum(n.coalesce for n in outbox) == 2
+
+        async with session_factory() as session:
+            # Следующая проверка еще не наступила
+            assert await match_pending_searches(session, WORKER_ID) is None
+
+    run(database_url, scenario)
+
+
+def test_claim_gives_workers_disjoint_pages(database_url):
+    created_at = now_utc().replace(microsecond=0) - timedelta(hours=1)
+
+    async def scenario(session_factory):
+        async with session_factory() as session:
+            await seed(
+                session,
+                [search_row(i, created_at) for i in range(1, 5)]
+                + [
+                    search_row(
+                        5, created_at, next_check_at=now_utc() + timedelta(minutes=5)
+                    )
+                ],
+                [],
+            )
+
+        async with session_factory() as first, session_factory() as second:
+            first_ids = await claim_pending_searches(first, "first", limit=2)
+            second_ids = await claim_pending_searches(second, "second", limit=10)
+            rest_ids = await claim_pending_searches(first, "first", limit=10)
+            not_due_ids = await claim_pending_searches(
+                first, "first", limit=10, due_only=False
+            )
+
+        assert first_ids == [1, 2]
+        assert second_ids == [3, 4]
+        assert rest_ids == []
+        assert not_due_ids == [5]
+
+    run(database_url, scenario)
+
+
+def test_results_of_lost_lease_are_discarded(database_url):
+    created_at = now_utc().replace(microsecond=0) - timedelta(hours=1)
+
+    async def scenario(session_factory):
+        async with session_factory() as session:
+            await seed(
+                session,
+                [search_row(1, created_at)],
+                [order_row("order.1", 100, created_at)],
+            )
+
+        async with session_factory() as session:
+            await claim_pending_searches(session, "first")
+            searches = await load_searches(session, [1])
+            outcomes = resolve_outcomes(
+                searches, await find_candidate_orders(session, searches)
+            )
+
+            saved = await apply_outcomes(session, "second", outcomes)
+
+        assert saved == []
+
+        async with session_factory() as session:
+            search = await session.get(OrderSearchORM, 1)
+            order = await session.get(WbOrderORM, "order.1")
+
+        assert search.status == OrderSearchStatus.PENDING
+        assert search.leased_by == "first"
+        assert order.material_id is None
+
+    run(database_url, scenario)
+
+
+def test_expire_timed_out_searches(database_url):
+    created_at = now_utc().replace(microsecond=0) - timedelta(hours=1)
+    expired_at = now_utc() - SEARCH_TTL - timedelta(minutes=1)
+
+    async def scenario(session_factory):
+        async with session_factory() as session:
+            await seed(
+                session,
+                [
+                    search_row(1, created_at, created_at=expired_at),
+                    search_row(2, created_at),
+                    # Поиск проверяется другим воркером
+                    search_row(
+                        3,
+                        created_at,
+                        created_at=expired_at,
+                        leased_by="other",
+                        lease_expires_at=now_utc() + timedelta(minutes=1),
+                    ),
+                ],
+                [],
+            )
+
+        async with session_factory() as session:
+            outcomes = await expire_timed_out_searches(session)
+
+        assert [o.search.id for o in outcomes] == [1]
+
+        async with session_factory() as session:
+            statuses = dict(
+                (
+                    await session.execute(
+                        select(OrderSearchORM.id, OrderSearchORM.status)
+                    )
+                ).all()
+            )
+            outbox = (await session.scalars(select(NotificationOutboxORM))).all()
+
+        assert statuses == {
+            1: OrderSearchStatus.TIMEOUT,
+            2: OrderSearchStatus.PENDING,
+            3: OrderSearchStatus.PENDING,
+        }
+        assert len(outbox) == 2
+
+    run(database_url, scenario)
@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta
+
+from src.application.dto.order_search.search_outcome import (
+    CandidateOrder,
+    CandidateScore,
+    SearchContext,
+)
+from src.application.order_search.scoring import pick_best_candidate, score_candidates
+
+TARGET_TIME = datetime(2026, 10, 18, 12, 0)
+TIME_WINDOW = timedelta(minutes=30)
+
+
+def make_search(search_id: int = 1, **kwargs) -> SearchContext:
+    data = dict(
+        id=search_id,
+        material_id=1,
+        search_type="TIME",
+        filters={},
+        created_at=TARGET_TIME,
+        template_id=1,
+        category_id=1,
+        user_id=1,
+        user_first_name="test",
+    )
+    data.update(kwargs)
+    return SearchContext(**data)
+
+
+def make_order(order_id: str, minutes: float = 0, search_id: int = 1, **kwargs):
+    data = dict(
+        search_id=search_id,
+        id=order_id,
+        nm_id=100,
+        region_name="Московская область",
+        country_name="Россия",
+        supplier_article="ART-1",
+        created_at=TARGET_TIME + timedelta(minutes=minutes),
+        is_cancel=False,
+        warehouse_type="Склад WB",
+    )
+    data.update(kwargs)
+    return CandidateOrder(**data)
+
+
+def score(orders: list[CandidateOrder], search: SearchContext = None):
+    search = search or make_search()
+    return score_candidates(
+        [search], {search.id: orders}, {search.id: TARGET_TIME}, TIME_WINDOW
+    )[search.id]
+
+
+def test_single_candidate_is_not_scored():
+    search = make_search()
+    result = score_candidates(
+        [search], {search.id: [make_order("a")]}, {search.id: TARGET_TIME}, TIME_WINDOW
+    )
+    assert result == {}
+
+
+def test_closest_order_wins_by_evidence():
+    scores = score([make_order("far", minutes=20), make_order("near", minutes=1)])
+
+    assert [s.order_id for s in scores] == ["near", "far"]
+    assert pick_best_candidate(scores, min_margin=0.2) == "near"
+
+
+def test_preferences_do_not_resolve_evidence_tie():
+    # Одинаковое время и регион: заказ с нашего склада, без материала
+    # и со сборочным заданием получает большую оценку, но не выбирается
+    scores = score(
+        [
+            make_order("wb", minutes=5, material_id=10),
+            make_order(
+                "own",
+                minutes=5,
+                warehouse_type="Склад продавца",
+                assembly_task_id=1,
+            ),
+        ]
+    )
+
+    assert scores[0].order_id == "own"
+    assert scores[0].score - scores[1].score >= 0.2
+    assert scores[0].evidence == scores[1].evidence
+    assert pick_best_candidate(scores, min_margin=0.2) is None
+
+
+def test_preferences_do_not_outrank_evidence():
+    scores = score(
+        [
+            make_order("near", minutes=1, material_id=10),
+            make_order(
+                "own",
+                minutes=10,
+                warehouse_type="Склад продавца",
+                assembly_task_id=1,
+            ),
+        ]
+    )
+
+    assert scores[0].order_id == "near"
+    assert scores[0].score < scores[1].score
+
+
+def test_cancel_flag_does_not_affect_score():
+    active = score([make_order("a", minutes=3), make_order("b", minutes=10)])
+    cancelled = score(
+        [make_order("a", minutes=3, is_cancel=True), make_order("b", minutes=10)]
+    )
+
+    assert active == cancelled
+
+
+def test_region_synonym_is_weaker_evidence():
+    search = make_search(
+        search_type="REGION", filters={"recipient_region": "Московская область"}
+    )
+    scores = score(
+        [
+            make_order("synonym", region_name="Москва"),
+            make_order("exact", region_name="Московская область"),
+        ],
+        search,
+    )
+
+    assert scores[0].order_id == "exact"
+    assert scores[0].evidence > scores[1].evidence
+
+
+def test_pick_best_candidate_margin():
+    scores = [
+        CandidateScore(order_id="a", score=0.9, evidence=0.6),
+        CandidateScore(order_id="b", score=0.8, evidence=0.35),
+    ]
+
+    assert pick_best_candidate(scores, min_margin=0.2) == "a"
+    assert pick_best_candidate(scores, min_margin=0.3) is None
+
+
+def test_pick_best_candidate_without_runner_up():
+    assert pick_best_candidate([], min_margin=0.2) is None
+    assert (
+        pick_best_candidate(
+            [CandidateScore(order_id="a", score=0.1, evidence=0.1)], min_margin=0.2
+        )
+        == "a"
+    )
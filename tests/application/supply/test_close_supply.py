@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from sqlalchemy import update
+
+from src.application.exceptions.supply_excptions import SupplyAlreadyClosedError
+from src.application.supply.use_cases import close_supply
+from src.application.supply.use_cases.close_supply import CloseSupplyUseCase
+from src.core.config.settings import settings
+from src.database.models import SupplyORM
+from src.database.repositories import SupplyRepository
+from src.tests.database import clean_database, insert_rows
+
+
+def test_close_keeps_concurrent_reservations(database_url, monkeypatch):
+    published = []
+    monkeypatch.setattr(settings, "WB_STICKER_SHEETS", True)
+
+    async def main():
+        async with clean_database(database_url) as session_factory:
+            async with session_factory() as session:
+                await insert_rows(
+                    session,
+                    SupplyORM,
+                    [
+                        {
+                            "id": "WB-GI-1",
+                            "category_name": "Кружки",
+                            "name": "Кружки - 1",
+                            "order_count": 3,
+                            "status": "active",
+                        }
+                    ],
+                )
+
+            async def send_to_queue(queue_name: str, data: dict):
+                # Закрытие уже зафиксировано и видно воркеру листов
+                async with session_factory() as other:
+                    supply = await other.get(SupplyORM, data["supply_id"])
+                    published.append((queue_name, supply.status))
+
+            monkeypatch.setattr(close_supply, "send_to_queue", send_to_queue)
+
+            async with session_factory() as session:
+                repo = SupplyRepository(session)
+                get_by_id = repo.get_by_id
+
+                async def get_and_reserve(supply_id: str):
+                    supply = await get_by_id(supply_id)
+                    # Воркер поставок занимает место, пока менеджер закрывает
+                    async with session_factory() as worker:
+                        await worker.execute(
+                            update(SupplyORM)
+                            .where(SupplyORM.id == supply_id)
+                            .values(order_count=SupplyORM.order_count + 1)
+                        )
+                        await worker.commit()
+                    return supply
+
+                repo.get_by_id = get_and_reserve
+                await CloseSupplyUseCase(repo).execute("WB-GI-1")
+
+            async with session_factory() as session:
+                supply = await session.get(SupplyORM, "WB-GI-1")
+
+                with pytest.raises(SupplyAlreadyClosedError):
+                    await CloseSupplyUseCase(SupplyRepository(session)).execute(
+                        "WB-GI-1"
+                    )
+
+            return supply
+
+    supply = asyncio.run(main())
+
+    assert supply.status == "inactive"
+    assert supply.order_count == 4
+    assert published == [("supply_sticker_sheet", "inactive")]
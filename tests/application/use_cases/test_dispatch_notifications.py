@@ -0,0 +1,224 @@
+import asyncio
+from datetime import timedelta
+
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMessage
+from sqlalchemy import select, update
+
+from src.application.use_cases.dispatch_notifications_use_case import (
+    COALESCE_SEPARATOR,
+    MAX_ATTEMPTS,
+    NOTIFICATION_LEASE,
+    DispatchNotificationsUseCase,
+    get_retry_delay,
+)
+from src.core.enums.notification import NotificationStatus
+from src.core.utils.time import now_utc
+from src.database.models import NotificationOutboxORM
+from src.database.repositories import NotificationOutboxRepository
+from src.notification_service.entities import NotificationMessage
+from src.tests.database import clean_database
+
+CHAT_A = -100
+CHAT_B = -200
+
+
+def text_message(chat_id: int, text: str) -> NotificationMessage:
+    return NotificationMessage(chat_id=chat_id, type="text", text=text)
+
+
+class FakeNotifier:
+    """Отправленные сообщения; errors - ошибки отправки по тексту сообщения"""
+
+    def __init__(self, errors: dict[str, Exception] = None):
+        self.errors = errors or {}
+        self.sent: list[NotificationMessage] = []
+
+    async def send(self, notification: NotificationMessage, raise_errors: bool = False):
+        error = self.errors.get(notification.text)
+        if error:
+            raise error
+        self.sent.append(notification)
+        return True
+
+
+class FakeRateLimiter:
+    def __init__(self):
+        self.paused: list[tuple[int, float]] = []
+
+    async def acquire(self, chat_id: int):
+        pass
+
+    def pause(self, chat_id: int, seconds: float):
+        self.paused.append((chat_id, seconds))
+
+
+async def add_notifications(session_factory, *batches: tuple[list, bool]):
+    async with session_factory() as session:
+        outbox = NotificationOutboxRepository(session)
+        for notifications, coalesce in batches:
+            await outbox.add_notifications(notifications, coalesce=coalesce)
+        await session.commit()
+
+
+async def load_outbox(session_factory) -> dict[str, NotificationOutboxORM]:
+    async with session_factory() as session:
+        rows = await session.scalars(select(NotificationOutboxORM))
+        return {row.payload["text"]: row for row in rows}
+
+
+def test_added_notifications_wait_for_commit(database_url):
+    async def main():
+        async with clean_database(database_url) as session_factory:
+            async with session_factory() as session:
+                await NotificationOutboxRepository(session).add_notifications(
+                    [text_message(CHAT_A, "откат")]
+                )
+                await session.rollback()
+
+            await add_notifications(
+                session_factory,
+                ([text_message(CHAT_A, "1"), text_message(CHAT_A, "2")], True),
+                ([text_message(CHAT_A, "3")], False),
+            )
+            return await load_outbox(session_factory)
+
+    outbox = asyncio.run(main())
+
+    assert {text: row.coalesce for text, row in outbox.items()} == {
+        "1": True,
+        "2": True,
+        "3": False,
+    }
+    assert all(row.status == NotificationStatus.PENDING for row in outbox.values())
+
+
+def test_claim_leases_notifications(database_url):
+    async def main():
+        async with clean_database(database_url) as session_factory:
+            await add_notifications(
+                session_factory,
+                ([text_message(CHAT_A, str(i)) for i in range(3)], False),
+            )
+
+            claims = []
+            for limit in (2, 2, 2):
+                async with session_factory() as session:
+                    claims.append(
+                        await NotificationOutboxRepository(session).claim_pending(
+                            limit=limit, lease=NOTIFICATION_LEASE
+                        )
+                    )
+            return claims
+
+    started_at = now_utc()
+    first, second, third = asyncio.run(main())
+
+    # Захваченные уведомления не выдаются другим воркерам до конца аренды
+    assert [row.payload["text"] for row in first] == ["0", "1"]
+    assert [row.payload["text"] for row in second] == ["2"]
+    assert third == []
+    assert all(row.attempts == 1 for row in first + second)
+    assert all(
+        row.available_at >= started_at + NOTIFICATION_LEASE for row in first + second
+    )
+
+
+def test_text_notifications_are_coalesced(database_url):
+    notifier = FakeNotifier()
+
+    async def main():
+        async with clean_database(database_url) as session_factory:
+            await add_notifications(
+                session_factory,
+                ([text_message(CHAT_A, "1"), text_message(CHAT_A, "2")], True),
+                ([text_message(CHAT_B, "3")], True),
+                ([text_message(CHAT_A, "4")], False),
+            )
+            claimed = await DispatchNotificationsUseCase(
+                session_factory, notifier, FakeRateLimiter()
+            ).execute()
+            return claimed, await load_outbox(session_factory)
+
+    claimed, outbox = asyncio.run(main())
+
+    assert claimed == 4
+    assert sorted((n.chat_id, n.text) for n in notifier.sent) == [
+        (CHAT_B, "3"),
+        (CHAT_A, "1" + COALESCE_SEPARATOR + "2"),
+        (CHAT_A, "4"),
+    ]
+    assert all(row.status == NotificationStatus.SENT for row in outbox.values())
+
+
+def test_retry_after_pauses_chat_and_keeps_order(database_url):
+    retry_after = TelegramRetryAfter(
+        method=SendMessage(chat_id=CHAT_A, text="1"),
+        message="Too Many Requests",
+        retry_after=30,
+    )
+    notifier = FakeNotifier(errors={"1": retry_after})
+    rate_limiter = FakeRateLimiter()
+
+    async def main():
+        async with clean_database(database_url) as session_factory:
+            await add_notifications(
+                session_factory,
+                ([text_message(CHAT_A, "1"), text_message(CHAT_A, "2")], False),
+                ([text_message(CHAT_B, "3")], False),
+            )
+            await DispatchNotificationsUseCase(
+                session_factory, notifier, rate_limiter
+            ).execute()
+            return await load_outbox(session_factory)
+
+    started_at = now_utc()
+    outbox = asyncio.run(main())
+
+    assert rate_limiter.paused == [(CHAT_A, 30)]
+    assert [n.text for n in notifier.sent] == ["3"]
+    assert outbox["3"].status == NotificationStatus.SENT
+
+    # Следующее сообщение в чат откладывается вместе с первым
+    for text in ("1", "2"):
+        assert outbox[text].status == NotificationStatus.PENDING
+        assert outbox[text].available_at >= started_at + timedelta(seconds=30)
+        assert outbox[text].error
+
+
+def test_failed_notifications_are_retried_until_max_attempts(database_url):
+    notifier = FakeNotifier(
+        errors={"1": RuntimeError("timeout"), "2": RuntimeError("timeout")}
+    )
+
+    async def main():
+        async with clean_database(database_url) as session_factory:
+            await add_notifications(
+                session_factory,
+                ([text_message(CHAT_A, "1")], False),
+                ([text_message(CHAT_B, "2")], False),
+            )
+            async with session_factory() as session:
+                await session.execute(
+                    update(NotificationOutboxORM)
+                    .where(NotificationOutboxORM.chat_id == CHAT_B)
+                    .values(attempts=MAX_ATTEMPTS - 1)
+                )
+                await session.commit()
+
+            await DispatchNotificationsUseCase(
+                session_factory, notifier, FakeRateLimiter()
+            ).execute()
+            return await load_outbox(session_factory)
+
+    started_at = now_utc()
+    outbox = asyncio.run(main())
+
+    assert outbox["1"].status == NotificationStatus.PENDING
+    assert outbox["1"].available_at >= started_at + timedelta(
+        seconds=get_retry_delay(1)
+    )
+    assert (outbox["2"].status, outbox["2"].error) == (
+        NotificationStatus.FAILED,
+        "timeout",
+    )
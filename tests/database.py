@@ -0,0 +1,41 @@
+"""
+Тестовая база данных для тестов SQL-запросов.
+
+Таблицы пересоздаются по моделям перед каждым тестом. Не указывайте
+в TEST_DATABASE_URL рабочую базу!
+"""
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from src.core.database.base import Base
+
+# Модели регистрируются в Base.metadata при импорте
+import src.database.models  # noqa: F401
+
+
+@asynccontextmanager
+async def clean_database(url: str) -> AsyncIterator[async_sessionmaker]:
+    """Фабрика сессий пустой тестовой базы"""
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    try:
+        yield async_sessionmaker(engine, expire_on_commit=False)
+    finally:
+        await engine.dispose()
+
+
+async def insert_rows(session: AsyncSession, model, rows: list[dict]):
+    if rows:
+        await session.execute(insert(model), rows)
+    await session.commit()
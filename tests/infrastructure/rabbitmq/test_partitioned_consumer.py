@@ -0,0 +1,128 @@
+import asyncio
+import json
+import zlib
+from collections import Counter
+
+from src.infrastructure.rabbitmq.partitioned_consumer import PartitionedQueueConsumer
+
+
+class FakeMessage:
+    def __init__(self, data):
+        self.body = (data if isinstance(data, str) else json.dumps(data)).encode()
+        self.processed = False
+
+    def process(self):
+        message = self
+
+        class Context:
+            async def __aenter__(self):
+                return message
+
+            async def __aexit__(self, *exc):
+                message.processed = True
+                return False
+
+        return Context()
+
+
+async def category_key(data: dict):
+    return f"{data['account_id']}:{data['category']}"
+
+
+def make_consumer(handler, lanes: int = 4) -> PartitionedQueueConsumer:
+    return PartitionedQueueConsumer(
+        queue_name="processing_supply",
+        handler_func=handler,
+        partition_key_func=category_key,
+        lanes=lanes,
+    )
+
+
+def test_lane_for_is_crc32_of_key():
+    consumer = make_consumer(handler=None, lanes=8)
+
+    for key in ("1:Кружки", "2:Футболки", None):
+        assert consumer.lane_for(key) == zlib.crc32(str(key).encode()) % 8
+        assert consumer.lane_for(key) == consumer.lane_for(key)
+
+
+def test_keys_are_spread_across_lanes():
+    consumer = make_consumer(handler=None, lanes=8)
+
+    lanes = Counter(consumer.lane_for(f"{i}:category") for i in range(800))
+
+    assert set(lanes) == set(range(8))
+    assert max(lanes.values()) < 2 * min(lanes.values())
+
+
+def test_order_is_kept_within_key_and_keys_run_in_parallel():
+    handled = []
+    slow_started = asyncio.Event()
+    fast_done = asyncio.Event()
+
+    async def handler(data: dict):
+        if data["category"] == "slow" and data["n"] == 0:
+            slow_started.set()
+            # Полоса медленной категории ждет, пока обработается быстрая
+            await fast_done.wait()
+        handled.append((data["category"], data["n"]))
+        if data["category"] == "fast" and data["n"] == 2:
+            fast_done.set()
+
+    async def run():
+        consumer = make_consumer(handler, lanes=4)
+        assert consumer.lane_for("1:slow") != consumer.lane_for("1:fast")
+
+        messages = [
+            FakeMessage({"account_id": 1, "category": category, "n": n})
+            for n in range(3)
+            for category in ("slow", "fast")
+        ]
+        for message in messages:
+            await consumer._on_message(message)
+
+        tasks = [asyncio.create_task(consumer._dispatch())] + [
+            asyncio.create_task(consumer._run_lane(lane))
+            for lane in range(consumer.lanes)
+        ]
+        try:
+            await asyncio.wait_for(slow_started.wait(), 1)
+            await asyncio.wait_for(fast_done.wait(), 1)
+            while not all(message.processed for message in messages):
+                await asyncio.sleep(0.01)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    asyncio.run(run())
+
+    assert [n for category, n in handled if category == "slow"] == [0, 1, 2]
+    assert [n for category, n in handled if category == "fast"] == [0, 1, 2]
+    assert handled.index(("fast", 2)) < handled.index(("slow", 0))
+
+
+def test_message_without_key_is_still_acknowledged():
+    handled = []
+
+    async def handler(data: dict):
+        handled.append(data)
+
+    async def run():
+        consumer = make_consumer(handler, lanes=2)
+        message = FakeMessage("not json")
+        await consumer._on_message(message)
+
+        tasks = [asyncio.create_task(consumer._dispatch())] + [
+            asyncio.create_task(consumer._run_lane(lane))
+            for lane in range(consumer.lanes)
+        ]
+        try:
+            while not message.processed:
+                await asyncio.sleep(0.01)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    asyncio.run(run())
+
+    assert handled == []
@@ -0,0 +1,50 @@
+import asyncio
+import logging
+
+from src.infrastructure.rabbitmq import producer
+
+
+class FakeExchange:
+    def __init__(self):
+        self.published = []
+
+    async def publish(self, message, routing_key: str):
+        self.published.append((routing_key, message.body))
+
+
+class FakeChannel:
+    def __init__(self):
+        self.default_exchange = FakeExchange()
+
+    async def declare_queue(self, name: str, durable: bool, arguments=None):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.channel_ = FakeChannel()
+
+    async def channel(self):
+        return self.channel_
+
+    async def close(self):
+        pass
+
+
+def test_payload_is_not_logged_at_info(monkeypatch, caplog):
+    connection = FakeConnection()
+
+    async def connect_robust(url):
+        return connection
+
+    monkeypatch.setattr(producer, "connect_robust", connect_robust)
+    data = {"orders": [{"id": f"order.{i}", "nm_id": 100} for i in range(1000)]}
+
+    with caplog.at_level(logging.INFO, logger=producer.__name__):
+        assert asyncio.run(producer.send_to_queue("new_wb_orders", data))
+
+    [(queue_name, body)] = connection.channel_.default_exchange.published
+    assert queue_name == "new_wb_orders"
+    assert "new_wb_orders" in caplog.text
+    assert "order.0" not in caplog.text
+    assert f"{len(body)} байт" in caplog.text
@@ -0,0 +1,105 @@
+import pytest
+
+from src.infrastructure.wb_service import circuit_breaker
+from src.infrastructure.wb_service.circuit_breaker import CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    fake_clock = FakeClock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", fake_clock)
+    return fake_clock
+
+
+def open_breaker(breaker: CircuitBreaker):
+    for _ in range(breaker.failure_threshold):
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+
+def test_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=30)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+    assert breaker.retry_after == 30
+
+    clock.now += 10
+    assert breaker.retry_after == 20
+
+
+def test_success_resets_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_allows_single_trial(clock):
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=30)
+    open_breaker(breaker)
+
+    clock.now += 30
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+
+def test_trial_success_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=30)
+    open_breaker(breaker)
+
+    clock.now += 30
+    assert breaker.allow_request()
+    breaker.record_success()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request()
+    assert breaker.allow_request()
+
+
+def test_trial_failure_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=30)
+    open_breaker(breaker)
+
+    clock.now += 30
+    assert breaker.allow_request()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+    clock.now += 30
+    assert breaker.allow_request()
+
+
+def test_released_trial_can_be_retried(clock):
+    # Пробный запрос отменен до ответа WB: breaker не должен остаться
+    # в half-open без возможности отправить следующий пробный запрос
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=30)
+    open_breaker(breaker)
+
+    clock.now += 30
+    assert breaker.allow_request()
+    breaker.release_trial()
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
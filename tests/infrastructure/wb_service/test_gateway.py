@@ -0,0 +1,128 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.infrastructure.wb_service.exceptions import WbTransientError
+from src.infrastructure.wb_service.gateway import WbGateway, iter_json_array
+
+
+async def text_chunks(text: str, size: int):
+    for i in range(0, len(text), size):
+        yield text[i : i + size]
+
+
+def collect(text: str, chunk_size: int, batch_size: int) -> list[list]:
+    async def run():
+        return [
+            batch
+            async for batch in iter_json_array(text_chunks(text, chunk_size), batch_size)
+        ]
+
+    return asyncio.run(run())
+
+
+ORDERS = [
+    {"srid": f"order.{i}", "regionName": "Москва, [центр]", "nmId": i, "isCancel": False}
+    for i in range(25)
+]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 100_000])
+def test_items_are_batched_regardless_of_chunking(chunk_size):
+    batches = collect(json.dumps(ORDERS, indent=2), chunk_size, batch_size=10)
+
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    assert [item for batch in batches for item in batch] == ORDERS
+
+
+def test_empty_array():
+    assert collect(" [ \n ] ", chunk_size=2, batch_size=10) == []
+
+
+def test_text_after_array_is_ignored():
+    assert collect('[{"a": 1}] trailing', chunk_size=3, batch_size=10) == [[{"a": 1}]]
+
+
+def test_not_an_array():
+    with pytest.raises(ValueError):
+        collect('{"a": 1}', chunk_size=4, batch_size=10)
+
+
+def test_truncated_array():
+    with pytest.raises(ValueError):
+        collect('[{"a": 1}, {"b"', chunk_size=4, batch_size=10)
+
+
+class CancelledLimiter:
+    """Лимитер, ожидание которого прерывается (остановка воркера)"""
+
+    async def acquire(self, bucket: str) -> float:
+        raise asyncio.CancelledError
+
+
+def test_cancelled_trial_request_releases_breaker():
+    async def run():
+        statuses = iter([503, 200])
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(next(statuses), json={})
+        )
+        gateway = WbGateway(
+            token="test",
+            max_retries=0,
+            failure_threshold=1,
+            recovery_timeout=0,
+            marketplace_url="http://wb.test",
+        )
+        gateway._client = httpx.AsyncClient(transport=transport)
+        url = "http://wb.test/api/v3/supplies"
+
+        with pytest.raises(WbTransientError):
+            await gateway._request("POST", url, endpoint="create_supply")
+
+        breaker = gateway._breaker("create_supply")
+        assert breaker.state == breaker.HALF_OPEN
+
+        gateway.rate_limiter = CancelledLimiter()
+        with pytest.raises(asyncio.CancelledError):
+            await gateway._request("POST", url, endpoint="create_supply")
+
+        gateway.rate_limiter = None
+        response = await gateway._request("POST", url, endpoint="create_supply")
+        assert response.status_code == 200
+        assert breaker.state == breaker.CLOSED
+
+        await gateway.close()
+
+    asyncio.run(run())
+
+
+def test_close_when_idle_waits_for_requests():
+    async def run():
+        response_allowed = asyncio.Event()
+
+        async def handler(request):
+            await response_allowed.wait()
+            return httpx.Response(200, json={})
+
+        gateway = WbGateway(token="test", marketplace_url="http://wb.test")
+        gateway._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        request = asyncio.create_task(
+            gateway._request("GET", "http://wb.test/api/v3/orders/new", "new_orders")
+        )
+        await asyncio.sleep(0)
+        closing = asyncio.create_task(gateway.close_when_idle())
+        await asyncio.sleep(0.01)
+
+        # Запрос еще выполняется: пул соединений не закрыт
+        assert not closing.done()
+        assert not gateway._client.is_closed
+
+        response_allowed.set()
+        assert (await request).status_code == 200
+        await closing
+        assert gateway._client.is_closed
+
+    asyncio.run(run())
@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from src.infrastructure.wb_service import rate_limiter as rate_limiter_module
+from src.infrastructure.wb_service.rate_limiter import (
+    RateLimit,
+    WbRateLimiter,
+    parse_retry_after,
+    resolve_bucket,
+)
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa", reason="fakeredis выполняет Lua-скрипты через lupa")
+
+# Интервал 10 сек: время выполнения теста не влияет на расчет ожидания
+LIMITS = {"marketplace": RateLimit(requests=6, period=60, burst=2)}
+
+
+@pytest.fixture
+def sleeps(monkeypatch) -> list[float]:
+    """Ожидания лимитера записываются, а не выполняются"""
+    recorded = []
+
+    async def fake_sleep(seconds: float):
+        recorded.append(seconds)
+
+    monkeypatch.setattr(rate_limiter_module.asyncio, "sleep", fake_sleep)
+    return recorded
+
+
+def run_with_limiter(scenario):
+    async def run():
+        limiter = WbRateLimiter(fakeredis.FakeAsyncRedis(), limits=LIMITS)
+        try:
+            return await scenario(limiter)
+        finally:
+            await limiter.close()
+
+    return asyncio.run(run())
+
+
+def test_burst_then_interval(sleeps):
+    async def scenario(limiter: WbRateLimiter):
+        return [await limiter.acquire("marketplace") for _ in range(4)]
+
+    waits = run_with_limiter(scenario)
+
+    assert waits[:2] == [0, 0]
+    assert waits[2] == pytest.approx(10, abs=0.5)
+    assert waits[3] == pytest.approx(20, abs=0.5)
+    assert sleeps == waits[2:]
+
+
+def test_concurrent_requests_get_distinct_slots(sleeps):
+    async def scenario(limiter: WbRateLimiter):
+        return await asyncio.gather(
+            *(limiter.acquire("marketplace") for _ in range(5))
+        )
+
+    waits = sorted(run_with_limiter(scenario))
+
+    assert waits[:2] == [0, 0]
+    assert waits[2:] == pytest.approx([10, 20, 30], abs=0.5)
+
+
+def test_penalty_delays_whole_bucket(sleeps):
+    async def scenario(limiter: WbRateLimiter):
+        await limiter.penalize("marketplace", retry_after=30)
+        wait = await limiter.acquire("marketplace")
+        return wait, await limiter.get_metrics()
+
+    wait, metrics = run_with_limiter(scenario)
+
+    assert wait == pytest.approx(30, abs=0.5)
+    assert metrics["marketplace"]["throttled"] == 1
+    assert metrics["marketplace"]["requests"] == 1
+    assert metrics["marketplace"]["waited"] == 1
+
+
+def test_scoped_limiters_are_independent(sleeps):
+    async def scenario(limiter: WbRateLimiter):
+        first, second = limiter.scoped("1"), limiter.scoped("2")
+        for _ in range(2):
+            await first.acquire("marketplace")
+        return await second.acquire("marketplace"), await first.acquire(
+            "marketplace"
+        )
+
+    other_account, same_account = run_with_limiter(scenario)
+
+    assert other_account == 0
+    assert same_account == pytest.approx(10, abs=0.5)
+
+
+def test_resolve_bucket():
+    assert (
+        resolve_bucket("https://statistics-api.wildberries.ru/api/v1/supplier/orders")
+        == "statistics"
+    )
+    assert resolve_bucket("http://127.0.0.1:8081/api/v3/orders") == "127.0.0.1"
+
+
+def test_parse_retry_after():
+    assert parse_retry_after({"X-Ratelimit-Retry": "5"}, default=1) == 5
+    assert parse_retry_after({"Retry-After": "2.5"}, default=1) == 2.5
+    assert parse_retry_after({"Retry-After": "soon"}, default=1) == 1
+    assert parse_retry_after({}, default=1) == 1
@@ -0,0 +1,146 @@
+import asyncio
+
+import pytest
+
+from src.infrastructure.wb_service.exceptions import (
+    WbClientError,
+    WbTransientError,
+)
+from src.workers.supply_worker import main as supply_worker
+
+
+class FakeSession:
+    supply_id = None
+    """Поставка задания в состоянии RESERVED"""
+
+    def __init__(self):
+        self.commits = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def commit(self):
+        self.commits += 1
+
+    async def scalar(self, statement):
+        return self.supply_id
+
+
+class FakeWbClient:
+    def __init__(self, error: Exception = None):
+        self.error = error
+
+    async def add_assembly_task_to_supply(self, supply_id: str, assembly_task_id: int):
+        if self.error:
+            raise self.error
+
+
+@pytest.fixture
+def calls(monkeypatch) -> list[tuple]:
+    """Вызовы функций резервирования вместо запросов к БД"""
+    recorded = []
+
+    def record(name):
+        async def fake(session, *args):
+            recorded.append((name, *args))
+
+        return fake
+
+    monkeypatch.setattr(supply_worker, "AsyncSessionLocal", FakeSession)
+    monkeypatch.setattr(
+        supply_worker, "release_supply_slot", record("release_supply_slot")
+    )
+    monkeypatch.setattr(
+        supply_worker, "mark_added_to_supply", record("mark_added_to_supply")
+    )
+    return recorded
+
+
+def test_added_task_is_marked(calls):
+    asyncio.run(supply_worker.add_to_wb_supply(FakeWbClient(), 1, "WB-GI-1"))
+
+    assert calls == [("mark_added_to_supply", 1)]
+
+
+def test_rejected_task_releases_slot(calls):
+    error = WbClientError("WB API add_to_supply: 409", status_code=409)
+
+    with pytest.raises(WbClientError):
+        asyncio.run(supply_worker.add_to_wb_supply(FakeWbClient(error), 1, "WB-GI-1"))
+
+    assert calls == [("release_supply_slot", 1, "WB-GI-1")]
+
+
+def test_transient_error_keeps_reservation(calls):
+    # Задание могло быть добавлено в поставку WB: место остается за ним,
+    # повторная обработка продолжается с этапа RESERVED
+    error = WbTransientError("WB API add_to_supply: 503", status_code=503)
+
+    with pytest.raises(WbTransientError):
+        asyncio.run(supply_worker.add_to_wb_supply(FakeWbClient(error), 1, "WB-GI-1"))
+
+    assert calls == []
+
+
+def test_last_failed_attempt_releases_slot(calls, monkeypatch):
+    error = WbTransientError("WB API add_to_supply: 503", status_code=503)
+
+    async def assign_supply(task):
+        raise error
+
+    monkeypatch.setattr(supply_worker, "assign_supply", assign_supply)
+    monkeypatch.setattr(FakeSession, "supply_id", "WB-GI-1")
+    data = {"assembly_task_id": 1, "attempt": supply_worker.MAX_SUPPLY_ATTEMPTS - 1}
+
+    with pytest.raises(WbTransientError):
+        asyncio.run(supply_worker.processing_supply(data))
+
+    assert calls == [("release_supply_slot", 1, "WB-GI-1")]
+
+
+def test_last_failed_attempt_keeps_added_task(calls, monkeypatch):
+    # Задание уже в поставке WB (ADDED): место не освобождается
+    async def assign_supply(task):
+        raise WbTransientError("WB API stickers: 503", status_code=503)
+
+    monkeypatch.setattr(supply_worker, "assign_supply", assign_supply)
+    data = {"assembly_task_id": 1, "attempt": supply_worker.MAX_SUPPLY_ATTEMPTS - 1}
+
+    with pytest.raises(WbTransientError):
+        asyncio.run(supply_worker.processing_supply(data))
+
+    assert calls == []
+
+
+class FakeAccount:
+    def __init__(self, wb_token: str):
+        self.id = 1
+        self.wb_token = wb_token
+
+
+def test_token_change_closes_stale_client(monkeypatch):
+    closed = []
+
+    async def close_when_idle(self, delay: float = 0):
+        closed.append(self)
+
+    monkeypatch.setattr(supply_worker.WbGateway, "close_when_idle", close_when_idle)
+    monkeypatch.setattr(supply_worker, "wb_clients", {})
+    monkeypatch.setattr(supply_worker, "sticker_batchers", {})
+
+    async def run():
+        stale = supply_worker.get_wb_client(FakeAccount("old"))
+        current = supply_worker.get_wb_client(FakeAccount("new"))
+        await asyncio.gather(*supply_worker.stale_client_tasks)
+
+        assert supply_worker.get_wb_client(FakeAccount("new")) is current
+        assert closed == [stale]
+        assert not supply_worker.stale_client_tasks
+
+        await stale.close()
+        await current.close()
+
+    asyncio.run(run())
@@ -0,0 +1,197 @@
+import asyncio
+from datetime import datetime
+
+from sqlalchemy.dialects import postgresql
+
+from src.core.enums.supply_assignment import SupplyAssignmentState
+from src.database.models import (
+    SellerAccountORM,
+    SupplyORM,
+    WbAssemblyTaskORM,
+    WbOrderORM,
+)
+from src.tests.database import clean_database, insert_rows
+from src.workers.supply_worker.reservation import (
+    SUPPLY_CAPACITY,
+    claim_assembly_task,
+    release_supply_slot,
+    reserve_supply_slot,
+)
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+
+class FakeSession:
+    """
+    Записывает выполненные запросы; UPDATE ... RETURNING возвращает
+    значения из returning по порядку.
+    """
+
+    def __init__(self, *returning):
+        self.returning = list(returning)
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return FakeResult(self.returning.pop(0) if self.returning else None)
+
+    def sql(self, index: int) -> str:
+        return str(
+            self.statements[index].compile(
+                dialect=postgresql.dialect(),
+                compile_kwargs={"literal_binds": True},
+            )
+        )
+
+
+def test_release_frees_slot_of_reserved_task():
+    session = FakeSession(1)
+
+    asyncio.run(release_supply_slot(session, 1, "WB-GI-1"))
+
+    assert len(session.statements) == 2
+
+    task_sql = session.sql(0)
+    assert task_sql.startswith(f"UPDATE {WbAssemblyTaskORM.__tablename__} ")
+    assert "supply_id = 'WB-GI-1'" in task_sql
+    assert f"supply_state = '{SupplyAssignmentState.RESERVED}'" in task_sql
+    assert "SET supply_id=NULL, supply_state=NULL" in task_sql
+
+    supply_sql = session.sql(1)
+    supplies = SupplyORM.__tablename__
+    assert supply_sql.startswith(f"UPDATE {supplies} ")
+    assert f"order_count=greatest({supplies}.order_count - 1, 0)" in supply_sql
+    assert f"WHERE {supplies}.id = 'WB-GI-1'" in supply_sql
+    assert f"{supplies}.order_count >= {SUPPLY_CAPACITY}" in supply_sql
+
+
+def test_release_is_idempotent():
+    # Задание уже освобождено (повторная компенсация) или добавлено в поставку:
+    # счетчик поставки не уменьшается
+    session = FakeSession(None)
+
+    asyncio.run(release_supply_slot(session, 1, "WB-GI-1"))
+
+    assert len(session.statements) == 1
+
+
+def test_claim_only_unassigned_task():
+    session = FakeSession(1, None)
+
+    assert asyncio.run(claim_assembly_task(session, 1))
+    assert not asyncio.run(claim_assembly_task(session, 1))
+
+    sql = session.sql(0)
+    assert "supply_state IS NULL" in sql
+    assert "supply_id IS NULL" in sql
+
+
+def test_release_reopens_supply_closed_at_capacity(database_url):
+    async def main():
+        async with clean_database(database_url) as session_factory:
+            async with session_factory() as session:
+                await seed_full_supplies(session)
+
+            async with session_factory() as session:
+                await release_supply_slot(session, 1000, "WB-GI-FULL")
+                await release_supply_slot(session, 1002, "WB-GI-CLOSED")
+                await session.commit()
+
+            async with session_factory() as session:
+                # Освободившееся место занимает следующее задание категории
+                supply = await reserve_supply_slot(session, 1001, 1, "Кружки")
+                await session.commit()
+
+                full = await session.get(SupplyORM, "WB-GI-FULL")
+                closed = await session.get(SupplyORM, "WB-GI-CLOSED")
+
+            return supply, full, closed
+
+    supply, full, closed = asyncio.run(main())
+
+    assert supply.id == "WB-GI-FULL"
+    assert (full.status, full.order_count) == ("inactive", SUPPLY_CAPACITY)
+    # Закрытая менеджером поставка не открывается
+    assert (closed.status, closed.order_count) == ("inactive", 4)
+
+
+async def seed_full_supplies(session):
+    created_at = datetime(2026, 10, 18, 12, 0)
+
+    await insert_rows(session, SellerAccountORM, [{"id": 1, "name": "test"}])
+    await insert_rows(
+        session,
+        SupplyORM,
+        [
+            {
+                "id": "WB-GI-FULL",
+                "account_id": 1,
+                "category_name": "Кружки",
+                "name": "Кружки - 1",
+                "order_count": SUPPLY_CAPACITY,
+                "status": "inactive",
+            },
+            {
+                "id": "WB-GI-CLOSED",
+                "account_id": 1,
+                "category_name": "Кружки",
+                "name": "Кружки - 2",
+                "order_count": 5,
+                "status": "inactive",
+            },
+        ],
+    )
+    await insert_rows(
+        session,
+        WbOrderORM,
+        [
+            {
+                "id": f"order.{i}",
+                "account_id": 1,
+                "created_at": created_at,
+                "region_name": "Московская область",
+                "country_name": "Россия",
+                "supplier_article": "ART-1",
+                "nm_id": 100,
+                "is_cancel": False,
+            }
+            for i in range(3)
+        ],
+    )
+    await insert_rows(
+        session,
+        WbAssemblyTaskORM,
+        [
+            # Не добавлено в WB за MAX_SUPPLY_ATTEMPTS попыток
+            {
+                "id": 1000,
+                "account_id": 1,
+                "wb_order_id": "order.0",
+                "created_at": created_at,
+                "supply_id": "WB-GI-FULL",
+                "supply_state": SupplyAssignmentState.RESERVED,
+            },
+            # Ожидает места в поставке
+            {
+                "id": 1001,
+                "account_id": 1,
+                "wb_order_id": "order.1",
+                "created_at": created_at,
+                "supply_state": SupplyAssignmentState.RESERVED,
+            },
+            {
+                "id": 1002,
+                "account_id": 1,
+                "wb_order_id": "order.2",
+                "created_at": created_at,
+                "supply_id": "WB-GI-CLOSED",
+                "supply_state": SupplyAssignmentState.RESERVED,
+            },
+        ],
+    )
@@ -0,0 +1,229 @@
+import asyncio
+import base64
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from io import BytesIO
+from types import SimpleNamespace
+
+from PIL import Image
+
+from src.database.models import (
+    CategoryORM,
+    CategorySettingsORM,
+    MaterialORM,
+    SellerAccountORM,
+    SupplyORM,
+    TemplateORM,
+    UserORM,
+    WbAssemblyTaskORM,
+    WbOrderORM,
+)
+from src.tests.database import clean_database, insert_rows
+from src.workers.supply_worker import sticker_sheet
+from src.workers.supply_worker.sticker_sheet import (
+    ASSEMBLY_TASK_MARKER,
+    StickerSheetService,
+    build_sticker_sheet,
+    prepare_sticker_image,
+    supply_folder_path,
+)
+
+# 58×40 мм в пунктах PDF
+PAGE_SIZE = (58 / 25.4 * 72, 40 / 25.4 * 72)
+
+
+def png(width: int, height: int, mode: str = "RGBA") -> bytes:
+    buffer = BytesIO()
+    Image.new(mode, (width, height), "black").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def pdf_pages(pdf: bytes) -> list[tuple[float, float]]:
+    """Размеры страниц PDF (reportlab не сжимает словари страниц)"""
+    return [
+        (float(width), float(height))
+        for width, height in re.findall(
+            rb"/MediaBox \[\s*0 0 ([\d.]+) ([\d.]+)\s*\]", pdf
+        )
+    ]
+
+
+def test_prepare_sticker_image_is_landscape_grayscale():
+    image = Image.open(BytesIO(prepare_sticker_image(png(40, 58))))
+
+    assert image.size == (58, 40)
+    assert image.mode == "L"
+
+
+def test_sticker_sheet_has_page_per_sticker():
+    images = [prepare_sticker_image(png(580, 400)) for _ in range(3)]
+
+    pages = pdf_pages(build_sticker_sheet(images))
+
+    assert len(pages) == 3
+    for width, height in pages:
+        assert abs(width - PAGE_SIZE[0]) < 0.01
+        assert abs(height - PAGE_SIZE[1]) < 0.01
+
+
+def test_supply_folder_path():
+    assert (
+        supply_folder_path(
+            f"/mugs/2026-10-18/Кружки - 3/{ASSEMBLY_TASK_MARKER}/", "Кружки - 3"
+        )
+        == "/mugs/2026-10-18/Кружки - 3/"
+    )
+    # Папки поставки в пути нет: лист кладется рядом с папками заданий
+    assert (
+        supply_folder_path(f"/mugs/2026-10-18/{ASSEMBLY_TASK_MARKER}/", "Кружки - 3")
+        == "/mugs/2026-10-18/"
+    )
+
+
+class FakeStickerBatcher:
+    def __init__(self):
+        self.requested = []
+
+    async def get(self, assembly_task_id: int):
+        self.requested.append(assembly_task_id)
+        return SimpleNamespace(file=base64.b64encode(png(58, 40)).decode())
+
+
+class FakeDisk:
+    def __init__(self):
+        self.uploads = {}
+
+    async def upload_bytes(self, data: bytes, yandex_path: str) -> None:
+        self.uploads[yandex_path] = data
+
+
+async def seed_supply(session, save_as_format: str = "png"):
+    created_at = datetime(2026, 10, 18, 12, 0)
+
+    await insert_rows(session, SellerAccountORM, [{"id": 1, "name": "test"}])
+    await insert_rows(session, UserORM, [{"id": 1, "first_name": "test"}])
+    await insert_rows(
+        session, CategoryORM, [{"id": 1, "name": "Кружки", "folder_name": "mugs"}]
+    )
+    await insert_rows(
+        session,
+        CategorySettingsORM,
+        [
+            {
+                "category_id": 1,
+                "save_as_format": save_as_format,
+                # Колонка строковая, значение по умолчанию в модели - True
+                "save_original_data": "true",
+                "output_path": "/{{ category_folder }}/{{ order_date }}/"
+                "{{ supply_name }}/{{ assembly_task_id }}/",
+            }
+        ],
+    )
+    await insert_rows(
+        session,
+        TemplateORM,
+        [
+            {
+                "id": 1,
+                "category_id": 1,
+                "name": "Кружка",
+                "template_json": {},
+                "form_steps": {},
+            }
+        ],
+    )
+    await insert_rows(
+        session,
+        SupplyORM,
+        [
+            {
+                "id": "WB-GI-1",
+                "account_id": 1,
+                "category_name": "Кружки",
+                "name": "Кружки - 1",
+                "order_count": 3,
+                "status": "inactive",
+            }
+        ],
+    )
+    await insert_rows(
+        session,
+        MaterialORM,
+        [{"id": i, "user_id": 1, "template_id": 1, "data": {}} for i in range(1, 4)],
+    )
+    await insert_rows(
+        session,
+        WbOrderORM,
+        [
+            {
+                "id": f"order.{i}",
+                "account_id": 1,
+                "material_id": i,
+                "created_at": created_at,
+                "region_name": "Московская область",
+                "country_name": "Россия",
+                "supplier_article": "ART-1",
+                "nm_id": 100,
+                "is_cancel": False,
+            }
+            for i in range(1, 4)
+        ],
+    )
+    await insert_rows(
+        session,
+        WbAssemblyTaskORM,
+        [
+            {
+                "id": 1000 + i,
+                "account_id": 1,
+                "wb_order_id": f"order.{i}",
+                "created_at": created_at,
+                "supply_id": "WB-GI-1",
+                **status,
+            }
+            for i, status in enumerate(
+                [
+                    {"supplier_status": "confirm", "wb_status": "waiting"},
+                    {"supplier_status": "cancel", "wb_status": "waiting"},
+                    {"supplier_status": "confirm", "wb_status": "canceled_by_client"},
+                ],
+                start=1,
+            )
+        ],
+    )
+
+
+def generate_sheet(database_url: str, monkeypatch, save_as_format: str = "png"):
+    async def main():
+        async with clean_database(database_url) as session_factory:
+            async with session_factory() as session:
+                await seed_supply(session, save_as_format)
+
+            monkeypatch.setattr(sticker_sheet, "AsyncSessionLocal", session_factory)
+
+            batcher, disk = FakeStickerBatcher(), FakeDisk()
+            with ThreadPoolExecutor() as executor:
+                service = StickerSheetService(yandex_disk=disk, executor=executor)
+                service.get_sticker_batcher = lambda account: batcher
+                path = await service.generate("WB-GI-1")
+
+            return path, batcher, disk
+
+    return asyncio.run(main())
+
+
+def test_sheet_skips_cancelled_tasks(database_url, monkeypatch):
+    path, batcher, disk = generate_sheet(database_url, monkeypatch)
+
+    assert path == "/mugs/2026-10-18/Кружки - 1/stickers.pdf"
+    assert batcher.requested == [1001]
+    assert len(pdf_pages(disk.uploads[path])) == 1
+
+
+def test_no_sheet_when_category_stickers_are_not_saved(database_url, monkeypatch):
+    path, batcher, disk = generate_sheet(database_url, monkeypatch, save_as_format="")
+
+    assert path is None
+    assert batcher.requested == []
+    assert disk.uploads == {}
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+
+from sqlalchemy import select
+
+from src.core.enums.notification import NotificationStatus
+from src.core.utils.time import now_utc
+from src.database.models import (
+    NotificationOutboxORM,
+    SellerAccountORM,
+    VideoTaskORM,
+    WbAssemblyTaskORM,
+    WbOrderORM,
+)
+from src.database.models.video_tasks import VideoStatus
+from src.infrastructure.wb_service.models import (
+    WildberriesAssemblyOrdersStatusResponse,
+)
+from src.tests.database import clean_database, insert_rows
+from src.workers.wb_data.assembly_task_statuses import sync_assembly_task_statuses
+
+
+class FakeWbApi:
+    def __init__(self, statuses: list[dict]):
+        self.response = WildberriesAssemblyOrdersStatusResponse.model_validate(
+            {"orders": statuses}
+        )
+
+    async def fetch_assembly_task_statuses(self, ids: list[int]):
+        return self.response
+
+
+STATUSES = [
+    {"id": 1000, "supplierStatus": "confirm", "wbStatus": "waiting"},
+    {"id": 1001, "supplierStatus": "cancel", "wbStatus": "waiting"},
+    {"id": 1002, "supplierStatus": "complete", "wbStatus": "canceled_by_client"},
+    # Статус, которого нет в документации WB
+    {"id": 1003, "supplierStatus": "complete", "wbStatus": "lost_in_transit"},
+]
+
+
+def test_unknown_status_is_accepted():
+    response = WildberriesAssemblyOrdersStatusResponse.model_validate(
+        {"orders": STATUSES}
+    )
+
+    assert response.orders[3].wb_status == "lost_in_transit"
+
+
+def test_cancellation_cancels_videos_and_notifies(database_url, caplog):
+    async def main():
+        async with clean_database(database_url) as session_factory:
+            async with session_factory() as session:
+                await seed_tasks(session)
+
+            async with session_factory() as session:
+                changed = await sync_assembly_task_statuses(
+                    session, FakeWbApi(STATUSES), account_id=1
+                )
+
+            async with session_factory() as session:
+                tasks = {
+                    task.id: task
+                    for task in await session.scalars(select(WbAssemblyTaskORM))
+                }
+                videos = sorted(
+                    (video.params["order_id"], video.status)
+                    for video in await session.scalars(select(VideoTaskORM))
+                )
+                notifications = list(
+                    await session.scalars(select(NotificationOutboxORM))
+                )
+
+            return changed, tasks, videos, notifications
+
+    with caplog.at_level(logging.WARNING):
+        changed, tasks, videos, notifications = asyncio.run(main())
+
+    assert changed == 4
+    assert (tasks[1003].supplier_status, tasks[1003].wb_status) == (
+        "complete",
+        "lost_in_transit",
+    )
+    assert "lost_in_transit" in caplog.text
+
+    # Отменяются только ожидающие генерации видео отмененных заданий
+    assert videos == [
+        (1000, VideoStatus.pending),
+        (1001, VideoStatus.cancelled),
+        (1001, VideoStatus.done),
+        (1002, VideoStatus.cancelled),
+        (1003, VideoStatus.pending),
+    ]
+
+    assert len(notifications) == 1
+    notification = notifications[0]
+    assert notification.status == NotificationStatus.PENDING
+    assert notification.coalesce
+    assert "#1001: cancel / waiting" in notification.payload["text"]
+    assert "#1002: complete / canceled_by_client" in notification.payload["text"]
+    assert "#1003" not in notification.payload["text"]
+
+
+async def seed_tasks(session):
+    created_at = now_utc()
+
+    await insert_rows(session, SellerAccountORM, [{"id": 1, "name": "test"}])
+    await insert_rows(
+        session,
+        WbOrderORM,
+        [
+            {
+                "id": f"order.{i}",
+                "account_id": 1,
+                "created_at": created_at,
+                "region_name": "Московская область",
+                "country_name": "Россия",
+                "supplier_article": "ART-1",
+                "nm_id": 100,
+                "is_cancel": False,
+            }
+            for i in range(4)
+        ],
+    )
+    await insert_rows(
+        session,
+        WbAssemblyTaskORM,
+        [
+            {
+                "id": 1000 + i,
+                "account_id": 1,
+                "wb_order_id": f"order.{i}",
+                "created_at": created_at,
+                "supplier_status": "new",
+                "wb_status": "waiting",
+            }
+            for i in range(4)
+        ],
+    )
+    await insert_rows(
+        session,
+        VideoTaskORM,
+        [{"params": {"order_id": 1000 + i}} for i in range(4)]
+        # Готовое видео не отменяется
+        + [{"params": {"order_id": 1001}, "status": VideoStatus.done}],
+    )
@@ -0,0 +1,74 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from src.database.models import SellerAccountORM, WbOrderORM
+from src.tests.database import clean_database, insert_rows
+from src.workers.wb_data.bulk_load import (
+    copy_orders_to_staging,
+    create_orders_staging,
+    merge_orders_from_staging,
+)
+
+CREATED_AT = datetime(2026, 10, 18, 9, 0)
+
+
+def order_row(order_id: str, last_change_date: datetime, **changes) -> dict:
+    return {
+        "id": order_id,
+        "account_id": 1,
+        "created_at": CREATED_AT,
+        "country_name": "Россия",
+        "region_name": "Московская область",
+        "region_code": None,
+        "supplier_article": "ART-1",
+        "nm_id": 100,
+        "is_cancel": False,
+        "cancel_date": datetime(1, 1, 1),
+        "warehouse_name": "Коледино",
+        "warehouse_type": "Склад продавца",
+        "last_change_date": last_change_date,
+        **changes,
+    }
+
+
+def test_merge_keeps_latest_version_of_order(database_url):
+    changed_at = CREATED_AT + timedelta(hours=2)
+
+    async def main():
+        async with clean_database(database_url) as session_factory:
+            async with session_factory() as session:
+                await insert_rows(session, SellerAccountORM, [{"id": 1, "name": "test"}])
+
+            async with session_factory() as session:
+                await create_orders_staging(session)
+                await copy_orders_to_staging(
+                    session,
+                    [order_row("order.1", CREATED_AT), order_row("order.2", CREATED_AT)],
+                )
+                # Отмена заказа пришла в следующей пачке отчета
+                await copy_orders_to_staging(
+                    session,
+                    [
+                        order_row(
+                            "order.1",
+                            changed_at,
+                            is_cancel=True,
+                            cancel_date=changed_at,
+                        )
+                    ],
+                )
+                rows, staged = await merge_orders_from_staging(session)
+                await session.commit()
+
+            async with session_factory() as session:
+                order = await session.get(WbOrderORM, "order.1")
+
+            return rows, staged, order
+
+    rows, staged, order = asyncio.run(main())
+
+    assert staged == 2
+    assert sorted(row.id for row in rows) == ["order.1", "order.2"]
+    assert all(row.inserted for row in rows)
+    assert order.is_cancel
+    assert order.cancel_date == changed_at
@@ -67,6 +67,18 @@ async def processing_image(data: dict):
             if not template:
                 return
 
+            assembly_task_id = (task.delivery or {}).get("assembly_task")
+            if assembly_task_id:
+                assembly_task = await uow.wb_assembly_task.get_by_id(
+                    assembly_task_id
+                )
+                if assembly_task and assembly_task.is_cancelled:
+                    log.info(
+                        "Сборочное задание %s отменено, макет не генерируется",
+                        assembly_task_id,
+                    )
+                    return
+
             if task.delivery:
                 delivery = task.delivery
                 method = delivery.get("method")
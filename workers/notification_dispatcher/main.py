@@ -0,0 +1,50 @@
+import asyncio
+import logging
+
+from aiogram import Bot
+from aiogram.client.default import DefaultBotProperties
+
+from src.application.use_cases.dispatch_notifications_use_case import (
+    DispatchNotificationsUseCase,
+)
+from src.core.config.settings import settings
+from src.core.database.async_session import AsyncSessionLocal
+from src.core.setup_logging import setup_logging
+from src.notification_service.services.rate_limiter import TelegramRateLimiter
+from src.notification_service.services.telegram_notifier import TelegramNotifier
+
+log = logging.getLogger(__name__)
+
+POLL_INTERVAL = 1  # секунд ожидания, если очередь уведомлений пуста
+BATCH_SIZE = 100
+
+
+async def run_notification_dispatcher():
+    """
+    Отправляет уведомления из notification_outbox в Telegram.
+    """
+    setup_logging(service_name="notification_dispatcher")
+
+    bot = Bot(token=settings.BOT_TOKEN, default=DefaultBotProperties(parse_mode="HTML"))
+    use_case = DispatchNotificationsUseCase(
+        session_factory=AsyncSessionLocal,
+        notifier=TelegramNotifier(bot=bot),
+        rate_limiter=TelegramRateLimiter(),
+    )
+
+    try:
+        while True:
+            try:
+                claimed = await use_case.execute(limit=BATCH_SIZE)
+            except Exception as e:
+                log.error("Ошибка при отправке уведомлений: %s", e, exc_info=True)
+                claimed = 0
+
+            if claimed < BATCH_SIZE:
+                await asyncio.sleep(POLL_INTERVAL)
+    finally:
+        await bot.session.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_notification_dispatcher())
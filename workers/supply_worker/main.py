@@ -1,18 +1,19 @@
 import asyncio
 import base64
 import logging
-from datetime import datetime
 from typing import Optional
 
 from aiogram import Bot
-from jinja2 import Template
 from pydantic import BaseModel
-from sqlalchemy import select, and_, func
+from sqlalchemy import select
 
 from src.application.dto.video_generation_task import VideoGenerationTask
 from src.core.config.settings import settings
 from src.core.database.async_session import AsyncSessionLocal
+from src.core.enums.assembly_task import AssemblyTaskStatus
+from src.core.enums.supply_assignment import SupplyAssignmentState
 from src.core.setup_logging import setup_logging
+from src.core.utils.template import render_template
 from src.database.models import (
     WbAssemblyTaskORM,
     WbOrderORM,
@@ -20,24 +21,101 @@ from src.database.models import (
     TemplateORM,
     CategoryORM,
     SupplyORM,
-    CategorySupplyCounterORM,
     CategorySettingsORM,
     VideoTaskORM,
+    SellerAccountORM,
 )
 from src.database.models.video_tasks import VideoStatus
-from src.infrastructure.rabbitmq.consumer import QueueConsumer
-from src.infrastructure.rabbitmq.producer import send_to_queue
-from src.infrastructure.wb_service.client import WBApiService
+from src.infrastructure.rabbitmq.partitioned_consumer import PartitionedQueueConsumer
+from src.infrastructure.rabbitmq.producer import send_to_queue, send_to_queue_delayed
+from src.infrastructure.wb_service.exceptions import (
+    WbTransientError,
+    WbClientError,
+    WbInvalidResponseError,
+)
+from src.infrastructure.wb_service.gateway import WbGateway
+from src.infrastructure.wb_service.rate_limiter import WbRateLimiter
+from src.infrastructure.wb_service.stickers import StickerBatcher, StickerCache
 from src.infrastructure.ya_disk.client import YandexDiskService
+from src.workers.supply_worker.reservation import (
+    claim_assembly_task,
+    reserve_supply_slot,
+    next_supply_name,
+    mark_added_to_supply,
+    release_supply_slot,
+    mark_assignment_done,
+    is_supply_complete,
+)
 
 log = logging.getLogger(__name__)
-wb_client = WBApiService(api_key=settings.WB_TOKEN)
+rate_limiter = WbRateLimiter.from_settings()
+wb_clients: dict[tuple[int, Optional[str]], WbGateway] = {}
+sticker_cache = StickerCache(settings.WB_STICKER_CACHE_DIR)
+sticker_batchers: dict[tuple[int, Optional[str]], StickerBatcher] = {}
+stale_client_tasks: set[asyncio.Task] = set()
 yandex_disk = YandexDiskService(token=settings.YANDEX_TOKEN)
 bot = Bot(token=settings.BOT_TOKEN)
 
 
+MAX_SUPPLY_ATTEMPTS = 5
+"""Попыток обработки задания при временных ошибках WB API"""
+
+SUPPLY_RETRY_DELAY = 5
+"""Начальная задержка повторной обработки (сек)"""
+
+SUPPLY_RETRY_MAX_DELAY = 60
+
+RESERVE_ATTEMPTS = 3
+"""Попыток занять место в поставке (созданную поставку могут заполнить другие)"""
+
+SUPPLY_LANES = 8
+"""Категорий, обрабатываемых одновременно (полос очереди processing_supply)"""
+
+STALE_CLIENT_CLOSE_DELAY = 60
+"""Через сколько секунд закрывается клиент со старым токеном кабинета"""
+
+
 class SupplyTask(BaseModel):
     assembly_task_id: int
+    attempt: int = 0
+
+
+def get_wb_client(account: SellerAccountORM) -> WbGateway:
+    """
+    Клиент WB API кабинета (создается один раз на процесс
+    и заново после смены токена кабинета).
+    """
+    key = (account.id, account.wb_token)
+    if key not in wb_clients:
+        # Клиент со старым токеном больше не выдается, выполняемые
+        # им запросы завершаются, затем пул соединений закрывается
+        for stale_key in [k for k in wb_clients if k[0] == account.id]:
+            sticker_batchers.pop(stale_key, None)
+            close_stale_client(wb_clients.pop(stale_key))
+
+        wb_clients[key] = WbGateway.for_account(
+            account.id, account.wb_token, rate_limiter
+        )
+    return wb_clients[key]
+
+
+def close_stale_client(wb_client: WbGateway):
+    task = asyncio.create_task(wb_client.close_when_idle(STALE_CLIENT_CLOSE_DELAY))
+    # Ссылка на задачу хранится до ее завершения
+    stale_client_tasks.add(task)
+    task.add_done_callback(stale_client_tasks.discard)
+
+
+def get_sticker_batcher(account: SellerAccountORM) -> StickerBatcher:
+    """
+    Стикеры кабинета запрашиваются пачками: задания разных категорий,
+    обрабатываемые одновременно, получают стикеры одним запросом.
+    """
+    wb_client = get_wb_client(account)
+    key = (account.id, account.wb_token)
+    if key not in sticker_batchers:
+        sticker_batchers[key] = StickerBatcher(wb_client, cache=sticker_cache)
+    return sticker_batchers[key]
 
 
 async def send_skip_video_message(assembly_task_id: int, reason: Optional[str] = None):
@@ -56,27 +134,52 @@ async def send_skip_video_message(assembly_task_id: int, reason: Optional[str] =
         log.error("Ошибка при отправке сообщения в чат: %s", e, exc_info=True)
 
 
-async def render_template(text, **context):
-    template = Template(text)
-
-    now = datetime.now()
-    context.update(
-        {
-            "year": now.year,
-            "month": f"{now.month:02}",
-            "day": f"{now.day:02}",
-            "hour": f"{now.hour:02}",
-            "minute": f"{now.minute:02}",
-            "second": f"{now.second:02}",
-        }
-    )
-
-    return template.render(**context)
-
-
 async def processing_supply(data: dict):
     task = SupplyTask.model_validate(data)
 
+    try:
+        await assign_supply(task)
+    except WbTransientError as e:
+        # Транзакция откатилась, задание возвращается в очередь
+        if task.attempt + 1 >= MAX_SUPPLY_ATTEMPTS:
+            log.error(
+                "Сборочное задание %s не обработано после %s попыток: %s",
+                task.assembly_task_id,
+                MAX_SUPPLY_ATTEMPTS,
+                e,
+            )
+            await release_reserved_slot(task.assembly_task_id)
+            raise
+
+        delay = getattr(e, "retry_after", None) or SUPPLY_RETRY_DELAY * 2**task.attempt
+        delay = min(delay, SUPPLY_RETRY_MAX_DELAY)
+        log.warning(
+            "Временная ошибка WB API для сборочного задания %s: %s. Повтор через %s сек",
+            task.assembly_task_id,
+            e,
+            delay,
+        )
+        # Задание ждет в очереди задержки, полоса обработчика не блокируется
+        await send_to_queue_delayed(
+            queue_name="processing_supply",
+            data=task.model_copy(update={"attempt": task.attempt + 1}).model_dump(),
+            seconds=delay,
+        )
+    except (WbClientError, WbInvalidResponseError) as e:
+        # Повтор не поможет
+        log.error(
+            "Ошибка WB API для сборочного задания %s: %s", task.assembly_task_id, e
+        )
+
+
+async def assign_supply(task: SupplyTask):
+    """
+    Добавляет сборочное задание в поставку в два этапа: место в поставке
+    занимается короткой транзакцией (reservation), затем без открытой
+    транзакции выполняются запросы к WB, Яндекс Диску и очередям.
+    Этап сохраняется в supply_state, поэтому повторная обработка
+    продолжается с места сбоя.
+    """
     async with AsyncSessionLocal() as session:
         assembly_task = await session.get(WbAssemblyTaskORM, task.assembly_task_id)
 
@@ -89,7 +192,20 @@ async def processing_supply(data: dict):
                 f"Сборочное задание с id {task.assembly_task_id} не найдено"
             )
 
-        if assembly_task.supply_id:
+        if AssemblyTaskStatus.is_cancelled(
+            assembly_task.supplier_status, assembly_task.wb_status
+        ):
+            log.info(
+                "Сборочное задание с id %s отменено (%s / %s), пропускаем",
+                assembly_task.id,
+                assembly_task.supplier_status,
+                assembly_task.wb_status,
+            )
+            return
+
+        if assembly_task.supply_state == SupplyAssignmentState.DONE or (
+            assembly_task.supply_id and not assembly_task.supply_state
+        ):
             log.info(
                 "Сборочное задание с id %s уже имеет поставку",
                 task.assembly_task_id,
@@ -98,6 +214,16 @@ async def processing_supply(data: dict):
                 f"Сборочное задание с id {task.assembly_task_id} уже имеет поставку"
             )
 
+        account = await session.get(SellerAccountORM, assembly_task.account_id)
+
+        if not account:
+            log.error(
+                "Кабинет сборочного задания %s не найден (account_id=%s)",
+                assembly_task.id,
+                assembly_task.account_id,
+            )
+            raise ValueError(f"Кабинет с id {assembly_task.account_id} не найден")
+
         wb_order = await session.get(WbOrderORM, assembly_task.wb_order_id)
 
         if not wb_order:
@@ -135,136 +261,92 @@ async def processing_supply(data: dict):
 
         category_settings: CategorySettingsORM = result.scalar_one_or_none()
 
-        supply = await session.scalar(
-            select(SupplyORM)
-            .with_for_update()
-            .where(
-                and_(
-                    SupplyORM.category_name == category.name,
-                    SupplyORM.order_count < 10,
-                    SupplyORM.status == "active",
-                )
-            )
-        )
+    wb_client = get_wb_client(account)
+    state = assembly_task.supply_state
+    supply_id = assembly_task.supply_id
 
+    if state is None:
+        supply = await reserve_supply(
+            wb_client, assembly_task.id, account.id, category.name
+        )
         if not supply:
-            category_supply_counter = await session.scalar(
-                select(CategorySupplyCounterORM).where(
-                    CategorySupplyCounterORM.category_name == category.name,
-                )
-            )
-            if not category_supply_counter:
-                category_supply_counter = CategorySupplyCounterORM(
-                    category_name=category.name,
-                )
-                session.add(category_supply_counter)
-                await session.flush()
-
-            category_supply_counter.supply_count += 1
-            await session.flush()
-
-            wb_supply_name = f"{category.name} - {category_supply_counter.supply_count}"
-            wb_supply = await wb_client.create_supply(name=wb_supply_name)
-
-            supply = SupplyORM(
-                id=wb_supply.id,
-                category_name=category.name,
-                name=wb_supply_name,
-                order_count=0,
+            log.info(
+                "Сборочное задание с id %s уже обрабатывается", assembly_task.id
             )
+            return
+        supply_id = supply.id
+        state = SupplyAssignmentState.RESERVED
 
-            session.add(supply)
-            await session.flush()
-            await session.refresh(supply)
-
-        else:
-            await session.refresh(supply, with_for_update=True)
+    if state == SupplyAssignmentState.RESERVED:
+        await add_to_wb_supply(wb_client, assembly_task.id, supply_id)
 
-        await wb_client.add_assembly_task_to_supply(
-            supply_id=str(supply.id), assembly_task_id=assembly_task.id
+    async with AsyncSessionLocal() as session:
+        supply_name = await session.scalar(
+            select(SupplyORM.name).where(SupplyORM.id == supply_id)
         )
 
-        assembly_task.supply_id = supply.id
-        assembly_task.added_to_supply_at = func.now()
-
-        log.info("Получен стикер для сборочного задания %s", assembly_task.id)
+    sticker = await get_sticker_batcher(account).get(assembly_task.id)
+    log.info("Получен стикер для сборочного задания %s", assembly_task.id)
 
-        assembly_task_stickers = await wb_client.get_assembly_task_stickers(
-            assembly_task_ids=[assembly_task.id]
-        )
+    image_data = base64.b64decode(sticker.file)
 
-        sticker = assembly_task_stickers.stickers[0]
-        image_data = base64.b64decode(sticker.file)
+    category_folder = category.folder_name or "unsorted"
 
-        category_folder = category.folder_name or "unsorted"
+    folder_path = await render_template(
+        text=category_settings.output_path,
+        category_folder=category_folder,
+        order_date=wb_order.created_at.date(),
+        assembly_task_id=assembly_task.id,
+        supply_name=supply_name,
+    )
 
-        folder_path = await render_template(
-            text=category_settings.output_path,
-            category_folder=category_folder,
-            order_date=wb_order.created_at.date(),
-            assembly_task_id=assembly_task.id,
-            supply_name=supply.name,
-        )
+    file_name = "sticker.png"
 
-        file_name = "sticker.png"
+    layout_file_name = f"{sticker.part_b}-{wb_order.supplier_article}-{assembly_task.id}"
 
-        layout_file_name = (
-            f"{sticker.part_b}-{wb_order.supplier_article}-{assembly_task.id}"
-        )
+    # Повторная загрузка перезаписывает тот же файл
+    if category_settings.save_as_format and not settings.WB_STICKER_SHEETS:
+        await yandex_disk.upload_bytes(image_data, f"{folder_path + file_name}")
 
-        supply.order_count += 1
+    await send_to_queue(
+        queue_name="generate_image",
+        data={
+            "type": "pdf",
+            "delivery": {
+                "method": "ya_disk",
+                f"path": folder_path,
+                "assembly_task": assembly_task.id,
+                "supplier_article": wb_order.supplier_article,
+            },
+            "order_data": material.data.get("layout"),
+            "template_id": material.template_id,
+            "filename": layout_file_name,
+        },
+    )
 
-        if supply.order_count >= 10:
-            supply.status = "inactive"
-            await session.flush()
+    video_task = None
 
-        if category_settings.save_as_format:
-            await yandex_disk.upload_bytes(image_data, f"{folder_path + file_name}")
+    if material.data.get("video"):
+        video = material.data.get("video")
+        action = video.get("action")
 
-        await send_to_queue(
-            queue_name="generate_image",
-            data={
-                "type": "pdf",
-                "delivery": {
-                    "method": "ya_disk",
-                    f"path": folder_path,
-                    "assembly_task": assembly_task.id,
-                    "supplier_article": wb_order.supplier_article,
+        if action == "forward_video":
+            await send_to_queue(
+                queue_name="forward_video",
+                data={
+                    "order_id": assembly_task.id,
+                    "file_id": video.get("video").get("video_id"),
                 },
-                "order_data": material.data.get("layout"),
-                "template_id": material.template_id,
-                "filename": layout_file_name,
-            },
-        )
+            )
+        elif action == "generate_video":
+            files = [file.get("photo_url") for file in video.get("photo", [])]
 
-        if material.data.get("video"):
-            video = material.data.get("video")
-            action = video.get("action")
-
-            if action == "forward_video":
-                await send_to_queue(
-                    queue_name="forward_video",
-                    data={
-                        "order_id": assembly_task.id,
-                        "file_id": video.get("video").get("video_id"),
-                    },
+            if not files:
+                await send_skip_video_message(
+                    assembly_task_id=assembly_task.id,
+                    reason="⚠️ Пользователь выбрал генерацию видео, но не прикрепил файлы",
                 )
-            elif action == "generate_video":
-                files = [file.get("photo_url") for file in video.get("photo", [])]
-
-                if not files:
-                    await send_skip_video_message(
-                        assembly_task_id=assembly_task.id,
-                        reason="⚠️ Пользователь выбрал генерацию видео, но не прикрепил файлы",
-                    )
-                    return
-
-                # await send_to_queue(
-                #     queue_name="generate_video",
-                #     data=VideoGenerationTask(
-                #         order_id=assembly_task.id, files=files, output_path=folder_path
-                #     ).model_dump(),
-                # )
+            else:
                 # Формируем DTO
                 task_data = VideoGenerationTask(
                     order_id=assembly_task.id,
@@ -272,34 +354,164 @@ async def processing_supply(data: dict):
                     output_path=folder_path,
                 )
 
-                # Сохраняем задачу напрямую в БД
+                # Задача сохраняется в БД вместе с завершением обработки
                 video_task = VideoTaskORM(
                     params=task_data.model_dump(),
                     status=VideoStatus.pending,
                 )
-                session.add(video_task)
 
-                log.info(
-                    f"🧩 Новая видео-задача сохранена в БД: {video_task.id} (order_id={assembly_task.id})"
-                )
+        elif action == "skip_video":
+            await send_skip_video_message(
+                assembly_task_id=assembly_task.id,
+                reason="⚠️ Пользователь нажал кнопку пропустить видео",
+            )
+        else:
+            log.info(f"⏭️ Пропускаем видео для сборочного задания {assembly_task.id}")
 
-            elif action == "skip_video":
-                await send_skip_video_message(
-                    assembly_task_id=assembly_task.id,
-                    reason="⚠️ Пользователь нажал кнопку пропустить видео",
-                )
-            else:
-                log.info(
-                    f"⏭️ Пропускаем видео для сборочного задания {assembly_task.id}"
+    async with AsyncSessionLocal() as session:
+        if not await mark_assignment_done(session, assembly_task.id):
+            log.info(
+                "Сборочное задание с id %s уже обработано", assembly_task.id
+            )
+            return
+
+        if video_task:
+            session.add(video_task)
+
+        await session.commit()
+
+        supply_complete = await is_supply_complete(session, supply_id)
+
+    if supply_complete and settings.WB_STICKER_SHEETS:
+        # Последнее задание закрытой поставки (заполнена или закрыта менеджером):
+        # стикеры печатаются одним листом. При одновременном завершении
+        # лист сформируется повторно и перезапишется
+        await send_to_queue(
+            queue_name="supply_sticker_sheet",
+            data={"supply_id": supply_id},
+        )
+
+    if video_task:
+        log.info(
+            f"🧩 Новая видео-задача сохранена в БД: {video_task.id} (order_id={assembly_task.id})"
+        )
+
+
+async def reserve_supply(
+    wb_client: WbGateway, assembly_task_id: int, account_id: int, category_name: str
+):
+    """
+    Занимает место в поставке категории. Если свободных мест нет, поставка
+    создается в WB без открытой транзакции и резервирование повторяется.
+
+    :return: поставка (id, name) или None, если задание уже обрабатывается
+    """
+    for _ in range(RESERVE_ATTEMPTS):
+        async with AsyncSessionLocal() as session:
+            if not await claim_assembly_task(session, assembly_task_id):
+                return None
+
+            supply = await reserve_supply_slot(
+                session, assembly_task_id, account_id, category_name
+            )
+
+            if supply:
+                await session.commit()
+                return supply
+
+            # Задание освобождается до создания поставки
+            await session.rollback()
+
+        async with AsyncSessionLocal() as session:
+            wb_supply_name = await next_supply_name(session, category_name)
+            await session.commit()
+
+        wb_supply = await wb_client.create_supply(name=wb_supply_name)
+
+        async with AsyncSessionLocal() as session:
+            session.add(
+                SupplyORM(
+                    id=wb_supply.id,
+                    account_id=account_id,
+                    category_name=category_name,
+                    name=wb_supply_name,
+                    order_count=0,
                 )
+            )
+            await session.commit()
 
+    raise RuntimeError(
+        f"Не удалось занять место в поставке для сборочного задания {assembly_task_id}"
+    )
+
+
+async def add_to_wb_supply(wb_client: WbGateway, assembly_task_id: int, supply_id: str):
+    try:
+        await wb_client.add_assembly_task_to_supply(
+            supply_id=str(supply_id), assembly_task_id=assembly_task_id
+        )
+    except WbClientError:
+        # WB не принял задание: занятое место освобождается
+        async with AsyncSessionLocal() as session:
+            await release_supply_slot(session, assembly_task_id, supply_id)
+            await session.commit()
+        raise
+
+    async with AsyncSessionLocal() as session:
+        await mark_added_to_supply(session, assembly_task_id)
         await session.commit()
 
 
+async def release_reserved_slot(assembly_task_id: int):
+    """
+    Освобождает место задания, которое не удалось добавить в поставку WB
+    за MAX_SUPPLY_ATTEMPTS попыток, иначе место занято до ручного разбора.
+    Задание, уже добавленное в поставку WB (ADDED), остается в ней.
+    """
+    async with AsyncSessionLocal() as session:
+        supply_id = await session.scalar(
+            select(WbAssemblyTaskORM.supply_id).where(
+                WbAssemblyTaskORM.id == assembly_task_id,
+                WbAssemblyTaskORM.supply_state == SupplyAssignmentState.RESERVED,
+            )
+        )
+
+        if supply_id:
+            await release_supply_slot(session, assembly_task_id, supply_id)
+            await session.commit()
+
+
+async def supply_partition_key(data: dict) -> Optional[str]:
+    """
+    Ключ партиции задания - кабинет и категория: задания одной категории
+    (общие поставки и счетчик поставок) обрабатываются последовательно,
+    разных категорий - параллельно.
+    """
+    task = SupplyTask.model_validate(data)
+
+    async with AsyncSessionLocal() as session:
+        row = (
+            await session.execute(
+                select(WbAssemblyTaskORM.account_id, TemplateORM.category_id)
+                .join(WbOrderORM, WbOrderORM.id == WbAssemblyTaskORM.wb_order_id)
+                .join(MaterialORM, MaterialORM.id == WbOrderORM.material_id)
+                .join(TemplateORM, TemplateORM.id == MaterialORM.template_id)
+                .where(WbAssemblyTaskORM.id == task.assembly_task_id)
+            )
+        ).one_or_none()
+
+    if not row:
+        return None
+
+    return f"{row.account_id}:{row.category_id}"
+
+
 async def main():
-    worker = QueueConsumer(
+    worker = PartitionedQueueConsumer(
         queue_name="processing_supply",
         handler_func=processing_supply,
+        partition_key_func=supply_partition_key,
+        lanes=SUPPLY_LANES,
     )
 
     await worker.start()
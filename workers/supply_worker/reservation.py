@@ -0,0 +1,230 @@
+"""
+Резервирование мест в поставках.
+
+Место занимается атомарным UPDATE ... order_count = order_count + 1 RETURNING
+с проверкой условий в WHERE: строка поставки блокируется только на время
+запроса, поэтому задания одной категории обрабатываются параллельно.
+Транзакции фиксирует вызывающий код.
+"""
+
+from typing import Optional
+
+from sqlalchemy import select, update, case, func, and_, Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.enums.supply_assignment import SupplyAssignmentState
+from src.database.models import (
+    SupplyORM,
+    WbAssemblyTaskORM,
+    CategorySupplyCounterORM,
+)
+
+SUPPLY_CAPACITY = 10
+"""Сборочных заданий в одной поставке"""
+
+
+async def claim_assembly_task(session: AsyncSession, assembly_task_id: int) -> bool:
+    """
+    Закрепляет задание за текущим обработчиком.
+
+    :return: False, если задание уже обрабатывается или обработано
+    """
+    result = await session.execute(
+        update(WbAssemblyTaskORM)
+        .where(
+            WbAssemblyTaskORM.id == assembly_task_id,
+            WbAssemblyTaskORM.supply_state.is_(None),
+            WbAssemblyTaskORM.supply_id.is_(None),
+        )
+        .values(supply_state=SupplyAssignmentState.RESERVED)
+        .returning(WbAssemblyTaskORM.id)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalar_one_or_none() is not None
+
+
+async def reserve_supply_slot(
+    session: AsyncSession, assembly_task_id: int, account_id: int, category_name: str
+) -> Optional[Row]:
+    """
+    Занимает место в активной поставке категории и записывает поставку в задание.
+    Сначала заполняются наиболее заполненные поставки.
+
+    :return: поставка (id, name) или None, если свободных мест нет
+    """
+    candidates = await session.scalars(
+        select(SupplyORM.id)
+        .where(
+            SupplyORM.account_id == account_id,
+            SupplyORM.category_name == category_name,
+            SupplyORM.status == "active",
+            SupplyORM.order_count < SUPPLY_CAPACITY,
+        )
+        .order_by(SupplyORM.order_count.desc(), SupplyORM.created_at)
+    )
+
+    for supply_id in candidates.all():
+        # Условия повторяются в WHERE: после ожидания блокировки
+        # Postgres проверяет их на актуальной версии строки
+        result = await session.execute(
+            update(SupplyORM)
+            .where(
+                SupplyORM.id == supply_id,
+                SupplyORM.status == "active",
+                SupplyORM.order_count < SUPPLY_CAPACITY,
+            )
+            .values(
+                order_count=SupplyORM.order_count + 1,
+                status=case(
+                    (SupplyORM.order_count + 1 >= SUPPLY_CAPACITY, "inactive"),
+                    else_=SupplyORM.status,
+                ),
+            )
+            .returning(SupplyORM.id, SupplyORM.name)
+            .execution_options(synchronize_session=False)
+        )
+        supply = result.one_or_none()
+
+        if supply:
+            await session.execute(
+                update(WbAssemblyTaskORM)
+                .where(WbAssemblyTaskORM.id == assembly_task_id)
+                .values(supply_id=supply.id)
+                .execution_options(synchronize_session=False)
+            )
+            return supply
+
+    return None
+
+
+async def next_supply_name(session: AsyncSession, category_name: str) -> str:
+    """
+    Увеличивает счетчик поставок категории и возвращает имя новой поставки.
+    """
+    counter_id = (
+        select(CategorySupplyCounterORM.id)
+        .where(CategorySupplyCounterORM.category_name == category_name)
+        .order_by(CategorySupplyCounterORM.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    supply_count = await session.scalar(
+        update(CategorySupplyCounterORM)
+        .where(CategorySupplyCounterORM.id == counter_id)
+        .values(supply_count=CategorySupplyCounterORM.supply_count + 1)
+        .returning(CategorySupplyCounterORM.supply_count)
+        .execution_options(synchronize_session=False)
+    )
+
+    if supply_count is None:
+        supply_count = 1
+        session.add(
+            CategorySupplyCounterORM(
+                category_name=category_name, supply_count=supply_count
+            )
+        )
+
+    return f"{category_name} - {supply_count}"
+
+
+async def mark_added_to_supply(session: AsyncSession, assembly_task_id: int):
+    await session.execute(
+        update(WbAssemblyTaskORM)
+        .where(
+            WbAssemblyTaskORM.id == assembly_task_id,
+            WbAssemblyTaskORM.supply_state == SupplyAssignmentState.RESERVED,
+        )
+        .values(
+            supply_state=SupplyAssignmentState.ADDED,
+            added_to_supply_at=func.now(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def release_supply_slot(
+    session: AsyncSession, assembly_task_id: int, supply_id: str
+):
+    """
+    Компенсация: освобождает место, занятое заданием, которое WB
+    не принял в поставку. Задание снова можно обработать.
+
+    Поставка, закрытая при заполнении, снова становится активной:
+    освободившееся место займут следующие задания категории.
+    """
+    result = await session.execute(
+        update(WbAssemblyTaskORM)
+        .where(
+            WbAssemblyTaskORM.id == assembly_task_id,
+            WbAssemblyTaskORM.supply_id == supply_id,
+            WbAssemblyTaskORM.supply_state == SupplyAssignmentState.RESERVED,
+        )
+        .values(supply_id=None, supply_state=None)
+        .returning(WbAssemblyTaskORM.id)
+        .execution_options(synchronize_session=False)
+    )
+
+    # Повторная компенсация не должна уменьшать счетчик еще раз
+    if result.scalar_one_or_none() is None:
+        return
+
+    await session.execute(
+        update(SupplyORM)
+        .where(SupplyORM.id == supply_id)
+        .values(
+            order_count=func.greatest(SupplyORM.order_count - 1, 0),
+            # Поставка, закрытая менеджером, остается закрытой:
+            # вручную закрывают только неполные поставки
+            status=case(
+                (
+                    and_(
+                        SupplyORM.status == "inactive",
+                        SupplyORM.order_count >= SUPPLY_CAPACITY,
+                    ),
+                    "active",
+                ),
+                else_=SupplyORM.status,
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def mark_assignment_done(session: AsyncSession, assembly_task_id: int) -> bool:
+    """
+    :return: False, если обработка задания уже завершена другим обработчиком
+    """
+    result = await session.execute(
+        update(WbAssemblyTaskORM)
+        .where(
+            WbAssemblyTaskORM.id == assembly_task_id,
+            WbAssemblyTaskORM.supply_state == SupplyAssignmentState.ADDED,
+        )
+        .values(supply_state=SupplyAssignmentState.DONE)
+        .returning(WbAssemblyTaskORM.id)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalar_one_or_none() is not None
+
+
+async def is_supply_complete(session: AsyncSession, supply_id: str) -> bool:
+    """
+    Поставка заполнена и обработка всех ее заданий завершена.
+    """
+    supply_status = await session.scalar(
+        select(SupplyORM.status).where(SupplyORM.id == supply_id)
+    )
+    if supply_status != "inactive":
+        return False
+
+    unfinished = await session.scalar(
+        select(func.count())
+        .select_from(WbAssemblyTaskORM)
+        .where(
+            WbAssemblyTaskORM.supply_id == supply_id,
+            WbAssemblyTaskORM.supply_state.is_distinct_from(
+                SupplyAssignmentState.DONE
+            ),
+        )
+    )
+    return unfinished == 0
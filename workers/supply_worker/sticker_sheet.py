@@ -0,0 +1,333 @@
+"""
+Лист стикеров поставки для печати.
+
+Стикеры всех сборочных заданий поставки собираются в один многостраничный PDF
+(страница - стикер 58×40 мм для термопринтера этикеток) и загружаются одним
+файлом в папку поставки на Яндекс Диске вместо sticker.png в папке каждого
+задания. Стикеры берутся из кэша (см. infrastructure/wb_service/stickers.py),
+недостающие запрашиваются у WB пачками. Изображения обрабатываются и PDF
+собирается в пуле процессов, чтобы не блокировать цикл событий.
+
+Лист формируется по сообщению {"supply_id": ...} из очереди supply_sticker_sheet
+(отправляется, когда поставка заполнена или закрыта менеджером, и после
+завершения последнего задания закрытой поставки) или вручную:
+    python -m src.workers.supply_worker.sticker_sheet --supply-id WB-GI-1234567
+"""
+
+import argparse
+import asyncio
+import base64
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import Optional
+
+from PIL import Image
+from pydantic import BaseModel
+from sqlalchemy import select
+
+from src.core.config.settings import settings
+from src.core.database.async_session import AsyncSessionLocal
+from src.core.enums.assembly_task import AssemblyTaskStatus
+from src.core.setup_logging import setup_logging
+from src.core.utils.template import render_template
+from src.database.models import (
+    WbAssemblyTaskORM,
+    WbOrderORM,
+    MaterialORM,
+    TemplateORM,
+    CategoryORM,
+    SupplyORM,
+    CategorySettingsORM,
+    SellerAccountORM,
+)
+from src.infrastructure.rabbitmq.consumer import QueueConsumer
+from src.infrastructure.wb_service.exceptions import WbNotFoundError
+from src.infrastructure.wb_service.gateway import WbGateway
+from src.infrastructure.wb_service.rate_limiter import WbRateLimiter
+from src.infrastructure.wb_service.stickers import StickerBatcher, StickerCache
+from src.infrastructure.ya_disk.client import YandexDiskService
+
+log = logging.getLogger(__name__)
+
+STICKER_SHEET_QUEUE = "supply_sticker_sheet"
+
+STICKER_WIDTH_MM = 58
+STICKER_HEIGHT_MM = 40
+"""Размер стикера (страницы листа), совпадает с размером запроса стикеров WB"""
+
+STICKER_SHEET_FILE_NAME = "stickers.pdf"
+
+STICKER_SHEET_PROCESSES = 4
+"""Процессов для обработки изображений и сборки PDF"""
+
+ASSEMBLY_TASK_MARKER = "__assembly_task__"
+
+
+class StickerSheetTask(BaseModel):
+    supply_id: str
+
+
+def prepare_sticker_image(png: bytes) -> bytes:
+    """
+    Выполняется в пуле процессов: приводит стикер к альбомной ориентации
+    страницы и переводит в оттенки серого (термопечать).
+    """
+    image = Image.open(BytesIO(png))
+    image.load()
+
+    if image.height > image.width:
+        image = image.rotate(90, expand=True)
+
+    if image.mode in ("RGBA", "LA", "P"):
+        # Прозрачный фон печатается белым
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image.convert("RGBA"), mask=image.convert("RGBA"))
+        image = background
+
+    buffer = BytesIO()
+    image.convert("L").save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def build_sticker_sheet(images: list[bytes]) -> bytes:
+    """
+    Выполняется в пуле процессов: PDF, стикер на страницу.
+    Изображение растягивается на страницу без пересэмплирования.
+    """
+    from reportlab.lib.units import mm
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfgen import canvas as rl_canvas
+
+    page_size = (STICKER_WIDTH_MM * mm, STICKER_HEIGHT_MM * mm)
+    pdf_buffer = BytesIO()
+    pdf = rl_canvas.Canvas(pdf_buffer, pagesize=page_size)
+
+    for image in images:
+        pdf.drawImage(
+            ImageReader(BytesIO(image)), 0, 0, width=page_size[0], height=page_size[1]
+        )
+        pdf.showPage()
+
+    pdf.save()
+    return pdf_buffer.getvalue()
+
+
+async def render_sticker_sheet(
+    executor: ProcessPoolExecutor, stickers: list[bytes]
+) -> bytes:
+    loop = asyncio.get_running_loop()
+
+    images = await asyncio.gather(
+        *(
+            loop.run_in_executor(executor, prepare_sticker_image, sticker)
+            for sticker in stickers
+        )
+    )
+    return await loop.run_in_executor(executor, build_sticker_sheet, list(images))
+
+
+def supply_folder_path(folder_path: str, supply_name: str) -> str:
+    """
+    Папка поставки - путь до части с названием поставки, но не глубже папки
+    задания (путь отрисован с ASSEMBLY_TASK_MARKER вместо id задания).
+    """
+    parts = folder_path.strip("/").split("/")
+    end = len(parts)
+
+    supply_parts = [i for i, part in enumerate(parts) if supply_name in part]
+    if supply_parts:
+        end = supply_parts[-1] + 1
+
+    task_parts = [i for i, part in enumerate(parts) if ASSEMBLY_TASK_MARKER in part]
+    if task_parts:
+        end = min(end, task_parts[0])
+
+    parts = parts[:end]
+    return "/" + "/".join(parts) + "/" if parts else "/"
+
+
+class StickerSheetService:
+    def __init__(
+        self,
+        yandex_disk: YandexDiskService,
+        executor: ProcessPoolExecutor,
+        sticker_cache: Optional[StickerCache] = None,
+        rate_limiter: Optional[WbRateLimiter] = None,
+    ):
+        self.yandex_disk = yandex_disk
+        self.executor = executor
+        self.sticker_cache = sticker_cache
+        self.rate_limiter = rate_limiter
+
+        self._wb_clients: dict[tuple[int, Optional[str]], WbGateway] = {}
+        self._sticker_batchers: dict[tuple[int, Optional[str]], StickerBatcher] = {}
+
+    def get_sticker_batcher(self, account: SellerAccountORM) -> StickerBatcher:
+        # Ключ с токеном: после смены токена кабинета создается новый клиент
+        key = (account.id, account.wb_token)
+        if key not in self._sticker_batchers:
+            self._wb_clients[key] = WbGateway.for_account(
+                account.id, account.wb_token, self.rate_limiter
+            )
+            self._sticker_batchers[key] = StickerBatcher(
+                self._wb_clients[key], cache=self.sticker_cache
+            )
+        return self._sticker_batchers[key]
+
+    async def close(self):
+        for wb_client in self._wb_clients.values():
+            await wb_client.close()
+
+    async def generate(self, supply_id: str) -> Optional[str]:
+        """
+        Формирует и загружает лист стикеров поставки.
+
+        :return: путь к листу на Яндекс Диске или None, если листа нет
+        """
+        async with AsyncSessionLocal() as session:
+            supply = await session.get(SupplyORM, supply_id)
+
+            if not supply:
+                raise ValueError(f"Поставка {supply_id} не найдена")
+
+            account = await session.get(SellerAccountORM, supply.account_id)
+
+            if not account:
+                raise ValueError(f"Кабинет с id {supply.account_id} не найден")
+
+            assembly_tasks = (
+                await session.scalars(
+                    select(WbAssemblyTaskORM)
+                    .where(WbAssemblyTaskORM.supply_id == supply_id)
+                    .order_by(WbAssemblyTaskORM.id)
+                )
+            ).all()
+            assembly_tasks = [
+                assembly_task
+                for assembly_task in assembly_tasks
+                if not AssemblyTaskStatus.is_cancelled(
+                    assembly_task.supplier_status, assembly_task.wb_status
+                )
+            ]
+
+            if not assembly_tasks:
+                log.info("В поставке %s нет сборочных заданий", supply_id)
+                return None
+
+            # Путь папки определяется по первому заданию поставки
+            row = (
+                await session.execute(
+                    select(
+                        WbOrderORM.created_at,
+                        CategoryORM.folder_name,
+                        CategorySettingsORM.output_path,
+                        CategorySettingsORM.save_as_format,
+                    )
+                    .join(MaterialORM, MaterialORM.id == WbOrderORM.material_id)
+                    .join(TemplateORM, TemplateORM.id == MaterialORM.template_id)
+                    .join(CategoryORM, CategoryORM.id == TemplateORM.category_id)
+                    .join(
+                        CategorySettingsORM,
+                        CategorySettingsORM.category_id == CategoryORM.id,
+                    )
+                    .where(WbOrderORM.id == assembly_tasks[0].wb_order_id)
+                )
+            ).one_or_none()
+
+        if not row:
+            raise ValueError(f"Не найдены настройки категории поставки {supply_id}")
+
+        if not row.save_as_format:
+            # Стикеры категории не сохраняются (как и sticker.png задания)
+            log.info(
+                "Стикеры категории поставки %s не сохраняются, лист не нужен",
+                supply_id,
+            )
+            return None
+
+        folder_path = supply_folder_path(
+            await render_template(
+                text=row.output_path,
+                category_folder=row.folder_name or "unsorted",
+                order_date=row.created_at.date(),
+                assembly_task_id=ASSEMBLY_TASK_MARKER,
+                supply_name=supply.name,
+            ),
+            supply.name,
+        )
+
+        sticker_batcher = self.get_sticker_batcher(account)
+        results = await asyncio.gather(
+            *(sticker_batcher.get(assembly_task.id) for assembly_task in assembly_tasks),
+            return_exceptions=True,
+        )
+
+        stickers = []
+        for assembly_task, result in zip(assembly_tasks, results):
+            if isinstance(result, WbNotFoundError):
+                log.warning(
+                    "Нет стикера сборочного задания %s, пропускаем", assembly_task.id
+                )
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            stickers.append(base64.b64decode(result.file))
+
+        if not stickers:
+            log.info("Нет стикеров для поставки %s", supply_id)
+            return None
+
+        pdf = await render_sticker_sheet(self.executor, stickers)
+
+        sheet_path = folder_path + STICKER_SHEET_FILE_NAME
+        # Повторная загрузка перезаписывает лист
+        await self.yandex_disk.upload_bytes(pdf, sheet_path)
+
+        log.info(
+            "Лист стикеров поставки %s (%s стр., %s байт) загружен: %s",
+            supply_id,
+            len(stickers),
+            len(pdf),
+            sheet_path,
+        )
+        return sheet_path
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Лист стикеров поставки")
+    parser.add_argument(
+        "--supply-id", help="Сформировать лист поставки и завершить работу"
+    )
+    parser.add_argument("--processes", type=int, default=STICKER_SHEET_PROCESSES)
+    args = parser.parse_args()
+
+    rate_limiter = WbRateLimiter.from_settings()
+
+    with ProcessPoolExecutor(max_workers=args.processes) as executor:
+        service = StickerSheetService(
+            yandex_disk=YandexDiskService(token=settings.YANDEX_TOKEN),
+            executor=executor,
+            sticker_cache=StickerCache(settings.WB_STICKER_CACHE_DIR),
+            rate_limiter=rate_limiter,
+        )
+
+        try:
+            if args.supply_id:
+                await service.generate(args.supply_id)
+                return
+
+            async def handle(data: dict):
+                task = StickerSheetTask.model_validate(data)
+                await service.generate(task.supply_id)
+
+            worker = QueueConsumer(queue_name=STICKER_SHEET_QUEUE, handler_func=handle)
+            await worker.start()
+        finally:
+            await service.close()
+            await rate_limiter.close()
+
+
+if __name__ == "__main__":
+    setup_logging(service_name="supply_sticker_sheet")
+    asyncio.run(main())
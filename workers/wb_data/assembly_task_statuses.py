@@ -0,0 +1,226 @@
+"""
+Отслеживание статусов сборочных заданий WB.
+
+Статусы открытых заданий запрашиваются пачками по 1000 параллельно
+и сохраняются в wb_assembly_task. При отмене задания в той же транзакции
+отменяются ожидающие генерации видео и ставится уведомление администратору,
+а воркеры поставок и макетов пропускают отмененные задания.
+"""
+
+import asyncio
+import logging
+from datetime import timedelta
+
+from sqlalchemy import select, update, or_, and_, values, column, BigInteger, String
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config.settings import settings
+from src.core.enums.assembly_task import AssemblyTaskStatus
+from src.core.utils.time import now_utc
+from src.database.models import WbAssemblyTaskORM, VideoTaskORM
+from src.database.models.video_tasks import VideoStatus
+from src.database.repositories import NotificationOutboxRepository
+from src.notification_service.entities import NotificationMessage
+from src.infrastructure.wb_service.gateway import WbGateway
+from src.infrastructure.wb_service.models import WildberriesAssemblyOrderStatus
+
+log = logging.getLogger(__name__)
+
+STATUS_BATCH_SIZE = 1000
+"""Максимум идентификаторов в одном запросе статусов WB"""
+
+STATUS_CONCURRENCY = 4
+"""Одновременных запросов статусов"""
+
+OPEN_TASKS_DEPTH = timedelta(days=30)
+"""Статусы заданий старше этого срока не отслеживаются"""
+
+
+async def get_open_assembly_task_ids(
+    session: AsyncSession, account_id: int
+) -> list[int]:
+    """
+    Получает идентификаторы заданий кабинета, статус которых еще может измениться.
+    """
+    result = await session.execute(
+        select(WbAssemblyTaskORM.id)
+        .where(
+            WbAssemblyTaskORM.account_id == account_id,
+            WbAssemblyTaskORM.created_at >= now_utc() - OPEN_TASKS_DEPTH,
+            WbAssemblyTaskORM.supplier_status.is_distinct_from(
+                AssemblyTaskStatus.SUPPLIER_CANCEL
+            ),
+            or_(
+                WbAssemblyTaskORM.wb_status.is_(None),
+                WbAssemblyTaskORM.wb_status.not_in(
+                    AssemblyTaskStatus.FINAL_WB_STATUSES
+                ),
+            ),
+        )
+        .order_by(WbAssemblyTaskORM.id)
+    )
+    return list(result.scalars().all())
+
+
+async def fetch_statuses(
+    wb_api: WbGateway, ids: list[int]
+) -> list[WildberriesAssemblyOrderStatus]:
+    """
+    Запрашивает статусы пачками по STATUS_BATCH_SIZE, не более
+    STATUS_CONCURRENCY запросов одновременно. Пачки с ошибкой пропускаются
+    до следующей синхронизации.
+    """
+    semaphore = asyncio.Semaphore(STATUS_CONCURRENCY)
+
+    async def fetch(batch: list[int]):
+        async with semaphore:
+            response = await wb_api.fetch_assembly_task_statuses(ids=batch)
+            return response.orders
+
+    results = await asyncio.gather(
+        *(
+            fetch(ids[i : i + STATUS_BATCH_SIZE])
+            for i in range(0, len(ids), STATUS_BATCH_SIZE)
+        ),
+        return_exceptions=True,
+    )
+
+    statuses = []
+    for result in results:
+        if isinstance(result, Exception):
+            log.error("Ошибка при получении статусов сборочных заданий: %s", result)
+            continue
+        statuses.extend(result)
+
+    # Неизвестный статус сохраняется: задание остается открытым
+    # и не считается отмененным
+    for status in statuses:
+        if not AssemblyTaskStatus.is_known(status.supplier_status, status.wb_status):
+            log.warning(
+                "Неизвестный статус сборочного задания %s: %s / %s",
+                status.id,
+                status.supplier_status,
+                status.wb_status,
+            )
+
+    return statuses
+
+
+def build_cancellation_notification(
+    cancelled: list[tuple[int, str, str]],
+) -> NotificationMessage:
+    lines = "\n".join(
+        f"#{task_id}: {supplier_status} / {wb_status}"
+        for task_id, supplier_status, wb_status in cancelled
+    )
+    return NotificationMessage(
+        chat_id=settings.ADMIN_CHAT_ID,
+        message_thread_id=settings.WB_NOTIFICATION_THREAD,
+        type="text",
+        text=f"🚫 Отменены сборочные задания ({len(cancelled)}):\n\n{lines}",
+    )
+
+
+async def sync_assembly_task_statuses(
+    session: AsyncSession, wb_api: WbGateway, account_id: int
+) -> int:
+    """
+    Обновляет статусы открытых сборочных заданий кабинета.
+
+    :return: количество заданий, статус которых изменился
+    """
+    ids = await get_open_assembly_task_ids(session, account_id)
+
+    if not ids:
+        return 0
+
+    statuses = await fetch_statuses(wb_api, ids)
+
+    if not statuses:
+        return 0
+
+    now = now_utc()
+
+    status_values = values(
+        column("id", BigInteger),
+        column("supplier_status", String),
+        column("wb_status", String),
+        name="statuses",
+    ).data([(s.id, s.supplier_status, s.wb_status) for s in statuses])
+
+    await session.execute(
+        update(WbAssemblyTaskORM)
+        .where(WbAssemblyTaskORM.id.in_([s.id for s in statuses]))
+        .values(status_checked_at=now)
+        .execution_options(synchronize_session=False)
+    )
+
+    result = await session.execute(
+        update(WbAssemblyTaskORM)
+        .where(
+            WbAssemblyTaskORM.id == status_values.c.id,
+            or_(
+                WbAssemblyTaskORM.supplier_status.is_distinct_from(
+                    status_values.c.supplier_status
+                ),
+                WbAssemblyTaskORM.wb_status.is_distinct_from(
+                    status_values.c.wb_status
+                ),
+            ),
+        )
+        .values(
+            supplier_status=status_values.c.supplier_status,
+            wb_status=status_values.c.wb_status,
+            status_changed_at=now,
+        )
+        .returning(
+            WbAssemblyTaskORM.id,
+            WbAssemblyTaskORM.supplier_status,
+            WbAssemblyTaskORM.wb_status,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    changed = result.all()
+
+    # Открытые задания не были отменены, поэтому каждая отмена здесь - новая
+    cancelled = [
+        tuple(row)
+        for row in changed
+        if AssemblyTaskStatus.is_cancelled(row.supplier_status, row.wb_status)
+    ]
+
+    if cancelled:
+        cancelled_ids = [task_id for task_id, _, _ in cancelled]
+
+        await session.execute(
+            update(VideoTaskORM)
+            .where(
+                and_(
+                    VideoTaskORM.status == VideoStatus.pending,
+                    VideoTaskORM.params["order_id"].as_integer().in_(cancelled_ids),
+                )
+            )
+            .values(status=VideoStatus.cancelled)
+            .execution_options(synchronize_session=False)
+        )
+
+        await NotificationOutboxRepository(session).add_notifications(
+            [
+                build_cancellation_notification(cancelled[i : i + 50])
+                for i in range(0, len(cancelled), 50)
+            ],
+            coalesce=True,
+        )
+
+        log.info("Отменены сборочные задания: %s", cancelled_ids)
+
+    await session.commit()
+
+    log.info(
+        "Статусы сборочных заданий: проверено %s, изменилось %s, отменено %s",
+        len(statuses),
+        len(changed),
+        len(cancelled),
+    )
+
+    return len(changed)
@@ -0,0 +1,233 @@
+"""
+Загрузка заказов WB за произвольный период (подключение продавца,
+восстановление после многодневного простоя).
+
+Период делится на дни: отчет с flag=1 возвращает все заказы за указанную дату,
+поэтому дни не пересекаются. Запросы выполняются по одному в пределах лимита
+WB API, запись дня в БД совмещается с получением следующего. Заказы дня
+дедуплицируются по srid и загружаются через COPY.
+Загруженный день отмечается в wb_sync_state (orders_backfill:<кабинет>:<дата>),
+поэтому прерванная загрузка при повторном запуске продолжается с незагруженных дней.
+
+Пример:
+    python -m src.workers.wb_data.backfill --account-id 1 --date-from 2026-09-01
+"""
+
+import argparse
+import asyncio
+import logging
+from datetime import date, timedelta
+
+from src.core.database.async_session import AsyncSessionLocal
+from src.core.setup_logging import setup_logging
+from src.core.utils.time import now_utc, today_moscow
+from src.database.models import SellerAccountORM
+from src.database.repositories import RegionRepository, WbSyncStateRepository
+from src.infrastructure.wb_service.gateway import WbGateway, ORDERS_REPORT_LIMIT
+from src.infrastructure.wb_service.models import WildberriesOrder
+from src.infrastructure.wb_service.rate_limiter import WbRateLimiter
+from src.workers.wb_data.main import UpsertStats, copy_orders_page, order_to_row
+
+log = logging.getLogger(__name__)
+
+BACKFILL_SYNC_PREFIX = "orders_backfill:"
+
+BACKFILL_CONCURRENCY = 2
+"""
+Дней, загружаемых одновременно. Запросы отчета все равно выполняются по одному
+(лимит statistics WB - 1 запрос в минуту, см. WbRateLimiter): параллельность
+только совмещает запись дня в БД с ожиданием и получением следующего дня,
+большее значение не ускоряет загрузку.
+"""
+
+
+def backfill_sync_prefix(account_id: int) -> str:
+    return f"{BACKFILL_SYNC_PREFIX}{account_id}:"
+
+
+def split_days(date_from: date, date_to: date) -> list[date]:
+    return [
+        date_from + timedelta(days=i) for i in range((date_to - date_from).days + 1)
+    ]
+
+
+async def get_completed_days(account_id: int) -> set[date]:
+    prefix = backfill_sync_prefix(account_id)
+
+    async with AsyncSessionLocal() as session:
+        states = await WbSyncStateRepository(session).get_by_prefix(prefix)
+
+    return {
+        date.fromisoformat(state.name.removeprefix(prefix))
+        for state in states
+        if state.last_full_sync_at is not None
+    }
+
+
+async def fetch_day(wb_api: WbGateway, day: date) -> list[WildberriesOrder]:
+    """
+    Получает все заказы за день, оставляя по одной (последней измененной)
+    записи на srid.
+    """
+    orders: dict[str, WildberriesOrder] = {}
+    received = 0
+
+    async for chunk in wb_api.iter_orders_report(date_from=day.isoformat(), flag=1):
+        received += len(chunk)
+        for order in chunk:
+            known = orders.get(order.id)
+            if known is None or order.last_change_date > known.last_change_date:
+                orders[order.id] = order
+
+    if received >= ORDERS_REPORT_LIMIT:
+        log.warning(
+            "Отчет за %s достиг лимита %s строк, часть заказов может отсутствовать",
+            day,
+            ORDERS_REPORT_LIMIT,
+        )
+
+    return list(orders.values())
+
+
+async def backfill_day(
+    wb_api: WbGateway, account_id: int, day: date, region_aliases: dict
+) -> UpsertStats:
+    orders = await fetch_day(wb_api, day)
+
+    async def iter_rows():
+        yield [order_to_row(order, region_aliases, account_id) for order in orders]
+
+    # Отдельная сессия: временная таблица COPY принадлежит соединению
+    async with AsyncSessionLocal() as session:
+        stats = await copy_orders_page(session, iter_rows())
+
+        # Текущий день (по Москве, как в отчете WB) еще не завершен,
+        # его заказы догрузит обычная синхронизация
+        if day < today_moscow():
+            await WbSyncStateRepository(session).save_cursor(
+                f"{backfill_sync_prefix(account_id)}{day.isoformat()}",
+                max((order.last_change_date for order in orders), default=None),
+                last_full_sync_at=now_utc(),
+            )
+
+    log.info(
+        "Заказы WB за %s: получено %s, добавлено %s, изменено %s, без изменений %s",
+        day,
+        len(orders),
+        stats.inserted,
+        stats.updated,
+        stats.unchanged,
+    )
+
+    return stats
+
+
+async def backfill_orders(
+    wb_api: WbGateway,
+    account_id: int,
+    date_from: date,
+    date_to: date,
+    concurrency: int = BACKFILL_CONCURRENCY,
+    force: bool = False,
+) -> UpsertStats:
+    """
+    Загружает заказы кабинета за период [date_from, date_to].
+
+    :param force: загрузить заново и уже загруженные дни
+    """
+    days = split_days(date_from, date_to)
+
+    if not force:
+        completed = await get_completed_days(account_id)
+        days = [day for day in days if day not in completed]
+
+    log.info(
+        "Загрузка заказов WB с %s по %s: дней к загрузке %s",
+        date_from,
+        date_to,
+        len(days),
+    )
+
+    async with AsyncSessionLocal() as session:
+        region_aliases = await RegionRepository(session).get_alias_map()
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(day: date) -> UpsertStats:
+        async with semaphore:
+            return await backfill_day(wb_api, account_id, day, region_aliases)
+
+    results = await asyncio.gather(*(run(day) for day in days), return_exceptions=True)
+
+    stats = UpsertStats()
+    failed = []
+
+    for day, result in zip(days, results):
+        if isinstance(result, Exception):
+            log.error("Ошибка загрузки заказов WB за %s: %s", day, result)
+            failed.append(day)
+            continue
+        stats += result
+
+    log.info(
+        "Загрузка заказов WB завершена: добавлено %s, изменено %s, без изменений %s, "
+        "дней с ошибкой %s",
+        stats.inserted,
+        stats.updated,
+        stats.unchanged,
+        len(failed),
+    )
+
+    if failed:
+        log.warning(
+            "Незагруженные дни будут загружены при повторном запуске: %s", failed
+        )
+
+    return stats
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Загрузка заказов WB за период")
+    parser.add_argument("--account-id", type=int, required=True)
+    parser.add_argument("--date-from", type=date.fromisoformat, required=True)
+    parser.add_argument(
+        "--date-to",
+        type=date.fromisoformat,
+        default=today_moscow(),
+        help="Последний день периода (по умолчанию сегодня по Москве)",
+    )
+    parser.add_argument("--concurrency", type=int, default=BACKFILL_CONCURRENCY)
+    parser.add_argument(
+        "--force", action="store_true", help="Загрузить заново уже загруженные дни"
+    )
+    args = parser.parse_args()
+
+    if args.date_from > args.date_to:
+        parser.error("--date-from позже --date-to")
+
+    async with AsyncSessionLocal() as session:
+        account = await session.get(SellerAccountORM, args.account_id)
+
+    if not account:
+        parser.error(f"Кабинет {args.account_id} не найден")
+
+    rate_limiter = WbRateLimiter.from_settings()
+
+    async with WbGateway.for_account(
+        account.id, account.wb_token, rate_limiter
+    ) as wb_api:
+        await backfill_orders(
+            wb_api,
+            account_id=account.id,
+            date_from=args.date_from,
+            date_to=args.date_to,
+            concurrency=args.concurrency,
+            force=args.force,
+        )
+
+    await rate_limiter.close()
+
+
+if __name__ == "__main__":
+    setup_logging(service_name="wb_data_backfill")
+    asyncio.run(main())
@@ -0,0 +1,148 @@
+"""
+Загрузка данных синхронизации WB через COPY во временную таблицу.
+
+Строки передаются в Postgres протоколом COPY (asyncpg copy_records_to_table)
+во временную таблицу (не пишется в WAL и видна только текущему соединению),
+после чего переносятся в основную таблицу одним запросом INSERT ... SELECT
+в той же транзакции. Транзакцию фиксирует вызывающий код, временная таблица
+удаляется при фиксации.
+"""
+
+from typing import Sequence
+
+from sqlalchemy import text, Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+ORDERS_STAGING_TABLE = "wb_orders_staging"
+ASSEMBLY_TASKS_STAGING_TABLE = "wb_assembly_task_staging"
+
+ORDER_COLUMNS = (
+    "id",
+    "account_id",
+    "created_at",
+    "country_name",
+    "region_name",
+    "region_code",
+    "supplier_article",
+    "nm_id",
+    "is_cancel",
+    "cancel_date",
+    "warehouse_name",
+    "warehouse_type",
+)
+ORDER_MUTABLE_COLUMNS = ("is_cancel", "cancel_date", "warehouse_name", "warehouse_type")
+
+ORDER_STAGING_COLUMNS = ORDER_COLUMNS + ("last_change_date",)
+"""
+Колонки временной таблицы заказов: по last_change_date из нескольких
+версий одного заказа выбирается последняя, в wb_orders он не хранится
+"""
+
+ASSEMBLY_TASK_COLUMNS = ("id", "account_id", "wb_order_id", "created_at")
+
+
+async def _create_staging_table(session: AsyncSession, staging: str, table: str):
+    await session.execute(
+        text(
+            f"CREATE TEMP TABLE IF NOT EXISTS {staging} "
+            f"(LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+    )
+
+
+async def _copy_records(
+    session: AsyncSession, staging: str, columns: Sequence[str], rows: list[dict]
+):
+    if not rows:
+        return
+
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+
+    await raw_connection.driver_connection.copy_records_to_table(
+        staging,
+        records=[tuple(row[column] for column in columns) for row in rows],
+        columns=list(columns),
+    )
+
+
+async def create_orders_staging(session: AsyncSession):
+    await _create_staging_table(session, ORDERS_STAGING_TABLE, "wb_orders")
+    await session.execute(
+        text(
+            f"ALTER TABLE {ORDERS_STAGING_TABLE} "
+            f"ADD COLUMN IF NOT EXISTS last_change_date timestamp"
+        )
+    )
+
+
+async def copy_orders_to_staging(session: AsyncSession, orders: list[dict]):
+    await _copy_records(session, ORDERS_STAGING_TABLE, ORDER_STAGING_COLUMNS, orders)
+
+
+async def merge_orders_from_staging(session: AsyncSession) -> tuple[list[Row], int]:
+    """
+    Переносит заказы из временной таблицы в wb_orders: новые добавляются,
+    у существующих обновляются только изменившиеся изменяемые поля.
+
+    :return: (добавленные и измененные заказы (id, nm_id, created_at, inserted),
+              количество уникальных заказов во временной таблице)
+    """
+    columns = ", ".join(ORDER_COLUMNS)
+    set_clause = ", ".join(f"{c} = excluded.{c}" for c in ORDER_MUTABLE_COLUMNS)
+    changed = " OR ".join(
+        f"wb_orders.{c} IS DISTINCT FROM excluded.{c}" for c in ORDER_MUTABLE_COLUMNS
+    )
+
+    staged = await session.scalar(
+        text(f"SELECT count(DISTINCT id) FROM {ORDERS_STAGING_TABLE}")
+    )
+
+    # DISTINCT ON: один заказ может прийти в нескольких пачках отчета,
+    # сохраняется последняя версия
+    result = await session.execute(
+        text(
+            f"INSERT INTO wb_orders ({columns}) "
+            f"SELECT DISTINCT ON (id) {columns} FROM {ORDERS_STAGING_TABLE} "
+            f"ORDER BY id, last_change_date DESC NULLS LAST "
+            f"ON CONFLICT (id) DO UPDATE SET {set_clause} WHERE {changed} "
+            f"RETURNING id, nm_id, created_at, xmax = 0 AS inserted"
+        )
+    )
+
+    return result.all(), staged
+
+
+async def load_assembly_tasks(
+    session: AsyncSession, assembly_tasks: list[dict]
+) -> list[Row]:
+    """
+    Добавляет новые сборочные задания через временную таблицу.
+
+    :return: заказы новых сборочных заданий (id, nm_id, created_at)
+    """
+    await _create_staging_table(
+        session, ASSEMBLY_TASKS_STAGING_TABLE, "wb_assembly_task"
+    )
+    await _copy_records(
+        session, ASSEMBLY_TASKS_STAGING_TABLE, ASSEMBLY_TASK_COLUMNS, assembly_tasks
+    )
+
+    columns = ", ".join(ASSEMBLY_TASK_COLUMNS)
+    # Повторы задания в списке новых заданий WB совпадают: created_at DESC
+    # только делает выбор строки DISTINCT ON однозначным
+    result = await session.execute(
+        text(
+            f"WITH inserted AS ("
+            f"  INSERT INTO wb_assembly_task ({columns}) "
+            f"  SELECT DISTINCT ON (id) {columns} "
+            f"  FROM {ASSEMBLY_TASKS_STAGING_TABLE} ORDER BY id, created_at DESC "
+            f"  ON CONFLICT DO NOTHING "
+            f"  RETURNING wb_order_id"
+            f") "
+            f"SELECT o.id, o.nm_id, o.created_at "
+            f"FROM wb_orders o JOIN inserted i ON i.wb_order_id = o.id"
+        )
+    )
+
+    return result.all()
@@ -1,18 +1,71 @@
 import asyncio
 import logging
-from datetime import datetime, timedelta
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import AsyncIterator, Optional
 
+from sqlalchemy import select, or_, literal_column
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.application.dto.wb_order.new_orders_event import NewWbOrdersEvent
 from src.core.config.settings import settings
 from src.core.database.async_session import AsyncSessionLocal
 from src.core.setup_logging import setup_logging
+from src.core.utils.time import now_utc, now_moscow
 from src.database.models import WbAssemblyTaskORM, WbOrderORM
-from src.workers.wb_data.wb_api.client import WildberriesApi
+from src.database.repositories import (
+    RegionRepository,
+    WbSyncStateRepository,
+    SellerAccountRepository,
+)
+from src.domain.wb_orders.normalizers import city_to_region, resolve_region_code
+from src.infrastructure.rabbitmq.producer import send_to_queue
+from src.infrastructure.wb_service.gateway import WbGateway, ORDERS_REPORT_LIMIT
+from src.infrastructure.wb_service.models import WildberriesOrder
+from src.infrastructure.wb_service.rate_limiter import WbRateLimiter
+from src.workers.wb_data.assembly_task_statuses import sync_assembly_task_statuses
+from src.workers.wb_data.bulk_load import (
+    ORDER_COLUMNS,
+    create_orders_staging,
+    copy_orders_to_staging,
+    merge_orders_from_staging,
+    load_assembly_tasks,
+)
 
 log = logging.getLogger(__name__)
 
+# Секунд между синхронизациями (отчет о заказах WB - не чаще 1 запроса в минуту)
+SYNC_INTERVAL = 60
+
+ORDERS_SYNC_NAME = "orders"
+
+ACCOUNTS_REFRESH_INTERVAL = 300
+"""Период проверки списка активных кабинетов (сек)"""
+
+FULL_SYNC_INTERVAL = timedelta(hours=6)
+"""Период полной сверки заказов"""
+
+FULL_SYNC_DEPTH = timedelta(days=30)
+"""Глубина полной сверки заказов"""
+
+EVENT_BATCH_SIZE = 1000
+"""Заказов в одном событии new_wb_orders"""
+
+
+async def publish_new_orders_event(orders: list):
+    """
+    Публикует событие о новых/измененных заказах для воркера поиска заказов.
+    """
+    if not orders:
+        return
+
+    event = NewWbOrdersEvent(orders=orders)
+    await send_to_queue(
+        queue_name="new_wb_orders",
+        data=event.model_dump(mode="json"),
+    )
+
 
 async def upsert_assembly_task_data_in_batches(
     session: AsyncSession, assembly_task_data: list, batch_size: int = 1000
@@ -21,79 +74,350 @@ async def upsert_assembly_task_data_in_batches(
         batch = assembly_task_data[i : i + batch_size]
         stmt = pg_insert(WbAssemblyTaskORM).values(batch)
         stmt = stmt.on_conflict_do_nothing()
-        await session.execute(stmt)
+        stmt = stmt.returning(WbAssemblyTaskORM.wb_order_id)
+        result = await session.execute(stmt)
+        wb_order_ids = result.scalars().all()
+
+        # Заказы без сборочного задания не могли быть сопоставлены ранее
+        result = await session.execute(
+            select(WbOrderORM.id, WbOrderORM.nm_id, WbOrderORM.created_at).where(
+                WbOrderORM.id.in_(wb_order_ids)
+            )
+        )
+        new_orders = result.all()
         await session.commit()
 
+        await publish_new_orders_event(new_orders)
+
+
+@dataclass
+class UpsertStats:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+    def __iadd__(self, other: "UpsertStats") -> "UpsertStats":
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+        return self
+
 
 async def upsert_orders_in_batches(
     session: AsyncSession, orders_data: list, batch_size: int = 1000
-):
+) -> UpsertStats:
+    """
+    Добавляет новые заказы и обновляет изменяемые поля существующих.
+
+    Строки, в которых изменяемые поля не изменились, не перезаписываются
+    (не создают мертвых версий строк и WAL) и не попадают в событие новых заказов.
+    """
+    stats = UpsertStats()
+
     for i in range(0, len(orders_data), batch_size):
         batch = orders_data[i : i + batch_size]
-        stmt = pg_insert(WbOrderORM).values(batch)
+        stmt = pg_insert(WbOrderORM).values(
+            [{column: order[column] for column in ORDER_COLUMNS} for order in batch]
+        )
+        mutable_columns = {
+            WbOrderORM.is_cancel: stmt.excluded.is_cancel,
+            WbOrderORM.cancel_date: stmt.excluded.cancel_date,
+            WbOrderORM.warehouse_name: stmt.excluded.warehouse_name,
+            WbOrderORM.warehouse_type: stmt.excluded.warehouse_type,
+        }
         stmt = stmt.on_conflict_do_update(
             index_elements=[WbOrderORM.id],
-            set_={
-                WbOrderORM.is_cancel: stmt.excluded.is_cancel,
-                WbOrderORM.cancel_date: stmt.excluded.cancel_date,
-                WbOrderORM.warehouse_name: stmt.excluded.warehouse_name,
-                WbOrderORM.warehouse_type: stmt.excluded.warehouse_type,
-            },
+            set_=mutable_columns,
+            where=or_(
+                *(
+                    column.is_distinct_from(excluded)
+                    for column, excluded in mutable_columns.items()
+                )
+            ),
+        )
+        stmt = stmt.returning(
+            WbOrderORM.id,
+            WbOrderORM.nm_id,
+            WbOrderORM.created_at,
+            # xmax = 0 только у вставленных строк
+            literal_column("xmax = 0").label("inserted"),
         )
 
         # Выполняем запрос
-        await session.execute(stmt)
+        result = await session.execute(stmt)
+        rows = result.all()
         await session.commit()
 
+        inserted = sum(1 for row in rows if row.inserted)
+        stats += UpsertStats(
+            inserted=inserted,
+            updated=len(rows) - inserted,
+            unchanged=len(batch) - len(rows),
+        )
 
-city_to_region = {
-    "Москва": "Московская область",
-    "Санкт-Петербург": "Ленинградская область",
-    "Севастополь": "Республика Крым",
-}
+        await publish_new_orders_event(rows)
 
+    return stats
 
-async def get_wb_data_and_save_to_db():
-    async with AsyncSessionLocal() as session:
-        try:
-            wb_api = WildberriesApi(token=settings.WB_TOKEN)
-            date_from = (datetime.now() - timedelta(days=30)).date()
-            wb_orders = wb_api.fetch_orders_report(date_from=str(date_from))
 
-            # Заменяем названия городов на регионы
-            for order in wb_orders.orders:
-                if order.region_name in city_to_region:
-                    order.region_name = city_to_region[order.region_name]
+def order_to_row(
+    order: WildberriesOrder, region_aliases: dict, account_id: int
+) -> dict:
+    region_name = city_to_region(order.region_name)
+
+    return {
+        # last_change_date не сохраняется в wb_orders, по нему при загрузке
+        # через COPY выбирается последняя версия заказа
+        **order.model_dump(),
+        "account_id": account_id,
+        # Названия городов заменяются на регионы
+        "region_name": region_name,
+        # Код региона для индексированного поиска по региону
+        "region_code": resolve_region_code(region_name, region_aliases),
+    }
+
+
+async def copy_orders_page(
+    session: AsyncSession, chunks: AsyncIterator[list[dict]]
+) -> UpsertStats:
+    """
+    Загружает страницу отчета через COPY во временную таблицу
+    и переносит ее в wb_orders одним запросом в одной транзакции.
+    """
+    await create_orders_staging(session)
+
+    async for orders in chunks:
+        await copy_orders_to_staging(session, orders)
+
+    rows, staged = await merge_orders_from_staging(session)
+    await session.commit()
 
-            wb_orders = [order.model_dump() for order in wb_orders.orders]
-            await upsert_orders_in_batches(session, wb_orders)
+    inserted = sum(1 for row in rows if row.inserted)
 
-            wb_order_ids = {assembly_task.get("id") for assembly_task in wb_orders}
+    for i in range(0, len(rows), EVENT_BATCH_SIZE):
+        await publish_new_orders_event(rows[i : i + EVENT_BATCH_SIZE])
 
-            wb_assembly_tasks = wb_api.fetch_new_assembly_tasks()
-            wb_assembly_tasks = [
-                order.model_dump() for order in wb_assembly_tasks.orders
-            ]
+    return UpsertStats(
+        inserted=inserted,
+        updated=len(rows) - inserted,
+        unchanged=staged - len(rows),
+    )
 
-            wb_assembly_tasks = [
-                task
-                for task in wb_assembly_tasks
-                if task.get("wb_order_id") in wb_order_ids
-            ]
 
-            await upsert_assembly_task_data_in_batches(session, wb_assembly_tasks)
+def orders_sync_name(account_id: int) -> str:
+    return f"{ORDERS_SYNC_NAME}:{account_id}"
+
+
+async def sync_orders(
+    session: AsyncSession, wb_api: WbGateway, account_id: int
+) -> UpsertStats:
+    """
+    Загружает заказы кабинета, измененные после сохраненного курсора
+    (lastChangeDate), и сдвигает курсор. Раз в FULL_SYNC_INTERVAL выполняется
+    полная сверка за FULL_SYNC_DEPTH.
+
+    :return: количество добавленных, измененных и неизмененных заказов
+    """
+    sync_name = orders_sync_name(account_id)
+    sync_state_repo = WbSyncStateRepository(session)
+    state = await sync_state_repo.get(sync_name)
+    now = now_utc()
+
+    full_sync = (
+        state is None
+        or state.cursor is None
+        or state.last_full_sync_at is None
+        or now - state.last_full_sync_at >= FULL_SYNC_INTERVAL
+    )
+    cursor = state.cursor if state else None
+    # Курсор и dateFrom - московское время, как lastChangeDate в отчете WB
+    date_from = (now_moscow() - FULL_SYNC_DEPTH).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    ) if full_sync else cursor
+
+    log.info(
+        "Синхронизация заказов WB (%s) с %s",
+        "полная" if full_sync else "инкрементальная",
+        date_from,
+    )
+
+    region_aliases = await RegionRepository(session).get_alias_map()
+
+    stats = UpsertStats()
+
+    while True:
+        page_size = 0
+        page_cursor = None
+
+        async def iter_page_rows():
+            """Отчет разбирается потоком и передается пачками по мере загрузки"""
+            nonlocal page_size, page_cursor
+
+            async for wb_orders in wb_api.iter_orders_report(
+                date_from=date_from.isoformat()
+            ):
+                page_size += len(wb_orders)
+                chunk_cursor = max(order.last_change_date for order in wb_orders)
+                page_cursor = (
+                    max(page_cursor, chunk_cursor) if page_cursor else chunk_cursor
+                )
+
+                yield [
+                    order_to_row(order, region_aliases, account_id)
+                    for order in wb_orders
+                ]
+
+        if settings.WB_SYNC_BULK_COPY:
+            stats += await copy_orders_page(session, iter_page_rows())
+        else:
+            async for orders in iter_page_rows():
+                stats += await upsert_orders_in_batches(session, orders)
+
+        if not page_size:
+            break
+
+        # Курсор сохраняется после записи страницы: при сбое страница
+        # будет загружена повторно, а не пропущена
+        cursor = max(cursor, page_cursor) if cursor else page_cursor
+        await sync_state_repo.save_cursor(sync_name, cursor)
+
+        if page_size < ORDERS_REPORT_LIMIT or page_cursor <= date_from:
+            break
+
+        date_from = page_cursor
+
+    if full_sync:
+        await sync_state_repo.save_cursor(
+            sync_name, cursor or date_from, last_full_sync_at=now
+        )
+
+    log.info(
+        "Заказы WB (кабинет %s): добавлено %s, изменено %s, без изменений %s",
+        account_id,
+        stats.inserted,
+        stats.updated,
+        stats.unchanged,
+    )
+
+    return stats
+
+
+async def sync_account_data(
+    session: AsyncSession, wb_api: WbGateway, account_id: int
+) -> UpsertStats:
+    """
+    Синхронизирует заказы, новые сборочные задания и их статусы кабинета.
+
+    :return: статистика загрузки заказов
+    """
+    # Статистика и маркетплейс - разные API, запрашиваем параллельно
+    stats, wb_assembly_tasks = await asyncio.gather(
+        sync_orders(session, wb_api, account_id),
+        wb_api.fetch_new_assembly_tasks(),
+    )
+
+    wb_assembly_tasks = [
+        {**order.model_dump(), "account_id": account_id}
+        for order in wb_assembly_tasks.orders
+    ]
+
+    # Заказ задания мог быть загружен в одной из прошлых синхронизаций
+    task_order_ids = {task.get("wb_order_id") for task in wb_assembly_tasks}
+    result = await session.execute(
+        select(WbOrderORM.id).where(WbOrderORM.id.in_(task_order_ids))
+    )
+    wb_order_ids = set(result.scalars().all())
+
+    wb_assembly_tasks = [
+        task for task in wb_assembly_tasks if task.get("wb_order_id") in wb_order_ids
+    ]
+
+    if settings.WB_SYNC_BULK_COPY:
+        new_orders = await load_assembly_tasks(session, wb_assembly_tasks)
+        await session.commit()
+        await publish_new_orders_event(new_orders)
+    else:
+        await upsert_assembly_task_data_in_batches(session, wb_assembly_tasks)
+    await sync_assembly_task_statuses(session, wb_api, account_id)
+
+    return stats
+
+
+async def get_wb_data_and_save_to_db(wb_api: WbGateway, account_id: int):
+    async with AsyncSessionLocal() as session:
+        try:
+            await sync_account_data(session, wb_api, account_id)
             log.info(f"Данные успешно сохранены в базу данных")
         except Exception as e:
             log.error(e)
             raise
 
 
+async def run_account_sync(
+    account_id: int, wb_token: Optional[str], rate_limiter: WbRateLimiter
+):
+    """
+    Цикл синхронизации одного кабинета со своим клиентом и лимитами WB API.
+    """
+    async with WbGateway.for_account(account_id, wb_token, rate_limiter) as wb_api:
+        while True:
+            log.info("Кабинет %s: запускаю получение данных из WB", account_id)
+            try:
+                await get_wb_data_and_save_to_db(wb_api, account_id)
+            except Exception as e:
+                # Ошибка одного кабинета не останавливает остальные
+                log.error("Кабинет %s: ошибка синхронизации: %s", account_id, e)
+            else:
+                log.info("Кабинет %s: данные WB сохранены", account_id)
+
+            log.info(
+                "Кабинет %s: ожидание лимитов WB API: %s",
+                account_id,
+                await wb_api.rate_limiter.get_metrics(),
+            )
+            await asyncio.sleep(SYNC_INTERVAL)
+
+
 async def run_script():
-    while True:
-        log.info("Запускаю получение данных из WB и сохранение в базу данных")
-        await get_wb_data_and_save_to_db()
-        log.info("Завершено получение данных из WB и сохранение в базу данных")
-        await asyncio.sleep(300)
+    """
+    Планировщик: для каждого активного кабинета запускается отдельный цикл
+    синхронизации. Список кабинетов перечитывается каждые
+    ACCOUNTS_REFRESH_INTERVAL: новые кабинеты запускаются, отключенные
+    и кабинеты со сменившимся токеном - останавливаются (и перезапускаются).
+    """
+    rate_limiter = WbRateLimiter.from_settings()
+    running: dict[int, tuple[Optional[str], asyncio.Task]] = {}
+
+    try:
+        while True:
+            async with AsyncSessionLocal() as session:
+                accounts = await SellerAccountRepository(session).get_active()
+            active = {account.id: account.wb_token for account in accounts}
+
+            for account_id, (wb_token, task) in list(running.items()):
+                if (
+                    account_id not in active
+                    or active[account_id] != wb_token
+                    or task.done()
+                ):
+                    task.cancel()
+                    del running[account_id]
+
+            for account_id, wb_token in active.items():
+                if account_id not in running:
+                    running[account_id] = (
+                        wb_token,
+                        asyncio.create_task(
+                            run_account_sync(account_id, wb_token, rate_limiter)
+                        ),
+                    )
+
+            log.info("Синхронизация WB: активные кабинеты %s", list(running))
+            await asyncio.sleep(ACCOUNTS_REFRESH_INTERVAL)
+    finally:
+        for _, task in running.values():
+            task.cancel()
+        await rate_limiter.close()
 
 
 if __name__ == "__main__":